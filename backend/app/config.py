@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Tuple
 from functools import lru_cache
 
 
@@ -20,6 +20,58 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
 
+    # 预置动作库内存索引：检查版本号的最短间隔（秒）
+    catalog_refresh_seconds: int = 60
+    # 启动时同步预置动作数据（内容哈希不变时不做任何写入）
+    seed_catalog_on_startup: bool = True
+
+    # 肌群统计中辅助肌群的计入比例（主肌群为 1.0）
+    secondary_muscle_weight: float = 0.5
+
+    # 各肌群每周有效组数的 (MEV, MRV)：最低有效容量 / 最大可恢复容量
+    # 可通过环境变量以 JSON 覆盖，如 MUSCLE_VOLUME_LANDMARKS='{"chest": [10, 18]}'（未列出的肌群不评估）
+    muscle_volume_landmarks: Dict[str, Tuple[float, float]] = {
+        "chest": (12, 20),
+        "back": (14, 22),
+        "shoulders": (12, 18),
+        "biceps": (10, 16),
+        "triceps": (10, 16),
+        "forearms": (6, 16),
+        "quads": (12, 18),
+        "hamstrings": (8, 16),
+        "glutes": (6, 16),
+        "calves": (8, 16),
+        "core": (6, 20),
+    }
+    # 周组数达到 MRV 的该比例时提醒减量
+    mrv_warning_ratio: float = 0.9
+
+    # 力量雷达图：各肌群最佳 e1RM 达到体重该倍数时记 100 分（未列出的肌群不评分）
+    strength_standards: Dict[str, float] = {
+        "chest": 1.5,
+        "back": 1.5,
+        "shoulders": 1.0,
+        "biceps": 0.6,
+        "triceps": 0.7,
+        "forearms": 0.5,
+        "quads": 2.0,
+        "hamstrings": 2.0,
+        "glutes": 2.0,
+        "calves": 1.5,
+        "core": 0.5,
+    }
+
+    # 录入错误识别：重量或 e1RM 高于该动作历史均值的标准差倍数，且历史组数不少于下限时标记待确认
+    outlier_z_threshold: float = 4.0
+    outlier_min_samples: int = 5
+
+    # 自定义分析查询的成本限制：最大日期跨度（天）、最大返回行数
+    analytics_query_max_days: int = 730
+    analytics_query_max_rows: int = 1000
+
+    # 同类用户力量百分位草图的全量重建间隔（小时），0 表示不自动重建
+    cohort_rebuild_hours: float = 24
+
     # 跨域配置
     cors_origins: str = '["http://localhost:3000","http://localhost:5173"]'
 
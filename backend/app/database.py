@@ -1,3 +1,5 @@
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.config import settings
@@ -10,6 +12,37 @@ engine = create_async_engine(
     future=True,
 )
 
+
+# 写请求以 IMMEDIATE 方式开启 SQLite 事务的执行选项（见 get_db）
+SQLITE_BEGIN_OPTION = "sqlite_begin"
+
+# SQLite 等待写锁的超时时间（毫秒）
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+# SQLite 默认不校验外键，需在每个连接上开启，ON DELETE CASCADE 才会生效；
+# WAL 模式下读写互不阻塞，写锁被占用时按 busy_timeout 等待。
+# pysqlite 自行管理事务时 SAVEPOINT 不可靠（RELEASE 会提交外层事务），
+# 因此关闭驱动的隐式 BEGIN，改为在 SQLAlchemy 开启事务时显式 BEGIN
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_sqlite_transaction(conn):
+        conn.exec_driver_sql("BEGIN " + conn.get_execution_options().get(SQLITE_BEGIN_OPTION, "DEFERRED"))
+
+# 带 ON CONFLICT 的 INSERT（统计表增量 upsert 用），按数据库方言选择
+if engine.dialect.name == "postgresql":
+    from sqlalchemy.dialects.postgresql import insert as upsert_insert
+else:
+    from sqlalchemy.dialects.sqlite import insert as upsert_insert
+
 # 创建异步会话工厂
 async_session_maker = async_sessionmaker(
     engine,
@@ -23,10 +56,18 @@ class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncSession:
-    """获取数据库会话（依赖注入）"""
+async def get_db(request: Request) -> AsyncSession:
+    """
+    获取数据库会话（依赖注入）
+
+    SQLite 的读事务在写入时才升级为写锁，若期间其他请求已提交写入会直接报 database is locked；
+    写请求（均先读取当前用户再写入）因此在事务开始时即获取写锁（IMMEDIATE），并发写请求排队等待；
+    读请求保持 DEFERRED，在 WAL 模式下可与写请求并行。
+    """
     async with async_session_maker() as session:
         try:
+            if engine.dialect.name == "sqlite" and request.method not in ("GET", "HEAD", "OPTIONS"):
+                await session.connection(execution_options={SQLITE_BEGIN_OPTION: "IMMEDIATE"})
             yield session
             await session.commit()
         except Exception:
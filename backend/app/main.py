@@ -1,18 +1,49 @@
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, async_session_maker
+from app.services import cohort_percentiles
+from app.services.exercise_catalog import load_catalog
+
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_cohorts_periodically():
+    """定期重建同类用户力量百分位草图（t-digest 不支持删除，增量追加会残留旧值）"""
+    while True:
+        await asyncio.sleep(settings.cohort_rebuild_hours * 3600)
+        try:
+            async with async_session_maker() as db:
+                await cohort_percentiles.rebuild(db)
+                await db.commit()
+        except Exception:
+            logger.exception("重建同类用户百分位草图失败")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    # 启动时：初始化数据库
+    # 启动时：初始化数据库，同步预置动作数据，加载预置动作库索引
     await init_db()
+    if settings.seed_catalog_on_startup:
+        from seeds.exercises import seed_exercises
+        await seed_exercises()
+    async with async_session_maker() as db:
+        await load_catalog(db)
+    rebuild_task = None
+    if settings.cohort_rebuild_hours > 0:
+        rebuild_task = asyncio.create_task(rebuild_cohorts_periodically())
     yield
     # 关闭时：清理资源
+    if rebuild_task:
+        rebuild_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await rebuild_task
 
 
 # 创建 FastAPI 应用
@@ -40,8 +71,10 @@ async def health_check():
 
 
 # 注册路由
-from app.routers import auth, exercises, workouts, analysis
+from app.routers import auth, exercises, workouts, analysis, sync, admin
 app.include_router(auth.router, prefix="/api/auth", tags=["认证"])
 app.include_router(exercises.router, prefix="/api/exercises", tags=["动作库"])
 app.include_router(workouts.router, prefix="/api/workouts", tags=["训练记录"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["数据分析"])
+app.include_router(sync.router, prefix="/api/sync", tags=["离线同步"])
+app.include_router(admin.router, prefix="/api/admin", tags=["管理后台"])
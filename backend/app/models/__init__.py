@@ -3,6 +3,13 @@ from app.models.user import User
 from app.models.exercise import Exercise, MUSCLE_GROUPS, EXERCISE_CATEGORIES, EQUIPMENT_TYPES
 from app.models.workout import WorkoutSession, WorkoutSet
 from app.models.analysis import Estimated1RM
+from app.models.sync import ChangeLog, IdempotencyKey
+from app.models.catalog import CatalogState
+from app.models.stats import (
+    ExerciseUsage, MuscleDayBitmap, FleetSketch, PersonalRecord,
+    DailyBestE1RM, E1RMRegression, E1RMRegressionWeek, DailyLoad, WorkloadState,
+    WeeklyExerciseSets, ExerciseSetStats,
+)
 
 __all__ = [
     "Base",
@@ -11,6 +18,20 @@ __all__ = [
     "WorkoutSession",
     "WorkoutSet",
     "Estimated1RM",
+    "ChangeLog",
+    "IdempotencyKey",
+    "CatalogState",
+    "ExerciseUsage",
+    "MuscleDayBitmap",
+    "FleetSketch",
+    "PersonalRecord",
+    "DailyBestE1RM",
+    "E1RMRegression",
+    "E1RMRegressionWeek",
+    "DailyLoad",
+    "WorkloadState",
+    "WeeklyExerciseSets",
+    "ExerciseSetStats",
     "MUSCLE_GROUPS",
     "EXERCISE_CATEGORIES",
     "EQUIPMENT_TYPES",
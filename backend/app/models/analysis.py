@@ -12,8 +12,12 @@ class Estimated1RM(Base, TimestampMixin):
     __tablename__ = "estimated_1rms"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    exercise_id: Mapped[int] = mapped_column(Integer, ForeignKey("exercises.id"), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), nullable=False, index=True
+    )
 
     # 推算结果
     date: Mapped[DateType] = mapped_column(Date, nullable=False, index=True)  # 推算日期
@@ -25,7 +29,9 @@ class Estimated1RM(Base, TimestampMixin):
     source_weight: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # 原始重量
     source_reps: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 原始次数
     source_rpe: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 原始 RPE
-    source_set_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("workout_sets.id"), nullable=True)
+    source_set_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("workout_sets.id", ondelete="SET NULL"), nullable=True
+    )
 
     # 关系
     user = relationship("User", back_populates="estimated_1rms")
@@ -13,6 +13,7 @@ class Exercise(Base, TimestampMixin):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)  # 动作名称（中文）
     name_en: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # 英文名称
+    slug: Mapped[Optional[str]] = mapped_column(String(100), unique=True, nullable=True)  # 预置动作的稳定标识（seed 按此更新）
 
     # 肌群分类
     primary_muscle: Mapped[str] = mapped_column(String(50), nullable=False, index=True)  # 主要肌群
@@ -25,7 +26,9 @@ class Exercise(Base, TimestampMixin):
 
     # 自定义动作标识
     is_custom: Mapped[bool] = mapped_column(Boolean, default=False)
-    user_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True
+    )
 
     # 描述
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -0,0 +1,214 @@
+from datetime import date as DateType, datetime
+from typing import Optional
+from sqlalchemy import Integer, Float, String, Date, DateTime, ForeignKey, Index, LargeBinary, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# 以下均为训练组的派生统计，由训练写操作增量维护（见 app/services/set_events.py），
+# 可随时由原始训练记录重建（python -m seeds.rebuild_stats）
+
+
+class ExerciseUsage(Base):
+    """用户 × 动作 使用统计（动作选择器的常用 / 最近使用排序、上次表现）"""
+    __tablename__ = "exercise_usage"
+    __table_args__ = (
+        Index("ix_exercise_usage_user_last_used", "user_id", "last_used"),
+        Index("ix_exercise_usage_user_use_count", "user_id", "use_count"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    use_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # 累计组数
+    last_used: Mapped[DateType] = mapped_column(Date, nullable=False)  # 最近一次训练日期
+    # 最近一次包含该动作的训练课（同一天多次训练取 id 较大者），用于「上次表现」
+    last_session_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("workout_sessions.id", ondelete="SET NULL"), nullable=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class MuscleDayBitmap(Base):
+    """用户 × 肌群 × 年 的训练日位图（每天 1 位，第 N 天对应第 N-1 位，小端序）"""
+    __tablename__ = "muscle_day_bitmaps"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    muscle: Mapped[str] = mapped_column(String(50), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # 46 字节（366 位）
+
+
+class FleetSketch(Base):
+    """全站统计的概率数据结构（HyperLogLog / Count-Min Sketch / t-digest 的二进制序列化）"""
+    __tablename__ = "fleet_sketches"
+
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)  # users_hll / volume_cms / e1rm_tdigest
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)  # 如 "12:2026-09"（动作:月份）或 "2026-09"
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)  # 按用户分片，降低热点行竞争
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class PersonalRecord(Base):
+    """用户 × 动作 的个人纪录（1-20 次的最大重量、最佳 e1RM、单次训练最大容量）"""
+    __tablename__ = "personal_records"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)  # rep_max / e1rm / session_volume
+    reps: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)  # rep_max 为次数，其他为 0
+    value: Mapped[float] = mapped_column(Float, nullable=False)  # 重量 / e1RM / 容量
+    # 纪录保持者（被删除时置空，下次变更时重算）
+    set_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("workout_sets.id", ondelete="SET NULL"), nullable=True
+    )
+    session_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("workout_sessions.id", ondelete="SET NULL"), nullable=True
+    )
+    date: Mapped[DateType] = mapped_column(Date, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class DailyBestE1RM(Base):
+    """用户 × 动作 × 日 的最佳 e1RM（趋势回归的数据点）"""
+    __tablename__ = "daily_best_e1rms"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    date: Mapped[DateType] = mapped_column(Date, primary_key=True)
+    e1rm: Mapped[float] = mapped_column(Float, nullable=False)
+    # 当天 e1RM 最高的一组（被删除时置空，下次变更时重算）
+    set_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("workout_sets.id", ondelete="SET NULL"), nullable=True
+    )
+
+
+class RegressionSumsMixin:
+    """线性回归累加量（x = 距 2000-01-01 的天数，y = 当日最佳 e1RM）"""
+    n: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sum_x: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    sum_y: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    sum_xx: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    sum_xy: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    sum_yy: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+
+
+class E1RMRegression(RegressionSumsMixin, Base):
+    """用户 × 动作 的全部历史 e1RM 趋势回归累加量"""
+    __tablename__ = "e1rm_regressions"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class E1RMRegressionWeek(RegressionSumsMixin, Base):
+    """用户 × 动作 × 周 的 e1RM 回归累加量（最近 N 周的滑动窗口 = N 行相加）"""
+    __tablename__ = "e1rm_regression_weeks"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    week_start: Mapped[DateType] = mapped_column(Date, primary_key=True)  # 当周周一
+
+
+class DailyLoad(Base):
+    """用户每天的训练负荷（容量负荷 Σ weight × reps）"""
+    __tablename__ = "daily_loads"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    date: Mapped[DateType] = mapped_column(Date, primary_key=True)
+    volume_load: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class WorkloadState(Base):
+    """用户的急性 / 慢性负荷指数加权移动平均（截至 as_of 当天，之后按天衰减）"""
+    __tablename__ = "workload_states"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    acute: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    chronic: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    as_of: Mapped[DateType] = mapped_column(Date, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class WeeklyExerciseSets(Base):
+    """用户 × 动作 × 周 的训练组数（读取时乘以动作 → 肌群权重矩阵得到肌群周组数，对照 MEV / MRV）"""
+    __tablename__ = "weekly_exercise_sets"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    week_start: Mapped[DateType] = mapped_column(Date, primary_key=True)  # ISO 周的周一
+    sets: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ExerciseSetStats(Base):
+    """用户 × 动作 的训练组重量与 e1RM 的在线均值 / 方差（Welford，用于识别录入错误，不含待确认的组）"""
+    __tablename__ = "exercise_set_stats"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    n: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    weight_mean: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    weight_m2: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    e1rm_mean: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    e1rm_m2: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
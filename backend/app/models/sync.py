@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, ForeignKey, DateTime, Index, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ChangeLog(Base):
+    """变更日志（离线同步用，每次写操作分配一个用户内单调递增的版本号）"""
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_user_version", "user_id", "version"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False)  # 对应 User.data_version
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)  # session / set / exercise
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    op: Mapped[str] = mapped_column(String(10), nullable=False)  # upsert / delete
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class IdempotencyKey(Base):
+    """客户端幂等键（防止离线重试产生重复数据）"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    key: Mapped[str] = mapped_column(String(100), nullable=False)
+    entity_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)  # 首次请求创建/修改的实体
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
@@ -23,8 +23,15 @@ class User(Base, TimestampMixin):
     # 偏好设置
     unit_preference: Mapped[str] = mapped_column(String(10), default="kg")  # kg 或 lb
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    is_admin: Mapped[bool] = mapped_column(Boolean, default=False, server_default="0", nullable=False)  # 管理员（全站统计）
+
+    # 数据版本号：每次训练/动作写操作 +1（离线同步与缓存失效用）
+    data_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     # 关系
-    exercises = relationship("Exercise", back_populates="user", foreign_keys="Exercise.user_id")
-    workout_sessions = relationship("WorkoutSession", back_populates="user")
-    estimated_1rms = relationship("Estimated1RM", back_populates="user")
+    # 删除用户时由数据库 ON DELETE CASCADE 级联清理，ORM 不逐行加载
+    exercises = relationship(
+        "Exercise", back_populates="user", foreign_keys="Exercise.user_id", passive_deletes=True
+    )
+    workout_sessions = relationship("WorkoutSession", back_populates="user", passive_deletes=True)
+    estimated_1rms = relationship("Estimated1RM", back_populates="user", passive_deletes=True)
@@ -1,6 +1,6 @@
 from datetime import date as DateType
 from typing import Optional, List
-from sqlalchemy import String, Integer, Float, Text, ForeignKey, Date
+from sqlalchemy import String, Integer, Float, Boolean, Text, ForeignKey, Date, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -10,9 +10,15 @@ from app.models.base import TimestampMixin
 class WorkoutSession(Base, TimestampMixin):
     """训练课（一次完整训练）"""
     __tablename__ = "workout_sessions"
+    __table_args__ = (
+        # 列表游标分页按 (user_id, date, id) 定位
+        Index("ix_workout_sessions_user_date_id", "user_id", "date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
 
     # 训练基本信息
     date: Mapped[DateType] = mapped_column(Date, nullable=False, index=True)  # 训练日期
@@ -28,7 +34,13 @@ class WorkoutSession(Base, TimestampMixin):
 
     # 关系
     user = relationship("User", back_populates="workout_sessions")
-    sets = relationship("WorkoutSet", back_populates="session", cascade="all, delete-orphan")
+    sets = relationship(
+        "WorkoutSet",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,  # 由数据库 ON DELETE CASCADE 删除训练组
+        order_by="WorkoutSet.set_order",
+    )
 
 
 class WorkoutSet(Base, TimestampMixin):
@@ -36,7 +48,9 @@ class WorkoutSet(Base, TimestampMixin):
     __tablename__ = "workout_sets"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    session_id: Mapped[int] = mapped_column(Integer, ForeignKey("workout_sessions.id"), nullable=False, index=True)
+    session_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("workout_sessions.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     exercise_id: Mapped[int] = mapped_column(Integer, ForeignKey("exercises.id"), nullable=False, index=True)
 
     # 组数据
@@ -50,6 +64,9 @@ class WorkoutSet(Base, TimestampMixin):
     tempo: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # 节奏 如 "3-1-2"
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # 组备注
 
+    # 疑似录入错误（重量 / e1RM 远超该动作的历史分布），确认前不计入统计分析
+    is_flagged: Mapped[bool] = mapped_column(Boolean, default=False, server_default="0", nullable=False)
+
     # 关系
     session = relationship("WorkoutSession", back_populates="sets")
     exercise = relationship("Exercise", back_populates="workout_sets")
@@ -0,0 +1,47 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.user import User
+from app.schemas.admin import FleetExerciseStats, FleetExerciseStatsResponse
+from app.services.exercise_catalog import get_catalog
+from app.services.fleet_stats import get_exercise_stats
+from app.utils.dependencies import get_current_admin_user
+
+router = APIRouter()
+
+
+@router.get("/exercise-stats", response_model=FleetExerciseStatsResponse)
+async def get_fleet_exercise_stats(
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="月份 YYYY-MM，不传统计全部"),
+    sort: str = Query("users", pattern="^(users|volume)$", description="排序：users / volume"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_current_admin_user),
+):
+    """全站预置动作使用人数与训练容量（读取合并后的草图，误差有界）"""
+    users, volume, users_error = await get_exercise_stats(db, month)
+    catalog = await get_catalog(db)
+
+    items = [
+        FleetExerciseStats(
+            exercise_id=exercise_id,
+            exercise_name=catalog.exercises[exercise_id].name,
+            distinct_users=round(count),
+            total_volume=round(max(volume.estimate(exercise_id), 0.0), 2),
+        )
+        for exercise_id, count in users.items()
+        if exercise_id in catalog.exercises
+    ]
+    if sort == "volume":
+        items.sort(key=lambda item: (-item.total_volume, item.exercise_id))
+    else:
+        items.sort(key=lambda item: (-item.distinct_users, -item.total_volume, item.exercise_id))
+
+    return FleetExerciseStatsResponse(
+        month=month,
+        users_relative_error=round(users_error, 4),
+        volume_error_bound=round(volume.error_bound, 2),
+        items=items[:limit],
+    )
@@ -1,14 +1,17 @@
 from datetime import date, timedelta
-from typing import Optional, List
+from typing import Optional, List, Dict
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, case
+from sqlalchemy import select, func, and_, or_, case
 
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.workout import WorkoutSession, WorkoutSet
-from app.models.exercise import Exercise
+from app.models.exercise import Exercise, MUSCLE_GROUPS
 from app.models.analysis import Estimated1RM
+from app.models.stats import DailyBestE1RM, PersonalRecord
 from app.schemas.analysis import (
     OneRMTrendResponse,
     OneRMTrendPoint,
@@ -18,15 +21,69 @@ from app.schemas.analysis import (
     VolumeStatsPoint,
     MuscleBalanceResponse,
     MuscleVolumePoint,
+    MuscleHeatmapRow,
+    MuscleHeatmapResponse,
+    PersonalRecordEntry,
+    ExercisePersonalRecords,
+    PersonalRecordsResponse,
+    TrendFit,
+    ExerciseTrend,
+    TrendsResponse,
+    WorkloadPoint,
+    WorkloadResponse,
+    MuscleWeeklyVolume,
+    WeeklyVolumeResponse,
+    IntensityZone,
+    ExerciseIntensity,
+    PeriodIntensity,
+    IntensityDistributionResponse,
+    CohortPercentileResponse,
+    StrengthProfileResponse,
+    AnalyticsQueryRequest,
+    AnalyticsQueryResponse,
+    CompareWindow,
+    MuscleComparison,
+    ExerciseComparison,
+    CompareResponse,
     ProgressReportResponse,
     ExerciseProgress,
 )
+from app.services.analytics_query import TIME_DIMENSIONS, run_query
+from app.services.cohort_percentiles import MIN_COHORT_SIZE, cohort_of, get_cohort_digests
+from app.services.e1rm_trends import get_regressions, week_start
+from app.services.exercise_catalog import get_catalog, get_user_exercises, muscle_weights
+from app.services.personal_records import (
+    KIND_REP_MAX,
+    KIND_E1RM,
+    KIND_SESSION_VOLUME,
+    get_personal_records,
+)
+from app.services.intensity import INTENSITY_ZONES, get_set_intensities
+from app.services.strength_profile import get_strength_profile
+from app.services.muscle_calendar import get_year_bitmaps, week_starts, weekly_counts, bitmap_days, popcount
+from app.services.weekly_volume import get_week_sets
+from app.services.workload import get_workload_series, acute_chronic_ratio
 from app.services.rm_calculator import calculate_1rm, calculate_volume_load
 from app.utils.dependencies import get_current_user
+from app.utils.running_stats import RunningRegression
 
 router = APIRouter()
 
 
+# 进步 / 退步判定阈值（窗口内变化百分比）
+TREND_THRESHOLD_PERCENT = 5
+# 趋势判定所需的最少数据点
+TREND_MIN_POINTS = 3
+
+# ACWR 区间：(上限, 状态, 建议)
+ACWR_ZONES = (
+    (0.8, "low", "近期负荷明显低于习惯水平，可逐步增加训练量"),
+    (1.3, "optimal", "负荷处于适宜区间，继续保持"),
+    (1.5, "caution", "负荷上升较快，注意恢复，避免继续加量"),
+    (float("inf"), "high", "急性负荷过高，受伤风险上升，建议安排减载"),
+)
+
+
 @router.post("/1rm/calculate", response_model=OneRMCalculateResponse)
 async def calculate_1rm_endpoint(
     request: OneRMCalculateRequest,
@@ -63,6 +120,7 @@ async def get_1rm_trend(
         .join(WorkoutSession)
         .where(and_(
             WorkoutSession.user_id == current_user.id,
+            WorkoutSet.is_flagged == False,
             WorkoutSet.exercise_id == exercise_id,
             WorkoutSession.date >= start_date,
         ))
@@ -156,7 +214,10 @@ async def get_volume_stats(
     for session in sessions:
         # 获取该训练课的所有组
         sets_result = await db.execute(
-            select(WorkoutSet).where(WorkoutSet.session_id == session.id)
+            select(WorkoutSet).where(
+                WorkoutSet.session_id == session.id,
+                WorkoutSet.is_flagged == False,
+            )
         )
         sets = sets_result.scalars().all()
 
@@ -195,38 +256,48 @@ async def get_muscle_balance(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """获取肌群平衡分析"""
+    """获取肌群平衡分析（辅助肌群按比例计入）"""
     start_date = date.today() - timedelta(days=days)
 
-    # 查询各肌群的训练组数
+    # 按动作汇总组数与容量
     result = await db.execute(
         select(
-            Exercise.primary_muscle,
+            WorkoutSet.exercise_id,
             func.count(WorkoutSet.id).label("total_sets"),
             func.sum(WorkoutSet.weight * WorkoutSet.reps).label("total_volume"),
         )
-        .select_from(WorkoutSet)
         .join(WorkoutSession)
-        .join(Exercise, WorkoutSet.exercise_id == Exercise.id)
         .where(and_(
             WorkoutSession.user_id == current_user.id,
+            WorkoutSet.is_flagged == False,
             WorkoutSession.date >= start_date,
         ))
-        .group_by(Exercise.primary_muscle)
+        .group_by(WorkoutSet.exercise_id)
     )
-    muscle_stats = result.all()
+    exercise_stats = result.all()
+
+    # 动作统计 (动作数 × 2) 乘以 动作 → 肌群权重矩阵 (动作数 × 肌群数)
+    muscle_stats = np.zeros((2, len(MUSCLE_GROUPS)))
+    if exercise_stats:
+        catalog = await get_catalog(db)
+        user_exercises = await get_user_exercises(db, current_user.id)
+        weights = muscle_weights(catalog, user_exercises, [row.exercise_id for row in exercise_stats])
+        values = np.array([[row.total_sets, float(row.total_volume or 0)] for row in exercise_stats])
+        muscle_stats = values.T @ weights
 
-    # 计算总容量
-    total_volume = sum(float(s.total_volume or 0) for s in muscle_stats)
+    # 计算总容量（辅助肌群计入后大于实际训练容量，占比按加权后的总量计算）
+    total_volume = float(muscle_stats[1].sum())
 
     # 构建响应
     muscle_volumes = []
-    for stat in muscle_stats:
-        volume = float(stat.total_volume or 0)
+    for index, muscle in enumerate(MUSCLE_GROUPS):
+        sets, volume = float(muscle_stats[0, index]), float(muscle_stats[1, index])
+        if sets <= 0:
+            continue
         percentage = round(volume / total_volume * 100, 1) if total_volume > 0 else 0
         muscle_volumes.append(MuscleVolumePoint(
-            muscle_group=stat.primary_muscle,
-            total_sets=stat.total_sets,
+            muscle_group=muscle,
+            total_sets=round(sets, 1),
             total_volume=round(volume, 2),
             percentage=percentage,
         ))
@@ -261,6 +332,539 @@ async def get_muscle_balance(
     )
 
 
+@router.get("/heatmap", response_model=MuscleHeatmapResponse)
+async def get_muscle_heatmap(
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="年份，默认今年"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """肌群训练频率热力图（读取各肌群的年度训练日位图）"""
+    year = year or date.today().year
+    bitmaps = await get_year_bitmaps(db, current_user.id, year)
+
+    muscles = [
+        MuscleHeatmapRow(
+            muscle_group=muscle,
+            trained_days=popcount(bitmaps[muscle]),
+            days=bitmap_days(bitmaps[muscle], year),
+            weekly_counts=weekly_counts(bitmaps[muscle], year),
+        )
+        for muscle in MUSCLE_GROUPS
+        if muscle in bitmaps
+    ]
+
+    return MuscleHeatmapResponse(year=year, week_starts=week_starts(year), muscles=muscles)
+
+
+@router.get("/prs", response_model=PersonalRecordsResponse)
+async def get_personal_records_endpoint(
+    exercise_id: Optional[int] = Query(None, description="只看某个动作"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """个人纪录（读取增量维护的纪录表：1-20 次最大重量、最佳 e1RM、单次训练最大容量）"""
+    rows = await get_personal_records(db, current_user.id, exercise_id)
+
+    catalog = await get_catalog(db)
+    user_exercises = await get_user_exercises(db, current_user.id)
+    by_exercise: Dict[int, ExercisePersonalRecords] = {}
+    for record, weight, reps in rows:
+        exercise = catalog.exercises.get(record.exercise_id) or user_exercises.exercises.get(record.exercise_id)
+        if not exercise:
+            continue
+        item = by_exercise.get(record.exercise_id)
+        if item is None:
+            item = by_exercise[record.exercise_id] = ExercisePersonalRecords(
+                exercise_id=record.exercise_id,
+                exercise_name=exercise.name,
+                rep_maxes=[],
+            )
+        entry = PersonalRecordEntry(
+            value=round(record.value, 2),
+            weight=weight,
+            reps=reps,
+            date=record.date,
+            set_id=record.set_id,
+            session_id=record.session_id,
+        )
+        if record.kind == KIND_REP_MAX:
+            item.rep_maxes.append(entry)
+        elif record.kind == KIND_E1RM:
+            item.best_e1rm = entry
+        elif record.kind == KIND_SESSION_VOLUME:
+            item.best_session_volume = entry
+
+    return PersonalRecordsResponse(exercises=list(by_exercise.values()))
+
+
+def _trend_fit(sums: RunningRegression) -> TrendFit:
+    slope = sums.slope()
+    r_squared = sums.r_squared()
+    return TrendFit(
+        points=sums.n,
+        slope_per_week=round(slope * 7, 2) if slope is not None else None,
+        r_squared=round(r_squared, 3) if r_squared is not None else None,
+    )
+
+
+@router.get("/trends", response_model=TrendsResponse)
+async def get_e1rm_trends(
+    weeks: int = Query(8, ge=2, le=26, description="滑动窗口周数"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """各动作每日最佳 e1RM 的趋势（读取增量维护的回归累加量，不扫描训练记录）"""
+    window_start = week_start(date.today()) - timedelta(weeks=weeks - 1)
+    regressions = await get_regressions(db, current_user.id, window_start)
+
+    catalog = await get_catalog(db)
+    user_exercises = await get_user_exercises(db, current_user.id)
+    exercises = []
+    for exercise_id, total, recent in regressions:
+        exercise = catalog.exercises.get(exercise_id) or user_exercises.exercises.get(exercise_id)
+        if not exercise:
+            continue
+
+        change_percentage = None
+        trend = None
+        slope = recent.slope()
+        if recent.n >= TREND_MIN_POINTS and slope is not None and recent.mean_y:
+            change_percentage = round(slope * 7 * weeks / recent.mean_y * 100, 1)
+            if change_percentage > TREND_THRESHOLD_PERCENT:
+                trend = "improving"
+            elif change_percentage < -TREND_THRESHOLD_PERCENT:
+                trend = "declining"
+            else:
+                trend = "plateau"
+
+        exercises.append(ExerciseTrend(
+            exercise_id=exercise_id,
+            exercise_name=exercise.name,
+            all_time=_trend_fit(total),
+            recent=_trend_fit(recent),
+            change_percentage=change_percentage,
+            trend=trend,
+        ))
+
+    exercises.sort(key=lambda e: e.recent.points, reverse=True)
+    return TrendsResponse(weeks=weeks, window_start=window_start, exercises=exercises)
+
+
+@router.get("/workload", response_model=WorkloadResponse)
+async def get_workload(
+    days: int = Query(28, ge=7, le=56, description="序列天数"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """训练负荷与急性:慢性负荷比（读取增量维护的 EWMA 状态，按天衰减到今天）"""
+    series = await get_workload_series(db, current_user.id, date.today(), days)
+
+    points = []
+    for point in series:
+        ratio = acute_chronic_ratio(point)
+        points.append(WorkloadPoint(
+            date=point.date,
+            load=round(point.load, 2),
+            acute=round(point.acute, 2),
+            chronic=round(point.chronic, 2),
+            acwr=round(ratio, 2) if ratio is not None else None,
+        ))
+    if not points:
+        return WorkloadResponse(acute=0, chronic=0, recommendation="暂无训练数据", series=[])
+
+    today = points[-1]
+    status = None
+    recommendation = "训练数据不足，慢性负荷尚未建立"
+    if today.acwr is not None:
+        for upper, status, recommendation in ACWR_ZONES:
+            if today.acwr < upper:
+                break
+
+    return WorkloadResponse(
+        acute=today.acute,
+        chronic=today.chronic,
+        acwr=today.acwr,
+        status=status,
+        recommendation=recommendation,
+        series=points,
+    )
+
+
+@router.get("/weekly-volume", response_model=WeeklyVolumeResponse)
+async def get_weekly_volume(
+    day: Optional[date] = Query(None, alias="date", description="所在周的任意一天，默认本周"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """各肌群本周训练组数对照 MEV / MRV（读取增量维护的周计数）"""
+    start = week_start(day or date.today())
+    week_sets = await get_week_sets(db, current_user.id, start)
+    landmarks = settings.muscle_volume_landmarks
+
+    muscles = []
+    warnings = []
+    for muscle in MUSCLE_GROUPS:
+        sets = week_sets.get(muscle, 0.0)
+        if muscle not in landmarks:
+            if sets > 0:
+                muscles.append(MuscleWeeklyVolume(muscle_group=muscle, sets=round(sets, 1)))
+            continue
+
+        mev, mrv = landmarks[muscle]
+        if sets > mrv:
+            status = "above_mrv"
+            warnings.append(f"{muscle} 本周 {sets:.1f} 组，已超过 MRV（{mrv:g} 组），建议减量")
+        elif sets >= mrv * settings.mrv_warning_ratio:
+            status = "near_mrv"
+            warnings.append(f"{muscle} 本周 {sets:.1f} 组，接近 MRV（{mrv:g} 组），注意恢复")
+        elif sets >= mev:
+            status = "productive"
+        else:
+            status = "below_mev"
+        muscles.append(MuscleWeeklyVolume(
+            muscle_group=muscle,
+            sets=round(sets, 1),
+            mev=mev,
+            mrv=mrv,
+            status=status,
+        ))
+
+    return WeeklyVolumeResponse(
+        week_start=start,
+        week_end=start + timedelta(days=6),
+        muscles=muscles,
+        warnings=warnings,
+    )
+
+
+def _zone_histogram(groups: np.ndarray, zones: np.ndarray, intensities: np.ndarray, group_count: int):
+    """按分组统计各强度区间的组数与平均强度（一次 bincount）"""
+    zone_count = len(INTENSITY_ZONES)
+    counts = np.bincount(groups * zone_count + zones, minlength=group_count * zone_count)
+    counts = counts.reshape(group_count, zone_count)
+    totals = counts.sum(axis=1)
+    sums = np.bincount(groups, weights=intensities, minlength=group_count)
+    averages = np.divide(sums, totals, out=np.zeros(group_count), where=totals > 0)
+    return counts, totals, averages
+
+
+@router.get("/intensity-distribution", response_model=IntensityDistributionResponse)
+async def get_intensity_distribution(
+    period: str = Query("week", regex="^(week|month)$", description="统计周期"),
+    start_date: Optional[date] = Query(None, description="开始日期，默认一年前"),
+    end_date: Optional[date] = Query(None, description="结束日期，默认今天"),
+    exercise_id: Optional[int] = Query(None, description="只看某个动作"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """训练组相对强度（%e1RM）在各强度区间的分布，按动作和周期汇总"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=365)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+
+    data = await get_set_intensities(db, current_user.id, start_date, end_date, exercise_id)
+
+    zones = [
+        IntensityZone(
+            key=key,
+            name=name,
+            min_percent=lower,
+            max_percent=INTENSITY_ZONES[index + 1][0] if index + 1 < len(INTENSITY_ZONES) else None,
+        )
+        for index, (lower, key, name) in enumerate(INTENSITY_ZONES)
+    ]
+    total_counts, _, _ = _zone_histogram(
+        np.zeros(len(data.zones), dtype=np.int64), data.zones, data.intensities, 1
+    )
+
+    # 按动作
+    exercise_ids, exercise_groups = np.unique(data.exercise_ids, return_inverse=True)
+    counts, totals, averages = _zone_histogram(
+        exercise_groups, data.zones, data.intensities, len(exercise_ids)
+    )
+    catalog = await get_catalog(db)
+    user_exercises = await get_user_exercises(db, current_user.id)
+    exercises = []
+    for index, exercise_id_value in enumerate(exercise_ids.tolist()):
+        exercise = catalog.exercises.get(exercise_id_value) or user_exercises.exercises.get(exercise_id_value)
+        exercises.append(ExerciseIntensity(
+            exercise_id=exercise_id_value,
+            exercise_name=exercise.name if exercise else "",
+            total_sets=int(totals[index]),
+            average_intensity=round(float(averages[index]), 1),
+            counts=counts[index].tolist(),
+        ))
+    exercises.sort(key=lambda e: e.total_sets, reverse=True)
+
+    # 按周期（周一 / 每月 1 日）
+    if period == "week":
+        days = data.dates.astype(np.int64)
+        period_starts = (days - (days + 3) % 7).astype("datetime64[D]")  # 1970-01-01 为周四
+    else:
+        period_starts = data.dates.astype("datetime64[M]").astype("datetime64[D]")
+    starts, period_groups = np.unique(period_starts, return_inverse=True)
+    counts, totals, averages = _zone_histogram(period_groups, data.zones, data.intensities, len(starts))
+    periods = [
+        PeriodIntensity(
+            period_start=start,
+            total_sets=int(totals[index]),
+            average_intensity=round(float(averages[index]), 1),
+            counts=counts[index].tolist(),
+        )
+        for index, start in enumerate(starts.tolist())
+    ]
+
+    return IntensityDistributionResponse(
+        period=period,
+        start_date=start_date,
+        end_date=end_date,
+        zones=zones,
+        total_sets=len(data.zones),
+        counts=total_counts[0].tolist(),
+        exercises=exercises,
+        periods=periods,
+    )
+
+
+@router.get("/percentile/{exercise_id}", response_model=CohortPercentileResponse)
+async def get_cohort_percentile(
+    exercise_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """最佳 e1RM 在同体重级别、同训练年限用户中的百分位（读取 t-digest 草图）"""
+    catalog = await get_catalog(db)
+    exercise = catalog.exercises.get(exercise_id)
+    if not exercise:
+        user_exercises = await get_user_exercises(db, current_user.id)
+        if exercise_id in user_exercises.exercises:
+            raise HTTPException(status_code=400, detail="自定义动作没有同类用户数据")
+        raise HTTPException(status_code=404, detail="动作不存在")
+
+    result = await db.execute(
+        select(PersonalRecord.value).where(
+            PersonalRecord.user_id == current_user.id,
+            PersonalRecord.exercise_id == exercise_id,
+            PersonalRecord.kind == KIND_E1RM,
+        )
+    )
+    best_e1rm = result.scalar_one_or_none()
+
+    body_weight_class, training_age_group = cohort_of(current_user.body_weight, current_user.training_age)
+    cohort_digest, overall_digest = await get_cohort_digests(
+        db, exercise_id, (body_weight_class, training_age_group)
+    )
+    # 每个用户在草图中只有一个样本，样本数即人数，与所用草图一致
+    cohort = "cohort"
+    digest = cohort_digest
+    if digest is None or digest.count < MIN_COHORT_SIZE:
+        cohort, digest = "all", overall_digest
+
+    percentile = None
+    quantiles = {}
+    if digest is not None:
+        if best_e1rm is not None:
+            percentile = round(digest.cdf(best_e1rm) * 100, 1)
+        quantiles = {f"p{q}": round(digest.quantile(q / 100), 1) for q in (25, 50, 75, 90)}
+
+    return CohortPercentileResponse(
+        exercise_id=exercise_id,
+        exercise_name=exercise.name,
+        best_e1rm=round(best_e1rm, 2) if best_e1rm is not None else None,
+        relative_strength=(
+            round(best_e1rm / current_user.body_weight, 2)
+            if best_e1rm is not None and current_user.body_weight else None
+        ),
+        body_weight_class=body_weight_class,
+        training_age_group=training_age_group,
+        cohort=cohort,
+        cohort_size=int(digest.count) if digest is not None else 0,
+        percentile=percentile,
+        quantiles=quantiles,
+    )
+
+
+@router.get("/strength-profile", response_model=StrengthProfileResponse)
+async def get_strength_profile_endpoint(
+    days: int = Query(180, ge=30, le=730, description="查询天数"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """力量雷达图：各肌群近期最佳 e1RM 相对体重的评分（读取每日最佳 e1RM 表，按数据版本号缓存）"""
+    return await get_strength_profile(db, current_user, days)
+
+
+@router.post("/query", response_model=AnalyticsQueryResponse)
+async def query_analytics(
+    spec: AnalyticsQueryRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """自定义分析查询：按声明的指标、分组维度与筛选条件返回分组统计"""
+    if len(set(spec.metrics)) != len(spec.metrics) or len(set(spec.group_by)) != len(spec.group_by):
+        raise HTTPException(status_code=400, detail="指标和分组维度不能重复")
+    if sum(d in TIME_DIMENSIONS for d in spec.group_by) > 1:
+        raise HTTPException(status_code=400, detail="只能按一种时间粒度分组")
+
+    end_date = spec.end_date or date.today()
+    start_date = spec.start_date or end_date - timedelta(days=30)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+    if (end_date - start_date).days > settings.analytics_query_max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"查询区间不能超过 {settings.analytics_query_max_days} 天",
+        )
+
+    return await run_query(db, current_user.id, current_user.data_version, spec, start_date, end_date)
+
+
+def _change_percentage(a: float, b: float) -> Optional[float]:
+    return round((b - a) / a * 100, 1) if a else None
+
+
+@router.get("/compare", response_model=CompareResponse)
+async def compare_periods(
+    a_start: date = Query(..., description="基准期开始日期"),
+    a_end: date = Query(..., description="基准期结束日期"),
+    b_start: date = Query(..., description="对比期开始日期"),
+    b_end: date = Query(..., description="对比期结束日期"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    两个时段对比：容量、训练次数、肌群分布、各动作最佳 e1RM
+
+    两个时段在同一次扫描中用条件聚合分别统计（各动作一行）；
+    最佳 e1RM 关联每日最佳 e1RM 表（每个动作每天一行，不会放大训练组行数）。
+    """
+    for start, end in ((a_start, a_end), (b_start, b_end)):
+        if start > end:
+            raise HTTPException(status_code=400, detail="开始日期不能晚于结束日期")
+        if (end - start).days > settings.analytics_query_max_days:
+            raise HTTPException(
+                status_code=400,
+                detail=f"查询区间不能超过 {settings.analytics_query_max_days} 天",
+            )
+
+    in_a = WorkoutSession.date.between(a_start, a_end)
+    in_b = WorkoutSession.date.between(b_start, b_end)
+    volume = WorkoutSet.weight * WorkoutSet.reps
+    result = await db.execute(
+        select(
+            WorkoutSet.exercise_id,
+            func.count(case((in_a, WorkoutSet.id))).label("sets_a"),
+            func.count(case((in_b, WorkoutSet.id))).label("sets_b"),
+            func.sum(case((in_a, WorkoutSet.reps), else_=0)).label("reps_a"),
+            func.sum(case((in_b, WorkoutSet.reps), else_=0)).label("reps_b"),
+            func.sum(case((in_a, volume), else_=0)).label("volume_a"),
+            func.sum(case((in_b, volume), else_=0)).label("volume_b"),
+            func.max(case((in_a, DailyBestE1RM.e1rm))).label("best_e1rm_a"),
+            func.max(case((in_b, DailyBestE1RM.e1rm))).label("best_e1rm_b"),
+        )
+        .select_from(WorkoutSet)
+        .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+        .outerjoin(DailyBestE1RM, and_(
+            DailyBestE1RM.user_id == WorkoutSession.user_id,
+            DailyBestE1RM.exercise_id == WorkoutSet.exercise_id,
+            DailyBestE1RM.date == WorkoutSession.date,
+        ))
+        .where(
+            WorkoutSession.user_id == current_user.id,
+            WorkoutSet.is_flagged == False,
+            or_(in_a, in_b),
+        )
+        .group_by(WorkoutSet.exercise_id)
+    )
+    exercise_stats = result.all()
+
+    # 训练次数按训练课计（与容量统计一致，包含尚未记录训练组的训练课）
+    result = await db.execute(
+        select(
+            func.count(case((in_a, WorkoutSession.id))),
+            func.count(case((in_b, WorkoutSession.id))),
+        ).where(
+            WorkoutSession.user_id == current_user.id,
+            or_(in_a, in_b),
+        )
+    )
+    sessions_a, sessions_b = result.one()
+
+    catalog = await get_catalog(db)
+    user_exercises = await get_user_exercises(db, current_user.id)
+
+    # 动作容量 (动作数 × 2) 乘以 动作 → 肌群权重矩阵 (动作数 × 肌群数)
+    muscles = []
+    if exercise_stats:
+        weights = muscle_weights(catalog, user_exercises, [row.exercise_id for row in exercise_stats])
+        values = np.array([[float(row.volume_a or 0), float(row.volume_b or 0)] for row in exercise_stats])
+        muscle_volumes = values.T @ weights
+        totals = muscle_volumes.sum(axis=1)
+        for index, muscle in enumerate(MUSCLE_GROUPS):
+            volume_a, volume_b = float(muscle_volumes[0, index]), float(muscle_volumes[1, index])
+            if volume_a <= 0 and volume_b <= 0:
+                continue
+            muscles.append(MuscleComparison(
+                muscle_group=muscle,
+                volume_a=round(volume_a, 2),
+                volume_b=round(volume_b, 2),
+                percentage_a=round(volume_a / totals[0] * 100, 1) if totals[0] > 0 else 0,
+                percentage_b=round(volume_b / totals[1] * 100, 1) if totals[1] > 0 else 0,
+                change_percentage=_change_percentage(volume_a, volume_b),
+            ))
+        muscles.sort(key=lambda m: max(m.volume_a, m.volume_b), reverse=True)
+
+    exercises = []
+    for row in exercise_stats:
+        exercise = catalog.exercises.get(row.exercise_id) or user_exercises.exercises.get(row.exercise_id)
+        if not exercise:
+            continue
+        exercises.append(ExerciseComparison(
+            exercise_id=row.exercise_id,
+            exercise_name=exercise.name,
+            sets_a=row.sets_a,
+            sets_b=row.sets_b,
+            volume_a=round(float(row.volume_a or 0), 2),
+            volume_b=round(float(row.volume_b or 0), 2),
+            best_e1rm_a=round(row.best_e1rm_a, 2) if row.best_e1rm_a is not None else None,
+            best_e1rm_b=round(row.best_e1rm_b, 2) if row.best_e1rm_b is not None else None,
+            e1rm_change_percentage=(
+                _change_percentage(row.best_e1rm_a, row.best_e1rm_b)
+                if row.best_e1rm_a is not None and row.best_e1rm_b is not None else None
+            ),
+        ))
+    exercises.sort(key=lambda e: max(e.volume_a, e.volume_b), reverse=True)
+
+    window_a = CompareWindow(
+        start_date=a_start,
+        end_date=a_end,
+        total_sessions=sessions_a,
+        total_sets=sum(row.sets_a for row in exercise_stats),
+        total_reps=int(sum(row.reps_a or 0 for row in exercise_stats)),
+        total_volume=round(sum(float(row.volume_a or 0) for row in exercise_stats), 2),
+    )
+    window_b = CompareWindow(
+        start_date=b_start,
+        end_date=b_end,
+        total_sessions=sessions_b,
+        total_sets=sum(row.sets_b for row in exercise_stats),
+        total_reps=int(sum(row.reps_b or 0 for row in exercise_stats)),
+        total_volume=round(sum(float(row.volume_b or 0) for row in exercise_stats), 2),
+    )
+
+    return CompareResponse(
+        a=window_a,
+        b=window_b,
+        sessions_change=window_b.total_sessions - window_a.total_sessions,
+        sets_change=window_b.total_sets - window_a.total_sets,
+        volume_change=round(window_b.total_volume - window_a.total_volume, 2),
+        volume_change_percentage=_change_percentage(window_a.total_volume, window_b.total_volume),
+        muscles=muscles,
+        exercises=exercises,
+    )
+
+
 @router.get("/progress-report", response_model=ProgressReportResponse)
 async def get_progress_report(
     days: int = Query(90, ge=30, le=365, description="查询天数"),
@@ -288,6 +892,7 @@ async def get_progress_report(
         .join(WorkoutSession)
         .where(and_(
             WorkoutSession.user_id == current_user.id,
+            WorkoutSet.is_flagged == False,
             WorkoutSession.date >= start_date,
         ))
     )
@@ -300,6 +905,7 @@ async def get_progress_report(
         .join(WorkoutSession)
         .where(and_(
             WorkoutSession.user_id == current_user.id,
+            WorkoutSet.is_flagged == False,
             WorkoutSession.date >= start_date,
         ))
         .distinct()
@@ -317,6 +923,7 @@ async def get_progress_report(
             .join(WorkoutSession)
             .where(and_(
                 WorkoutSession.user_id == current_user.id,
+                WorkoutSet.is_flagged == False,
                 WorkoutSet.exercise_id == exercise_id,
                 WorkoutSession.date >= start_date,
             ))
@@ -348,10 +955,10 @@ async def get_progress_report(
         if starting_1rm and current_1rm:
             progress_percentage = round((current_1rm - starting_1rm) / starting_1rm * 100, 1)
 
-            if progress_percentage > 5:
+            if progress_percentage > TREND_THRESHOLD_PERCENT:
                 trend = "improving"
                 improving_count += 1
-            elif progress_percentage < -5:
+            elif progress_percentage < -TREND_THRESHOLD_PERCENT:
                 trend = "declining"
             else:
                 trend = "plateau"
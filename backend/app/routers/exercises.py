@@ -1,18 +1,36 @@
-from typing import Optional
+import heapq
+from bisect import bisect_right
+from itertools import chain, islice
+from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select
 
 from app.database import get_db
 from app.models.exercise import Exercise, MUSCLE_GROUPS, EXERCISE_CATEGORIES, EQUIPMENT_TYPES
 from app.models.user import User
+from app.models.workout import WorkoutSet
 from app.schemas.exercise import (
     ExerciseCreate,
     ExerciseUpdate,
     ExerciseResponse,
     ExerciseListResponse,
+    ExerciseUsageItem,
+    RecentExercisesResponse,
+    LastPerformanceResponse,
+    ExerciseAlternative,
+    ExerciseAlternativesResponse,
 )
+from app.services.exercise_catalog import (
+    find_alternatives,
+    get_catalog,
+    get_user_exercises,
+    scan_alternatives,
+)
+from app.services.exercise_usage import get_recent_usage, get_usage_ranking, get_last_performance
+from app.services.sync import ENTITY_EXERCISE, OP_UPSERT, OP_DELETE, record_changes
 from app.utils.dependencies import get_current_user
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
@@ -22,45 +40,97 @@ async def get_exercises(
     muscle_group: Optional[str] = Query(None, description="按肌群筛选"),
     category: Optional[str] = Query(None, description="按分类筛选 (compound/isolation)"),
     equipment: Optional[str] = Query(None, description="按器械筛选"),
-    search: Optional[str] = Query(None, description="搜索动作名称"),
+    search: Optional[str] = Query(None, description="搜索动作名称（中文 / 拼音 / 首字母 / 英文，按相关度排序）"),
+    sort: str = Query("id", pattern="^(id|usage)$", description="排序：id / usage（常用动作在前，搜索时不生效）"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="游标（传入时忽略 page）"),
+    include_total: bool = Query(True, description="是否返回总数（游标翻页时不计算）"),
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user),
 ):
-    """获取动作列表（预置动作 + 用户自定义动作）"""
-    query = select(Exercise).where(
-        or_(
-            Exercise.is_custom == False,  # 预置动作
-            Exercise.user_id == current_user.id if current_user else False,  # 或用户自己的自定义动作
-        )
-    )
+    """获取动作列表（预置动作 + 用户自定义动作，均由内存索引提供）"""
+    catalog = await get_catalog(db)
+    preset_ids = catalog.filter_ids(muscle_group, category, equipment)
+
+    # 自定义动作只包含用户自己的
+    user_exercises = await get_user_exercises(db, current_user.id) if current_user else None
+    custom_ids = user_exercises.filter_ids(muscle_group, category, equipment) if user_exercises else []
+
+    def lookup(exercise_id: int) -> ExerciseResponse:
+        if exercise_id in catalog.exercises:
+            return catalog.exercises[exercise_id]
+        return user_exercises.exercises[exercise_id]
 
-    # 筛选条件
-    if muscle_group:
-        query = query.where(Exercise.primary_muscle == muscle_group)
-    if category:
-        query = query.where(Exercise.category == category)
-    if equipment:
-        query = query.where(Exercise.equipment == equipment)
     if search:
-        query = query.where(
-            or_(
-                Exercise.name.contains(search),
-                Exercise.name_en.contains(search),
-            )
+        ranked = catalog.search_index.search(search, preset_ids)
+        if user_exercises:
+            ranked += user_exercises.search_index.search(search, custom_ids)
+            ranked.sort(key=lambda hit: -hit[1])
+        return _page_by_position(
+            [exercise_id for exercise_id, _ in ranked], lookup, page, page_size, cursor, include_total,
         )
 
-    # 计算总数
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
-
-    # 分页
-    query = query.order_by(Exercise.id).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    exercises = result.scalars().all()
+    if sort == "usage":
+        # 用过的动作按累计组数在前，其余按 id
+        allowed = set(preset_ids).union(custom_ids)
+        used_ids = [i for i in await get_usage_ranking(db, current_user.id) if i in allowed]
+        used = set(used_ids)
+        rest = (i for i in heapq.merge(preset_ids, custom_ids) if i not in used)
+        return _page_by_position(
+            list(chain(used_ids, rest)), lookup, page, page_size, cursor, include_total,
+        )
 
-    return ExerciseListResponse(total=total, items=exercises)
+    # 总数只在首次请求时计算（内存计数，开销可忽略）
+    total = len(preset_ids) + len(custom_ids) if include_total and cursor is None else None
+
+    # 分页：游标按 id 定位，否则退回 offset
+    offset = 0
+    if cursor is not None:
+        (cursor_id,) = decode_cursor(cursor, (int,))
+        preset_ids = preset_ids[bisect_right(preset_ids, cursor_id):]
+        custom_ids = custom_ids[bisect_right(custom_ids, cursor_id):]
+    else:
+        offset = (page - 1) * page_size
+
+    merged = heapq.merge(preset_ids, custom_ids)
+    exercises = [lookup(i) for i in islice(merged, offset, offset + page_size + 1)]
+
+    next_cursor = None
+    if len(exercises) > page_size:
+        exercises = exercises[:page_size]
+        next_cursor = encode_cursor([exercises[-1].id])
+
+    return ExerciseListResponse(total=total, next_cursor=next_cursor, items=exercises)
+
+
+def _page_by_position(
+    ordered_ids: List[int],
+    lookup,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    include_total: bool,
+) -> ExerciseListResponse:
+    """对已排序的结果分页（相关度 / 常用排序），游标为结果中的位置"""
+    total = len(ordered_ids) if include_total and cursor is None else None
+
+    if cursor is not None:
+        (offset,) = decode_cursor(cursor, (int,))
+    else:
+        offset = (page - 1) * page_size
+
+    page_ids = ordered_ids[offset:offset + page_size + 1]
+    next_cursor = None
+    if len(page_ids) > page_size:
+        page_ids = page_ids[:page_size]
+        next_cursor = encode_cursor([offset + page_size])
+
+    return ExerciseListResponse(
+        total=total,
+        next_cursor=next_cursor,
+        items=[lookup(exercise_id) for exercise_id in page_ids],
+    )
 
 
 @router.get("/muscle-groups")
@@ -75,6 +145,33 @@ async def get_equipment_types():
     return {"equipment_types": EQUIPMENT_TYPES}
 
 
+@router.get("/recent", response_model=RecentExercisesResponse)
+async def get_recent_exercises(
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """最近使用的动作（读取使用统计表，按最近训练日期倒序）"""
+    usages = await get_recent_usage(db, current_user.id, limit)
+
+    catalog = await get_catalog(db)
+    user_exercises = None
+    items = []
+    for usage in usages:
+        exercise = catalog.exercises.get(usage.exercise_id)
+        if exercise is None:
+            user_exercises = user_exercises or await get_user_exercises(db, current_user.id)
+            exercise = user_exercises.exercises.get(usage.exercise_id)
+        if exercise is not None:
+            items.append(ExerciseUsageItem(
+                exercise=exercise,
+                use_count=usage.use_count,
+                last_used=usage.last_used,
+            ))
+
+    return RecentExercisesResponse(items=items)
+
+
 @router.get("/{exercise_id}", response_model=ExerciseResponse)
 async def get_exercise(
     exercise_id: int,
@@ -82,6 +179,10 @@ async def get_exercise(
     current_user: Optional[User] = Depends(get_current_user),
 ):
     """获取单个动作详情"""
+    catalog = await get_catalog(db)
+    if exercise_id in catalog.exercises:
+        return catalog.exercises[exercise_id]
+
     result = await db.execute(select(Exercise).where(Exercise.id == exercise_id))
     exercise = result.scalar_one_or_none()
 
@@ -101,6 +202,55 @@ async def get_exercise(
     return exercise
 
 
+@router.get("/{exercise_id}/last-performance", response_model=LastPerformanceResponse)
+async def get_exercise_last_performance(
+    exercise_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """上次表现：最近一次训练中该动作的训练组（添加动作时自动填充用）"""
+    return await get_last_performance(db, current_user.id, current_user.data_version, exercise_id)
+
+
+@router.get("/{exercise_id}/alternatives", response_model=ExerciseAlternativesResponse)
+async def get_exercise_alternatives(
+    exercise_id: int,
+    equipment: Optional[str] = Query(None, description="只推荐这些器械的动作，多个用逗号分隔"),
+    limit: int = Query(10, ge=1, le=30),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """替代动作推荐（按肌群 / 分类 / 器械 / 难度相似度排序，读取预先计算的邻居列表，按器械筛选不足时逐个打分）"""
+    catalog = await get_catalog(db)
+    user_exercises = await get_user_exercises(db, current_user.id)
+    if exercise_id not in catalog.exercises and exercise_id not in user_exercises.exercises:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="动作不存在",
+        )
+
+    allowed_equipment = {e.strip() for e in equipment.split(",") if e.strip()} if equipment else None
+
+    def collect(hits):
+        items = []
+        for alternative_id, score in hits:
+            exercise = catalog.exercises.get(alternative_id) or user_exercises.exercises.get(alternative_id)
+            if exercise is None or (allowed_equipment and exercise.equipment not in allowed_equipment):
+                continue
+            items.append(ExerciseAlternative(exercise=exercise, similarity=score))
+            if len(items) >= limit:
+                break
+        return items
+
+    items = collect(find_alternatives(catalog, user_exercises, exercise_id))
+    # 邻居列表只保留 top-k，筛选后不足 limit 时可能漏掉该器械的动作，改为逐个打分
+    # （足够时被截掉的动作相似度都更低，结果不变）
+    if allowed_equipment and len(items) < limit:
+        items = collect(scan_alternatives(catalog, user_exercises, exercise_id, allowed_equipment))
+
+    return ExerciseAlternativesResponse(exercise_id=exercise_id, items=items)
+
+
 @router.post("", response_model=ExerciseResponse, status_code=status.HTTP_201_CREATED)
 async def create_exercise(
     exercise_create: ExerciseCreate,
@@ -129,6 +279,7 @@ async def create_exercise(
     )
     db.add(exercise)
     await db.flush()
+    await record_changes(db, current_user.id, [(ENTITY_EXERCISE, exercise.id, OP_UPSERT)])
     await db.refresh(exercise)
 
     return exercise
@@ -164,6 +315,7 @@ async def update_exercise(
         setattr(exercise, field, value)
 
     await db.flush()
+    await record_changes(db, current_user.id, [(ENTITY_EXERCISE, exercise.id, OP_UPSERT)])
     await db.refresh(exercise)
 
     return exercise
@@ -192,4 +344,15 @@ async def delete_exercise(
             detail="无权限删除此动作",
         )
 
+    # 训练组外键不级联，已被使用的动作不能删除
+    result = await db.execute(
+        select(WorkoutSet.id).where(WorkoutSet.exercise_id == exercise_id).limit(1)
+    )
+    if result.scalar_one_or_none() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="动作已被训练记录使用，无法删除",
+        )
+
     await db.delete(exercise)
+    await record_changes(db, current_user.id, [(ENTITY_EXERCISE, exercise_id, OP_DELETE)])
@@ -0,0 +1,289 @@
+from typing import Dict, Set, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import get_db
+from app.models.user import User
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.models.exercise import Exercise
+from app.models.sync import ChangeLog, IdempotencyKey
+from app.routers import workouts, exercises
+from app.schemas.exercise import ExerciseCreate, ExerciseUpdate
+from app.schemas.workout import (
+    WorkoutSessionCreate,
+    WorkoutSessionUpdate,
+    WorkoutSetCreate,
+    WorkoutSetUpdate,
+)
+from app.schemas.sync import (
+    SyncTombstone,
+    SyncPullResponse,
+    SyncMutation,
+    SyncPushRequest,
+    SyncMutationResult,
+    SyncPushResponse,
+)
+from app.services.sync import (
+    ENTITY_SESSION,
+    ENTITY_SET,
+    ENTITY_EXERCISE,
+    OP_DELETE,
+    get_idempotent_entity,
+    save_idempotency_key,
+)
+from app.utils.dependencies import get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncPullResponse)
+async def pull_changes(
+    since: int = Query(0, ge=0, description="客户端已同步到的版本号，0 表示全量"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """增量拉取 since 之后的变更（含删除墓碑）"""
+    version = current_user.data_version
+
+    # 全量快照：首次同步，或客户端版本比服务端新（如数据库重建）
+    if since == 0 or since > version:
+        result = await db.execute(
+            select(WorkoutSession).where(WorkoutSession.user_id == current_user.id)
+        )
+        sessions = result.scalars().all()
+        result = await db.execute(
+            select(WorkoutSet)
+            .join(WorkoutSession)
+            .where(WorkoutSession.user_id == current_user.id)
+        )
+        sets = result.scalars().all()
+        result = await db.execute(
+            select(Exercise).where(and_(
+                Exercise.is_custom == True,
+                Exercise.user_id == current_user.id,
+            ))
+        )
+        custom_exercises = result.scalars().all()
+        return SyncPullResponse(
+            version=version,
+            full=True,
+            sessions=sessions,
+            sets=sets,
+            exercises=custom_exercises,
+        )
+
+    # 同一实体只保留最后一次变更
+    result = await db.execute(
+        select(ChangeLog.entity_type, ChangeLog.entity_id, ChangeLog.op)
+        .where(and_(
+            ChangeLog.user_id == current_user.id,
+            ChangeLog.version > since,
+        ))
+        .order_by(ChangeLog.version, ChangeLog.id)
+    )
+    latest: Dict[Tuple[str, int], str] = {}
+    for entity_type, entity_id, op in result.all():
+        latest[(entity_type, entity_id)] = op
+
+    upserts: Dict[str, Set[int]] = {ENTITY_SESSION: set(), ENTITY_SET: set(), ENTITY_EXERCISE: set()}
+    deleted = []
+    for (entity_type, entity_id), op in latest.items():
+        if op == OP_DELETE:
+            deleted.append(SyncTombstone(entity_type=entity_type, entity_id=entity_id))
+        else:
+            upserts[entity_type].add(entity_id)
+
+    sessions, sets, custom_exercises = [], [], []
+    if upserts[ENTITY_SESSION]:
+        result = await db.execute(
+            select(WorkoutSession).where(and_(
+                WorkoutSession.user_id == current_user.id,
+                WorkoutSession.id.in_(upserts[ENTITY_SESSION]),
+            ))
+        )
+        sessions = result.scalars().all()
+    if upserts[ENTITY_SET]:
+        result = await db.execute(
+            select(WorkoutSet)
+            .join(WorkoutSession)
+            .where(and_(
+                WorkoutSession.user_id == current_user.id,
+                WorkoutSet.id.in_(upserts[ENTITY_SET]),
+            ))
+        )
+        sets = result.scalars().all()
+    if upserts[ENTITY_EXERCISE]:
+        result = await db.execute(
+            select(Exercise).where(and_(
+                Exercise.user_id == current_user.id,
+                Exercise.id.in_(upserts[ENTITY_EXERCISE]),
+            ))
+        )
+        custom_exercises = result.scalars().all()
+
+    # 已随训练课级联删除的实体也作为墓碑返回
+    found = {
+        ENTITY_SESSION: {s.id for s in sessions},
+        ENTITY_SET: {s.id for s in sets},
+        ENTITY_EXERCISE: {e.id for e in custom_exercises},
+    }
+    for entity_type, ids in upserts.items():
+        for entity_id in sorted(ids - found[entity_type]):
+            deleted.append(SyncTombstone(entity_type=entity_type, entity_id=entity_id))
+
+    return SyncPullResponse(
+        version=version,
+        full=False,
+        sessions=sessions,
+        sets=sets,
+        exercises=custom_exercises,
+        deleted=deleted,
+    )
+
+
+@router.post("", response_model=SyncPushResponse)
+async def push_changes(
+    push: SyncPushRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """批量提交离线写操作（按幂等键去重，单个操作失败不影响其他操作）"""
+    keys = {m.idempotency_key for m in push.mutations}
+    result = await db.execute(
+        select(IdempotencyKey.key, IdempotencyKey.entity_id).where(and_(
+            IdempotencyKey.user_id == current_user.id,
+            IdempotencyKey.key.in_(keys),
+        ))
+    )
+    processed: Dict[str, int] = dict(result.all())
+
+    results = []
+    for mutation in push.mutations:
+        key = mutation.idempotency_key
+        if key in processed:
+            results.append(SyncMutationResult(
+                idempotency_key=key,
+                status="duplicate",
+                entity_id=processed[key],
+            ))
+            continue
+
+        try:
+            async with db.begin_nested():
+                entity_id = await _apply_mutation(db, current_user, mutation, processed)
+                await save_idempotency_key(db, current_user.id, key, mutation.entity_type, entity_id)
+        except (HTTPException, ValidationError, SQLAlchemyError) as e:
+            # 保存点已回滚，只影响该操作；回滚会使用户对象过期，重新加载供后续操作使用
+            await db.refresh(current_user)
+            results.append(SyncMutationResult(idempotency_key=key, status="error", detail=_error_detail(e)))
+            continue
+
+        processed[key] = entity_id
+        results.append(SyncMutationResult(idempotency_key=key, status="applied", entity_id=entity_id))
+
+    await db.refresh(current_user)
+    return SyncPushResponse(version=current_user.data_version, results=results)
+
+
+def _error_detail(e: Exception):
+    """单个操作失败的原因（与对应接口的错误响应一致）"""
+    if isinstance(e, HTTPException):
+        return e.detail
+    if isinstance(e, ValidationError):
+        return e.errors(include_url=False, include_context=False)
+    # 约束冲突等数据库错误
+    return f"数据写入失败: {getattr(e, 'orig', None) or e.__class__.__name__}"
+
+
+async def _apply_mutation(
+    db: AsyncSession,
+    user: User,
+    mutation: SyncMutation,
+    processed: Dict[str, int],
+) -> int:
+    """复用各写接口执行单个离线操作，返回实体 ID"""
+    if mutation.op == "create":
+        entity_id = None
+    else:
+        entity_id = _require(mutation.entity_id, "entity_id")
+
+    if mutation.entity_type == ENTITY_SESSION:
+        if mutation.op == "create":
+            session = await workouts.create_workout_session(
+                WorkoutSessionCreate.model_validate(mutation.data),
+                idempotency_key=None,
+                db=db,
+                current_user=user,
+            )
+            return session.id
+        if mutation.op == "update":
+            await workouts.update_workout_session(
+                entity_id, WorkoutSessionUpdate.model_validate(mutation.data), db=db, current_user=user
+            )
+        else:
+            await workouts.delete_workout_session(entity_id, db=db, current_user=user)
+        return entity_id
+
+    if mutation.entity_type == ENTITY_SET:
+        session_id = await _resolve_session_id(db, user, mutation, processed)
+        if mutation.op == "create":
+            workout_set = await workouts.add_workout_set(
+                session_id, WorkoutSetCreate.model_validate(mutation.data), db=db, current_user=user
+            )
+            return workout_set.id
+        if mutation.op == "update":
+            await workouts.update_workout_set(
+                session_id, entity_id, WorkoutSetUpdate.model_validate(mutation.data), db=db, current_user=user
+            )
+        else:
+            await workouts.delete_workout_set(session_id, entity_id, db=db, current_user=user)
+        return entity_id
+
+    if mutation.op == "create":
+        exercise = await exercises.create_exercise(
+            ExerciseCreate.model_validate(mutation.data), db=db, current_user=user
+        )
+        return exercise.id
+    if mutation.op == "update":
+        await exercises.update_exercise(
+            entity_id, ExerciseUpdate.model_validate(mutation.data), db=db, current_user=user
+        )
+    else:
+        await exercises.delete_exercise(entity_id, db=db, current_user=user)
+    return entity_id
+
+
+async def _resolve_session_id(
+    db: AsyncSession,
+    user: User,
+    mutation: SyncMutation,
+    processed: Dict[str, int],
+) -> int:
+    """训练组所属训练课：直接给出 ID，或引用离线创建训练课的幂等键"""
+    if mutation.session_id is not None:
+        return mutation.session_id
+
+    session_key = _require(mutation.session_key, "session_id 或 session_key")
+    if session_key in processed:
+        return processed[session_key]
+
+    record = await get_idempotent_entity(db, user.id, session_key)
+    if not record or record.entity_type != ENTITY_SESSION:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="训练记录不存在",
+        )
+    return record.entity_id
+
+
+def _require(value, name: str):
+    """校验离线操作的必填字段"""
+    if value is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"缺少字段: {name}",
+        )
+    return value
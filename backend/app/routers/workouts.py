@@ -1,9 +1,11 @@
+from dataclasses import replace
 from datetime import date
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Optional, List, Dict
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, and_, or_, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, contains_eager
 
 from app.database import get_db
 from app.models.user import User
@@ -14,14 +16,33 @@ from app.schemas.workout import (
     WorkoutSessionUpdate,
     WorkoutSessionResponse,
     WorkoutSessionDetailResponse,
+    WorkoutSessionCreateResponse,
     WorkoutSessionListResponse,
+    WorkoutSessionListItem,
+    WorkoutSessionSummary,
+    SessionExerciseSummary,
     WorkoutSetCreate,
     WorkoutSetUpdate,
     WorkoutSetResponse,
+    WorkoutSetCreateResponse,
+    WorkoutSetBatchRequest,
     WorkoutTemplateCreate,
     WorkoutFromTemplateCreate,
 )
+from app.services.exercise_catalog import find_unavailable_exercise_ids
+from app.services.set_events import SetSnapshot, load_set_snapshots, apply_set_changes
+from app.services.sync import (
+    ENTITY_SESSION,
+    ENTITY_SET,
+    OP_UPSERT,
+    OP_DELETE,
+    record_changes,
+    record_deletes_from_select,
+    get_idempotent_entity,
+    save_idempotency_key,
+)
 from app.utils.dependencies import get_current_user
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
@@ -32,10 +53,13 @@ async def get_workout_sessions(
     end_date: Optional[date] = Query(None, description="结束日期"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="游标（传入时忽略 page）"),
+    include_total: bool = Query(True, description="是否返回总数（游标翻页时不计算）"),
+    summary: bool = Query(False, description="是否附带每次训练的组数/容量/动作汇总"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """获取训练记录列表"""
+    """获取训练记录列表（按日期倒序，支持游标分页）"""
     query = select(WorkoutSession).where(WorkoutSession.user_id == current_user.id)
 
     # 日期筛选
@@ -44,55 +68,160 @@ async def get_workout_sessions(
     if end_date:
         query = query.where(WorkoutSession.date <= end_date)
 
-    # 计算总数
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    # 总数只在首次请求时计算，后续游标翻页保持常数开销
+    total = None
+    if include_total and cursor is None:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = (await db.execute(count_query)).scalar()
+
+    # 分页：游标按 (date, id) 定位，否则退回 offset
+    if cursor is not None:
+        cursor_date, cursor_id = decode_cursor(cursor, (date.fromisoformat, int))
+        query = query.where(or_(
+            WorkoutSession.date < cursor_date,
+            and_(WorkoutSession.date == cursor_date, WorkoutSession.id < cursor_id),
+        ))
+    else:
+        query = query.offset((page - 1) * page_size)
 
-    # 分页
-    query = query.order_by(WorkoutSession.date.desc()).offset((page - 1) * page_size).limit(page_size)
+    query = query.order_by(WorkoutSession.date.desc(), WorkoutSession.id.desc()).limit(page_size + 1)
     result = await db.execute(query)
     sessions = result.scalars().all()
 
-    return WorkoutSessionListResponse(total=total, items=sessions)
+    next_cursor = None
+    if len(sessions) > page_size:
+        sessions = sessions[:page_size]
+        last = sessions[-1]
+        next_cursor = encode_cursor([last.date.isoformat(), last.id])
+
+    items = [WorkoutSessionListItem.model_validate(s) for s in sessions]
+    if summary and items:
+        summaries = await _summarize_sessions(db, [item.id for item in items])
+        for item in items:
+            item.summary = summaries.get(item.id, WorkoutSessionSummary())
+
+    return WorkoutSessionListResponse(total=total, next_cursor=next_cursor, items=items)
+
+
+async def _summarize_sessions(db: AsyncSession, session_ids: List[int]) -> Dict[int, WorkoutSessionSummary]:
+    """一次分组查询汇总多个训练课（按 训练课 × 动作 分组）"""
+    result = await db.execute(
+        select(
+            WorkoutSet.session_id,
+            WorkoutSet.exercise_id,
+            Exercise.name,
+            func.count(WorkoutSet.id).label("total_sets"),
+            func.sum(WorkoutSet.reps).label("total_reps"),
+            func.sum(WorkoutSet.weight * WorkoutSet.reps).label("total_volume"),
+            func.min(WorkoutSet.set_order).label("first_order"),
+        )
+        .join(Exercise, WorkoutSet.exercise_id == Exercise.id)
+        .where(WorkoutSet.session_id.in_(session_ids))
+        .group_by(WorkoutSet.session_id, WorkoutSet.exercise_id, Exercise.name)
+        .order_by(WorkoutSet.session_id, func.min(WorkoutSet.set_order))
+    )
+
+    summaries: Dict[int, WorkoutSessionSummary] = {}
+    for row in result.all():
+        summary = summaries.setdefault(row.session_id, WorkoutSessionSummary())
+        volume = float(row.total_volume or 0)
+        summary.total_sets += row.total_sets
+        summary.total_reps += row.total_reps or 0
+        summary.total_volume = round(summary.total_volume + volume, 2)
+        summary.exercises.append(SessionExerciseSummary(
+            exercise_id=row.exercise_id,
+            exercise_name=row.name,
+            total_sets=row.total_sets,
+            total_reps=row.total_reps or 0,
+            total_volume=round(volume, 2),
+        ))
+
+    return summaries
+
+
+async def _get_idempotent_session(db: AsyncSession, session_id: int) -> WorkoutSession:
+    """幂等键对应的已创建训练记录（含训练组）"""
+    result = await db.execute(
+        select(WorkoutSession)
+        .options(selectinload(WorkoutSession.sets))
+        .where(WorkoutSession.id == session_id)
+    )
+    session = result.scalar_one_or_none()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="训练记录不存在",
+        )
+    return session
 
 
-@router.post("", response_model=WorkoutSessionDetailResponse, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=WorkoutSessionCreateResponse, status_code=status.HTTP_201_CREATED)
 async def create_workout_session(
     session_create: WorkoutSessionCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=100, description="客户端幂等键，重试时返回首次创建的记录"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """创建训练记录（含训练组）"""
-    # 验证所有动作是否存在
-    exercise_ids = list(set(s.exercise_id for s in session_create.sets))
+    # 幂等：同一个键只创建一次
+    if idempotency_key:
+        processed = await get_idempotent_entity(db, current_user.id, idempotency_key)
+        if processed:
+            return await _get_idempotent_session(db, processed.entity_id)
+
+    # 验证所有动作是否存在（预置动作或自己的自定义动作，走内存缓存）
+    exercise_ids = {s.exercise_id for s in session_create.sets}
     if exercise_ids:
-        result = await db.execute(select(Exercise).where(Exercise.id.in_(exercise_ids)))
-        exercises = result.scalars().all()
-        found_ids = {e.id for e in exercises}
-        missing_ids = set(exercise_ids) - found_ids
+        missing_ids = await find_unavailable_exercise_ids(db, current_user.id, exercise_ids)
         if missing_ids:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"动作不存在: {missing_ids}",
             )
 
-    # 创建训练课
-    session = WorkoutSession(
-        **session_create.model_dump(exclude={"sets"}),
-        user_id=current_user.id,
-    )
-    db.add(session)
-    await db.flush()  # 获取 session.id
-
-    # 创建训练组
-    for set_data in session_create.sets:
-        workout_set = WorkoutSet(
-            **set_data.model_dump(),
-            session_id=session.id,
+    # 在保存点内创建：并发请求使用同一个幂等键时，后写入的一方只回滚自己的创建
+    # （回滚会使当前用户对象过期，提前取出 ID）
+    user_id = current_user.id
+    try:
+        async with db.begin_nested():
+            # 创建训练课
+            session = WorkoutSession(
+                **session_create.model_dump(exclude={"sets"}),
+                user_id=current_user.id,
+            )
+            db.add(session)
+            await db.flush()  # 获取 session.id
+
+            # 创建训练组
+            new_sets = []
+            for set_data in session_create.sets:
+                workout_set = WorkoutSet(
+                    **set_data.model_dump(),
+                    session_id=session.id,
+                )
+                db.add(workout_set)
+                new_sets.append(workout_set)
+
+            await db.flush()
+            changes = await apply_set_changes(
+                db, current_user.id, added=[SetSnapshot.from_set(s, session.date) for s in new_sets]
+            )
+
+            await record_changes(
+                db,
+                current_user.id,
+                [(ENTITY_SESSION, session.id, OP_UPSERT)] + [(ENTITY_SET, s.id, OP_UPSERT) for s in new_sets],
+            )
+            if idempotency_key:
+                await save_idempotency_key(db, current_user.id, idempotency_key, ENTITY_SESSION, session.id)
+    except IntegrityError:
+        processed = (
+            await get_idempotent_entity(db, user_id, idempotency_key) if idempotency_key else None
         )
-        db.add(workout_set)
+        if not processed:
+            raise
+        return await _get_idempotent_session(db, processed.entity_id)
 
-    await db.flush()
     await db.refresh(session)
 
     # 重新查询以加载关联
@@ -103,7 +232,41 @@ async def create_workout_session(
     )
     session = result.scalar_one()
 
-    return session
+    response = WorkoutSessionCreateResponse.model_validate(session)
+    response.new_records = changes.new_records
+    response.flagged_sets = changes.flagged_sets
+    return response
+
+
+@router.delete("")
+async def delete_workout_sessions_in_range(
+    start_date: date = Query(..., description="开始日期"),
+    end_date: date = Query(..., description="结束日期"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """按日期范围批量删除训练记录（训练组由数据库级联删除）"""
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="开始日期不能晚于结束日期",
+        )
+
+    in_range = and_(
+        WorkoutSession.user_id == current_user.id,
+        WorkoutSession.date >= start_date,
+        WorkoutSession.date <= end_date,
+    )
+
+    # 墓碑记录只记训练课，客户端删除训练课时一并删除其训练组
+    await record_deletes_from_select(
+        db, current_user.id, ENTITY_SESSION, select(WorkoutSession.id).where(in_range)
+    )
+    removed_sets = await load_set_snapshots(db, in_range)
+    result = await db.execute(delete(WorkoutSession).where(in_range))
+    await apply_set_changes(db, current_user.id, removed=removed_sets)
+
+    return {"deleted": result.rowcount}
 
 
 @router.get("/{session_id}", response_model=WorkoutSessionDetailResponse)
@@ -159,11 +322,24 @@ async def update_workout_session(
         )
 
     # 更新字段
+    old_date = session.date
     update_data = session_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(session, field, value)
 
     await db.flush()
+
+    # 日期变化时训练组按「旧日期删除 + 新日期新增」更新统计
+    if session.date != old_date:
+        moved_sets = await load_set_snapshots(db, WorkoutSet.session_id == session.id)
+        await apply_set_changes(
+            db,
+            current_user.id,
+            added=moved_sets,
+            removed=[replace(s, date=old_date) for s in moved_sets],
+        )
+
+    await record_changes(db, current_user.id, [(ENTITY_SESSION, session.id, OP_UPSERT)])
     await db.refresh(session)
 
     return session
@@ -191,12 +367,16 @@ async def delete_workout_session(
             detail="无权限删除此训练记录",
         )
 
-    await db.delete(session)
+    # 训练组由外键 ON DELETE CASCADE 删除，无需逐行加载 ORM 对象
+    removed_sets = await load_set_snapshots(db, WorkoutSet.session_id == session_id)
+    await db.execute(delete(WorkoutSession).where(WorkoutSession.id == session_id))
+    await apply_set_changes(db, current_user.id, removed=removed_sets)
+    await record_changes(db, current_user.id, [(ENTITY_SESSION, session_id, OP_DELETE)])
 
 
 # ===== 训练组操作 =====
 
-@router.post("/{session_id}/sets", response_model=WorkoutSetResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/{session_id}/sets", response_model=WorkoutSetCreateResponse, status_code=status.HTTP_201_CREATED)
 async def add_workout_set(
     session_id: int,
     set_create: WorkoutSetCreate,
@@ -220,8 +400,7 @@ async def add_workout_set(
         )
 
     # 验证动作存在
-    result = await db.execute(select(Exercise).where(Exercise.id == set_create.exercise_id))
-    if not result.scalar_one_or_none():
+    if await find_unavailable_exercise_ids(db, current_user.id, [set_create.exercise_id]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="动作不存在",
@@ -230,9 +409,16 @@ async def add_workout_set(
     workout_set = WorkoutSet(**set_create.model_dump(), session_id=session_id)
     db.add(workout_set)
     await db.flush()
+    changes = await apply_set_changes(
+        db, current_user.id, added=[SetSnapshot.from_set(workout_set, session.date)]
+    )
+    await record_changes(db, current_user.id, [(ENTITY_SET, workout_set.id, OP_UPSERT)])
     await db.refresh(workout_set)
 
-    return workout_set
+    response = WorkoutSetCreateResponse.model_validate(workout_set)
+    response.new_records = changes.new_records
+    response.flagged_sets = changes.flagged_sets
+    return response
 
 
 @router.put("/{session_id}/sets/{set_id}", response_model=WorkoutSetResponse)
@@ -247,6 +433,7 @@ async def update_workout_set(
     result = await db.execute(
         select(WorkoutSet)
         .join(WorkoutSession)
+        .options(contains_eager(WorkoutSet.session))
         .where(and_(WorkoutSet.id == set_id, WorkoutSet.session_id == session_id))
     )
     workout_set = result.scalar_one_or_none()
@@ -263,11 +450,27 @@ async def update_workout_set(
             detail="无权限修改此训练组",
         )
 
+    if set_update.exercise_id is not None:
+        if await find_unavailable_exercise_ids(db, current_user.id, [set_update.exercise_id]):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="动作不存在",
+            )
+
+    session_date = workout_set.session.date
+    before = SetSnapshot.from_set(workout_set, session_date)
     update_data = set_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(workout_set, field, value)
 
     await db.flush()
+    await apply_set_changes(
+        db,
+        current_user.id,
+        added=[SetSnapshot.from_set(workout_set, session_date)],
+        removed=[before],
+    )
+    await record_changes(db, current_user.id, [(ENTITY_SET, workout_set.id, OP_UPSERT)])
     await db.refresh(workout_set)
 
     return workout_set
@@ -284,6 +487,7 @@ async def delete_workout_set(
     result = await db.execute(
         select(WorkoutSet)
         .join(WorkoutSession)
+        .options(contains_eager(WorkoutSet.session))
         .where(and_(WorkoutSet.id == set_id, WorkoutSet.session_id == session_id))
     )
     workout_set = result.scalar_one_or_none()
@@ -300,7 +504,157 @@ async def delete_workout_set(
             detail="无权限删除此训练组",
         )
 
+    removed = SetSnapshot.from_set(workout_set, workout_set.session.date)
     await db.delete(workout_set)
+    await db.flush()
+    await apply_set_changes(db, current_user.id, removed=[removed])
+    await record_changes(db, current_user.id, [(ENTITY_SET, set_id, OP_DELETE)])
+
+
+@router.post("/{session_id}/sets/{set_id}/confirm", response_model=WorkoutSetCreateResponse)
+async def confirm_workout_set(
+    session_id: int,
+    set_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """确认疑似录入错误的训练组（数据无误），之后按正常训练组计入统计分析"""
+    result = await db.execute(
+        select(WorkoutSet)
+        .join(WorkoutSession)
+        .options(contains_eager(WorkoutSet.session))
+        .where(and_(WorkoutSet.id == set_id, WorkoutSet.session_id == session_id))
+    )
+    workout_set = result.scalar_one_or_none()
+
+    if not workout_set:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="训练组不存在",
+        )
+
+    if workout_set.session.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权限修改此训练组",
+        )
+
+    if not workout_set.is_flagged:
+        return workout_set
+
+    changes = await apply_set_changes(
+        db,
+        current_user.id,
+        added=[SetSnapshot.from_set(workout_set, workout_set.session.date)],
+        screen=False,
+    )
+    await record_changes(db, current_user.id, [(ENTITY_SET, workout_set.id, OP_UPSERT)])
+    await db.refresh(workout_set)
+
+    response = WorkoutSetCreateResponse.model_validate(workout_set)
+    response.new_records = changes.new_records
+    return response
+
+
+@router.patch("/{session_id}/sets", response_model=WorkoutSessionCreateResponse)
+async def batch_edit_workout_sets(
+    session_id: int,
+    batch: WorkoutSetBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """批量编辑训练组（新增 / 更新 / 删除 / 调整顺序，单事务完成）"""
+    result = await db.execute(select(WorkoutSession).where(WorkoutSession.id == session_id))
+    session = result.scalar_one_or_none()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="训练记录不存在",
+        )
+
+    if session.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权限修改此训练记录",
+        )
+
+    update_ids = [item.id for item in batch.update]
+    delete_ids = set(batch.delete)
+    if len(update_ids) != len(set(update_ids)) or delete_ids & set(update_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="同一训练组在一次请求中只能出现一次",
+        )
+
+    # 验证待更新/删除的训练组都属于该训练课
+    target_ids = set(update_ids) | delete_ids
+    if target_ids:
+        result = await db.execute(
+            select(WorkoutSet.id).where(and_(
+                WorkoutSet.session_id == session_id,
+                WorkoutSet.id.in_(target_ids),
+            ))
+        )
+        missing_ids = target_ids - set(result.scalars().all())
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"训练组不存在: {missing_ids}",
+            )
+
+    # 验证所有动作是否存在
+    exercise_ids = {s.exercise_id for s in batch.create}
+    exercise_ids |= {item.exercise_id for item in batch.update if item.exercise_id is not None}
+    if exercise_ids:
+        missing_ids = await find_unavailable_exercise_ids(db, current_user.id, exercise_ids)
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"动作不存在: {missing_ids}",
+            )
+
+    # 批量执行：删除 → 更新 → 新增
+    removed_sets = await load_set_snapshots(db, WorkoutSet.id.in_(target_ids)) if target_ids else []
+    if delete_ids:
+        await db.execute(delete(WorkoutSet).where(WorkoutSet.id.in_(delete_ids)))
+    if batch.update:
+        await db.execute(
+            update(WorkoutSet),
+            [item.model_dump(exclude_unset=True) for item in batch.update],
+        )
+    created_ids = []
+    if batch.create:
+        result = await db.execute(
+            insert(WorkoutSet).returning(WorkoutSet.id),
+            [{**s.model_dump(), "session_id": session_id} for s in batch.create],
+        )
+        created_ids = list(result.scalars().all())
+
+    changed_ids = update_ids + created_ids
+    added_sets = await load_set_snapshots(db, WorkoutSet.id.in_(changed_ids)) if changed_ids else []
+    changes = await apply_set_changes(db, current_user.id, added=added_sets, removed=removed_sets)
+
+    await record_changes(
+        db,
+        current_user.id,
+        [(ENTITY_SET, set_id, OP_DELETE) for set_id in delete_ids]
+        + [(ENTITY_SET, set_id, OP_UPSERT) for set_id in changed_ids],
+    )
+
+    # 重新查询以加载关联
+    result = await db.execute(
+        select(WorkoutSession)
+        .options(selectinload(WorkoutSession.sets))
+        .where(WorkoutSession.id == session_id)
+        .execution_options(populate_existing=True)
+    )
+    session = result.scalar_one()
+
+    response = WorkoutSessionCreateResponse.model_validate(session)
+    response.new_records = changes.new_records
+    response.flagged_sets = changes.flagged_sets
+    return response
 
 
 # ===== 模板功能 =====
@@ -330,11 +684,12 @@ async def save_as_template(
 
     session.template_name = template.template_name
     await db.flush()
+    await record_changes(db, current_user.id, [(ENTITY_SESSION, session.id, OP_UPSERT)])
 
     return {"message": "模板保存成功", "template_name": template.template_name}
 
 
-@router.post("/from-template", response_model=WorkoutSessionDetailResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/from-template", response_model=WorkoutSessionCreateResponse, status_code=status.HTTP_201_CREATED)
 async def create_from_template(
     template_create: WorkoutFromTemplateCreate,
     db: AsyncSession = Depends(get_db),
@@ -370,6 +725,7 @@ async def create_from_template(
     await db.flush()
 
     # 复制训练组
+    new_sets = []
     for old_set in template_session.sets:
         new_set = WorkoutSet(
             session_id=new_session.id,
@@ -383,8 +739,17 @@ async def create_from_template(
             notes=old_set.notes,
         )
         db.add(new_set)
+        new_sets.append(new_set)
 
     await db.flush()
+    changes = await apply_set_changes(
+        db, current_user.id, added=[SetSnapshot.from_set(s, new_session.date) for s in new_sets]
+    )
+    await record_changes(
+        db,
+        current_user.id,
+        [(ENTITY_SESSION, new_session.id, OP_UPSERT)] + [(ENTITY_SET, s.id, OP_UPSERT) for s in new_sets],
+    )
 
     # 重新查询以加载关联
     result = await db.execute(
@@ -394,7 +759,10 @@ async def create_from_template(
     )
     new_session = result.scalar_one()
 
-    return new_session
+    response = WorkoutSessionCreateResponse.model_validate(new_session)
+    response.new_records = changes.new_records
+    response.flagged_sets = changes.flagged_sets
+    return response
 
 
 @router.get("/templates/list")
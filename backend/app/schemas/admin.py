@@ -0,0 +1,18 @@
+from typing import Optional, List
+from pydantic import BaseModel
+
+
+class FleetExerciseStats(BaseModel):
+    """单个动作的全站统计（估计值）"""
+    exercise_id: int
+    exercise_name: str
+    distinct_users: int  # 使用人数（HyperLogLog 估计）
+    total_volume: float  # 训练容量 weight × reps（Count-Min Sketch 估计，偏大不偏小）
+
+
+class FleetExerciseStatsResponse(BaseModel):
+    """全站动作统计响应"""
+    month: Optional[str] = None  # 为空表示全部月份
+    users_relative_error: float  # 使用人数的相对标准误差
+    volume_error_bound: float  # 容量估计的加性误差上界
+    items: List[FleetExerciseStats]
@@ -1,6 +1,6 @@
 from datetime import date
-from typing import Optional, List, Dict
-from pydantic import BaseModel
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel, Field
 
 
 # ===== 1RM 分析 =====
@@ -66,7 +66,7 @@ class VolumeStatsResponse(BaseModel):
 class MuscleVolumePoint(BaseModel):
     """肌群容量数据点"""
     muscle_group: str
-    total_sets: int
+    total_sets: float  # 辅助肌群按比例计入，可能为小数
     total_volume: float
     percentage: float
 
@@ -79,6 +79,279 @@ class MuscleBalanceResponse(BaseModel):
     recommendations: List[str]
 
 
+class MuscleHeatmapRow(BaseModel):
+    """单个肌群的训练日历"""
+    muscle_group: str
+    trained_days: int  # 全年训练天数
+    days: List[date]  # 练到该肌群的日期
+    weekly_counts: List[int]  # 每周训练天数，与 week_starts 对齐
+
+
+class MuscleHeatmapResponse(BaseModel):
+    """肌群训练频率热力图"""
+    year: int
+    week_starts: List[date]  # 各周的周一
+    muscles: List[MuscleHeatmapRow]
+
+
+# ===== 个人纪录 =====
+
+class PersonalRecordEntry(BaseModel):
+    """单项个人纪录"""
+    value: float  # 重量 / e1RM / 单次训练容量
+    weight: Optional[float] = None  # 纪录组的重量与次数（单次训练容量纪录为空）
+    reps: Optional[int] = None
+    date: date
+    set_id: Optional[int] = None
+    session_id: Optional[int] = None
+
+
+class ExercisePersonalRecords(BaseModel):
+    """单个动作的个人纪录"""
+    exercise_id: int
+    exercise_name: str
+    rep_maxes: List[PersonalRecordEntry]  # N 次能完成的最大重量，按次数升序
+    best_e1rm: Optional[PersonalRecordEntry] = None
+    best_session_volume: Optional[PersonalRecordEntry] = None
+
+
+class PersonalRecordsResponse(BaseModel):
+    """个人纪录响应"""
+    exercises: List[ExercisePersonalRecords]
+
+
+class NewPersonalRecord(BaseModel):
+    """本次写入刷新的个人纪录"""
+    exercise_id: int
+    kind: str  # rep_max / e1rm / session_volume
+    reps: Optional[int] = None  # rep_max 的次数
+    value: float
+    previous_value: Optional[float] = None  # 为空表示首次记录
+    set_id: Optional[int] = None
+    session_id: int
+
+
+# ===== e1RM 趋势 =====
+
+class TrendFit(BaseModel):
+    """每日最佳 e1RM 的线性回归"""
+    points: int  # 数据点（训练天数）
+    slope_per_week: Optional[float] = None  # 每周 e1RM 变化 (kg)
+    r_squared: Optional[float] = None
+
+
+class ExerciseTrend(BaseModel):
+    """单个动作的 e1RM 趋势"""
+    exercise_id: int
+    exercise_name: str
+    all_time: TrendFit
+    recent: TrendFit  # 最近 N 周
+    change_percentage: Optional[float] = None  # 按最近 N 周斜率推算的窗口内变化
+    trend: Optional[str] = None  # improving / plateau / declining，数据点不足时为空
+
+
+class TrendsResponse(BaseModel):
+    """e1RM 趋势响应"""
+    weeks: int
+    window_start: date
+    exercises: List[ExerciseTrend]
+
+
+# ===== 训练负荷 =====
+
+class WorkloadPoint(BaseModel):
+    """单日负荷"""
+    date: date
+    load: float  # 当天容量负荷
+    acute: float  # 急性负荷（7 天 EWMA）
+    chronic: float  # 慢性负荷（28 天 EWMA）
+    acwr: Optional[float] = None  # 急性:慢性负荷比，慢性负荷为 0 时为空
+
+
+class WorkloadResponse(BaseModel):
+    """训练负荷（ACWR）响应"""
+    acute: float
+    chronic: float
+    acwr: Optional[float] = None
+    status: Optional[str] = None  # low / optimal / caution / high，数据不足时为空
+    recommendation: str
+    series: List[WorkloadPoint]
+
+
+# ===== 肌群周容量 =====
+
+class MuscleWeeklyVolume(BaseModel):
+    """单个肌群的周训练组数"""
+    muscle_group: str
+    sets: float  # 辅助肌群按比例计入，可能为小数
+    mev: Optional[float] = None  # 最低有效容量
+    mrv: Optional[float] = None  # 最大可恢复容量
+    status: Optional[str] = None  # below_mev / productive / near_mrv / above_mrv，未配置标准时为空
+
+
+class WeeklyVolumeResponse(BaseModel):
+    """肌群周容量响应"""
+    week_start: date
+    week_end: date
+    muscles: List[MuscleWeeklyVolume]
+    warnings: List[str]
+
+
+# ===== 相对强度分布 =====
+
+class IntensityZone(BaseModel):
+    """强度区间 (%1RM)"""
+    key: str
+    name: str
+    min_percent: float
+    max_percent: Optional[float] = None  # 最高区间无上限
+
+
+class ExerciseIntensity(BaseModel):
+    """单个动作的强度分布"""
+    exercise_id: int
+    exercise_name: str
+    total_sets: int
+    average_intensity: float
+    counts: List[int]  # 各区间组数，与 zones 对齐
+
+
+class PeriodIntensity(BaseModel):
+    """单个周期的强度分布"""
+    period_start: date
+    total_sets: int
+    average_intensity: float
+    counts: List[int]
+
+
+class IntensityDistributionResponse(BaseModel):
+    """相对强度分布响应"""
+    period: str  # week / month
+    start_date: date
+    end_date: date
+    zones: List[IntensityZone]
+    total_sets: int
+    counts: List[int]
+    exercises: List[ExerciseIntensity]
+    periods: List[PeriodIntensity]
+
+
+# ===== 同类用户百分位 =====
+
+class CohortPercentileResponse(BaseModel):
+    """同类用户力量百分位"""
+    exercise_id: int
+    exercise_name: str
+    best_e1rm: Optional[float] = None
+    relative_strength: Optional[float] = None  # 最佳 e1RM / 体重
+    body_weight_class: str  # 如 "70-80"，体重未填写时为 all
+    training_age_group: str  # 如 "1-3"，训练年限未填写时为 all
+    cohort: str  # cohort（同体重级别 + 训练年限）/ all（同类样本不足时使用全站分布）
+    cohort_size: int
+    percentile: Optional[float] = None  # 0-100，超过了多少比例的用户
+    quantiles: Dict[str, float] = {}  # p25 / p50 / p75 / p90
+
+
+# ===== 力量雷达图 =====
+
+class MuscleStrength(BaseModel):
+    """单个肌群的力量评分"""
+    muscle_group: str
+    exercise_id: int  # 该肌群最佳 e1RM 来自的动作
+    exercise_name: str
+    best_e1rm: float
+    relative_strength: Optional[float] = None  # 最佳 e1RM / 体重
+    score: Optional[float] = None  # 相对力量 / 肌群标准 × 100
+
+
+class StrengthProfileResponse(BaseModel):
+    """力量雷达图响应"""
+    period_start: date
+    period_end: date
+    body_weight: Optional[float] = None
+    muscles: List[MuscleStrength]
+
+
+# ===== 自定义分析查询 =====
+
+QueryMetric = Literal["sets", "reps", "volume", "max_e1rm"]
+QueryDimension = Literal["day", "week", "month", "exercise", "muscle", "equipment"]
+
+
+class AnalyticsQueryFilters(BaseModel):
+    """查询筛选条件（均为可选，多个条件取交集）"""
+    exercise_ids: Optional[List[int]] = Field(None, max_length=100)
+    muscle_groups: Optional[List[str]] = Field(None, max_length=20)  # 按主肌群
+    equipment: Optional[List[str]] = Field(None, max_length=20)
+
+
+class AnalyticsQueryRequest(BaseModel):
+    """自定义分析查询：指标 × 分组维度 × 筛选条件 × 日期范围"""
+    metrics: List[QueryMetric] = Field(..., min_length=1, max_length=4)
+    group_by: List[QueryDimension] = Field([], max_length=3)  # 时间粒度最多一个
+    filters: AnalyticsQueryFilters = AnalyticsQueryFilters()
+    start_date: Optional[date] = None  # 默认结束日期前 30 天
+    end_date: Optional[date] = None  # 默认今天
+
+
+class AnalyticsQueryResponse(BaseModel):
+    """自定义分析查询结果"""
+    metrics: List[str]
+    group_by: List[str]
+    start_date: date
+    end_date: date
+    sources: List[str]  # 实际读取的表（训练组原始记录或预聚合表）
+    truncated: bool  # 超过最大行数时只返回按分组键排序的前若干行
+    rows: List[Dict[str, Any]]  # 分组键（按动作分组时附 exercise_name）+ 指标
+
+
+# ===== 时段对比 =====
+
+class CompareWindow(BaseModel):
+    """单个时段的汇总"""
+    start_date: date
+    end_date: date
+    total_sessions: int
+    total_sets: int
+    total_reps: int
+    total_volume: float
+
+
+class MuscleComparison(BaseModel):
+    """肌群容量对比（辅助肌群按比例计入）"""
+    muscle_group: str
+    volume_a: float
+    volume_b: float
+    percentage_a: float  # 占该时段加权总容量的比例
+    percentage_b: float
+    change_percentage: Optional[float] = None  # B 相对 A，A 为 0 时为空
+
+
+class ExerciseComparison(BaseModel):
+    """动作对比"""
+    exercise_id: int
+    exercise_name: str
+    sets_a: int
+    sets_b: int
+    volume_a: float
+    volume_b: float
+    best_e1rm_a: Optional[float] = None
+    best_e1rm_b: Optional[float] = None
+    e1rm_change_percentage: Optional[float] = None
+
+
+class CompareResponse(BaseModel):
+    """两个时段的对比（A 为基准期，变化量均为 B - A）"""
+    a: CompareWindow
+    b: CompareWindow
+    sessions_change: int
+    sets_change: int
+    volume_change: float
+    volume_change_percentage: Optional[float] = None
+    muscles: List[MuscleComparison]
+    exercises: List[ExerciseComparison]
+
+
 # ===== 进步报告 =====
 
 class ExerciseProgress(BaseModel):
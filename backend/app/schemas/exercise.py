@@ -1,7 +1,9 @@
-from datetime import datetime
+from datetime import date, date as DateType, datetime
 from typing import Optional, List
 from pydantic import BaseModel
 
+from app.schemas.workout import WorkoutSetResponse
+
 
 class ExerciseBase(BaseModel):
     """动作基础模型"""
@@ -46,5 +48,38 @@ class ExerciseResponse(ExerciseBase):
 
 class ExerciseListResponse(BaseModel):
     """动作列表响应"""
-    total: int
+    total: Optional[int] = None  # 游标翻页时不返回
+    next_cursor: Optional[str] = None  # 为空表示没有更多数据
     items: List[ExerciseResponse]
+
+
+class ExerciseUsageItem(BaseModel):
+    """动作使用统计"""
+    exercise: ExerciseResponse
+    use_count: int  # 累计组数
+    last_used: date  # 最近一次训练日期
+
+
+class RecentExercisesResponse(BaseModel):
+    """最近使用的动作"""
+    items: List[ExerciseUsageItem]
+
+
+class LastPerformanceResponse(BaseModel):
+    """上次表现（最近一次训练中该动作的训练组，没有记录时为空）"""
+    exercise_id: int
+    session_id: Optional[int] = None
+    date: Optional[DateType] = None
+    sets: List[WorkoutSetResponse] = []
+
+
+class ExerciseAlternative(BaseModel):
+    """替代动作"""
+    exercise: ExerciseResponse
+    similarity: float  # 0-1
+
+
+class ExerciseAlternativesResponse(BaseModel):
+    """替代动作列表（按相似度降序）"""
+    exercise_id: int
+    items: List[ExerciseAlternative]
@@ -0,0 +1,55 @@
+from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel, Field
+
+from app.schemas.exercise import ExerciseResponse
+from app.schemas.workout import WorkoutSessionResponse, WorkoutSetResponse
+
+
+# ===== 增量拉取 =====
+
+class SyncTombstone(BaseModel):
+    """已删除实体（墓碑）"""
+    entity_type: str  # session / set / exercise
+    entity_id: int
+
+
+class SyncPullResponse(BaseModel):
+    """增量同步响应"""
+    version: int  # 客户端下次以此作为 since
+    full: bool  # 是否为全量快照（since=0 或版本不连续时）
+    sessions: List[WorkoutSessionResponse] = []
+    sets: List[WorkoutSetResponse] = []
+    exercises: List[ExerciseResponse] = []
+    deleted: List[SyncTombstone] = []  # 删除训练课时其训练组一并删除
+
+
+# ===== 离线写入 =====
+
+class SyncMutation(BaseModel):
+    """单个离线写操作"""
+    idempotency_key: str = Field(..., min_length=1, max_length=100)
+    entity_type: Literal["session", "set", "exercise"]
+    op: Literal["create", "update", "delete"]
+    entity_id: Optional[int] = None  # update / delete 时必填
+    session_id: Optional[int] = None  # 训练组所属训练课
+    session_key: Optional[str] = None  # 或引用离线创建训练课时的幂等键
+    data: Dict[str, Any] = {}
+
+
+class SyncPushRequest(BaseModel):
+    """批量离线写入请求（按顺序执行）"""
+    mutations: List[SyncMutation] = Field(..., max_length=500)
+
+
+class SyncMutationResult(BaseModel):
+    """单个写操作结果"""
+    idempotency_key: str
+    status: str  # applied / duplicate / error
+    entity_id: Optional[int] = None
+    detail: Optional[Any] = None
+
+
+class SyncPushResponse(BaseModel):
+    """批量离线写入响应"""
+    version: int
+    results: List[SyncMutationResult]
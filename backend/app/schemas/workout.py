@@ -1,6 +1,8 @@
-from datetime import date, datetime
+from datetime import date, date as DateType, datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.analysis import NewPersonalRecord
 
 
 # ===== 训练组 Schemas =====
@@ -33,11 +35,32 @@ class WorkoutSetUpdate(BaseModel):
     tempo: Optional[str] = None
     notes: Optional[str] = None
 
+    @field_validator("exercise_id", "set_order", "weight", "reps")
+    @classmethod
+    def not_null(cls, value):
+        """必填字段可以省略（不修改），但不能显式传 null"""
+        if value is None:
+            raise ValueError("不能为空")
+        return value
+
+
+class WorkoutSetBatchUpdateItem(WorkoutSetUpdate):
+    """批量编辑中的训练组更新（按 id 定位）"""
+    id: int
+
+
+class WorkoutSetBatchRequest(BaseModel):
+    """批量编辑训练组（新增 / 更新 / 删除 / 调整顺序）"""
+    create: List[WorkoutSetCreate] = []
+    update: List[WorkoutSetBatchUpdateItem] = []
+    delete: List[int] = []
+
 
 class WorkoutSetResponse(WorkoutSetBase):
     """训练组响应"""
     id: int
     session_id: int
+    is_flagged: bool = False  # 疑似录入错误，确认前不计入统计分析
     created_at: datetime
     updated_at: datetime
 
@@ -45,6 +68,23 @@ class WorkoutSetResponse(WorkoutSetBase):
         from_attributes = True
 
 
+class FlaggedSet(BaseModel):
+    """疑似录入错误的训练组"""
+    set_id: int
+    exercise_id: int
+    weight: float
+    reps: int
+    mean_weight: float  # 该动作历史组的平均重量
+    mean_e1rm: float
+    z_score: Optional[float] = None  # 重量 / e1RM 中偏离更大的一项（标准差倍数）
+
+
+class WorkoutSetCreateResponse(WorkoutSetResponse):
+    """添加训练组响应（附带本次刷新的个人纪录与疑似录入错误）"""
+    new_records: List[NewPersonalRecord] = []
+    flagged_sets: List[FlaggedSet] = []
+
+
 # ===== 训练课 Schemas =====
 
 class WorkoutSessionBase(BaseModel):
@@ -64,7 +104,7 @@ class WorkoutSessionCreate(WorkoutSessionBase):
 
 class WorkoutSessionUpdate(BaseModel):
     """更新训练课"""
-    date: Optional[date] = None
+    date: Optional[DateType] = None  # 字段名与类型同名，带默认值时需用别名，否则被解析为 None 类型
     duration_min: Optional[int] = Field(None, ge=0)
     body_weight: Optional[float] = Field(None, gt=0)
     overall_rpe: Optional[int] = Field(None, ge=1, le=10)
@@ -88,10 +128,39 @@ class WorkoutSessionDetailResponse(WorkoutSessionResponse):
     sets: List[WorkoutSetResponse] = []
 
 
+class WorkoutSessionCreateResponse(WorkoutSessionDetailResponse):
+    """创建 / 批量编辑训练课响应（附带本次刷新的个人纪录与疑似录入错误）"""
+    new_records: List[NewPersonalRecord] = []
+    flagged_sets: List[FlaggedSet] = []
+
+
+class SessionExerciseSummary(BaseModel):
+    """训练课中单个动作的汇总"""
+    exercise_id: int
+    exercise_name: str
+    total_sets: int
+    total_reps: int
+    total_volume: float
+
+
+class WorkoutSessionSummary(BaseModel):
+    """训练课汇总（组数、容量、动作）"""
+    total_sets: int = 0
+    total_reps: int = 0
+    total_volume: float = 0
+    exercises: List[SessionExerciseSummary] = []
+
+
+class WorkoutSessionListItem(WorkoutSessionResponse):
+    """训练课列表项（summary=true 时附带汇总）"""
+    summary: Optional[WorkoutSessionSummary] = None
+
+
 class WorkoutSessionListResponse(BaseModel):
     """训练课列表响应"""
-    total: int
-    items: List[WorkoutSessionResponse]
+    total: Optional[int] = None  # 游标翻页时不返回
+    next_cursor: Optional[str] = None  # 为空表示没有更多数据
+    items: List[WorkoutSessionListItem]
 
 
 # ===== 训练模板 Schemas =====
@@ -0,0 +1,238 @@
+"""
+自定义分析查询
+把声明式的查询（指标 × 分组维度 × 筛选 × 日期范围）编译为分组 SQL：
+训练组数 / 次数 / 容量读训练组原始记录，只按时间分组且无筛选的容量改读每日负荷表；
+最大 e1RM 读每日最佳 e1RM 表（e1RM 为多公式加权，无法在 SQL 中计算）。
+每个数据源一条分组语句，结果按分组键合并；行数上限在 SQL 中 LIMIT，结果按用户数据版本号缓存。
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, func, cast, join, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import engine
+from app.models.exercise import Exercise
+from app.models.stats import DailyBestE1RM, DailyLoad
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.schemas.analysis import AnalyticsQueryRequest, AnalyticsQueryResponse
+from app.services.exercise_catalog import get_catalog, get_user_exercises
+
+
+TIME_DIMENSIONS = ("day", "week", "month")
+SET_METRICS = ("sets", "reps", "volume")
+
+# 查询结果缓存的最大条目数（用户 × 查询）
+QUERY_CACHE_SIZE = 256
+
+# (user_id, 开始日期, 结束日期, 查询) -> ((数据版本号, 动作库版本号), 结果)
+_results: "OrderedDict[Tuple[int, date, date, str], Tuple[Tuple[int, int], AnalyticsQueryResponse]]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class _Source:
+    """数据源：表名、FROM 子句、用户 / 日期 / 动作列（无动作列时为 None）、各指标的聚合表达式"""
+    name: str
+    from_clause: Any
+    user_column: Any
+    date_column: Any
+    exercise_column: Any
+    metrics: Dict[str, Any]
+    conditions: Tuple = ()  # 数据源固有的筛选条件
+
+
+SETS_SOURCE = _Source(
+    name="workout_sets",
+    from_clause=join(WorkoutSet, WorkoutSession, WorkoutSet.session_id == WorkoutSession.id),
+    user_column=WorkoutSession.user_id,
+    date_column=WorkoutSession.date,
+    exercise_column=WorkoutSet.exercise_id,
+    metrics={
+        "sets": func.count(WorkoutSet.id),
+        "reps": func.sum(WorkoutSet.reps),
+        "volume": func.sum(WorkoutSet.weight * WorkoutSet.reps),
+    },
+    conditions=(WorkoutSet.is_flagged == False,),  # 待确认的疑似录入错误不计入
+)
+DAILY_LOAD_SOURCE = _Source(
+    name="daily_loads",
+    from_clause=DailyLoad,
+    user_column=DailyLoad.user_id,
+    date_column=DailyLoad.date,
+    exercise_column=None,
+    metrics={"volume": func.sum(DailyLoad.volume_load)},
+)
+DAILY_BEST_SOURCE = _Source(
+    name="daily_best_e1rms",
+    from_clause=DailyBestE1RM,
+    user_column=DailyBestE1RM.user_id,
+    date_column=DailyBestE1RM.date,
+    exercise_column=DailyBestE1RM.exercise_id,
+    metrics={"max_e1rm": func.max(DailyBestE1RM.e1rm)},
+)
+
+
+def _period_start(column, period: str):
+    """日期所在周（周一）/ 月的第一天，按数据库方言编译"""
+    if engine.dialect.name == "postgresql":
+        return cast(func.date_trunc(period, column), Date)
+    if period == "week":
+        return func.date(column, "weekday 0", "-6 days", type_=Date)
+    return func.date(column, "start of month", type_=Date)
+
+
+def _has_filters(spec: AnalyticsQueryRequest) -> bool:
+    f = spec.filters
+    return bool(f.exercise_ids or f.muscle_groups or f.equipment)
+
+
+def plan_sources(spec: AnalyticsQueryRequest) -> List[Tuple[_Source, List[str]]]:
+    """为每个指标选择数据源：[(数据源, 该数据源负责的指标)]"""
+    plan = []
+    set_metrics = [m for m in spec.metrics if m in SET_METRICS]
+    if set_metrics:
+        rollup_covers = (
+            set_metrics == ["volume"]
+            and all(d in TIME_DIMENSIONS for d in spec.group_by)
+            and not _has_filters(spec)
+        )
+        plan.append((DAILY_LOAD_SOURCE if rollup_covers else SETS_SOURCE, set_metrics))
+    if "max_e1rm" in spec.metrics:
+        plan.append((DAILY_BEST_SOURCE, ["max_e1rm"]))
+    return plan
+
+
+def _compile(
+    source: _Source,
+    metrics: Sequence[str],
+    spec: AnalyticsQueryRequest,
+    user_id: int,
+    start: date,
+    end: date,
+    limit: int,
+):
+    """编译为一条分组语句：分组列依次命名为 k0、k1…，指标列以指标名命名"""
+    needs_exercise = (
+        any(d in ("muscle", "equipment") for d in spec.group_by)
+        or spec.filters.muscle_groups
+        or spec.filters.equipment
+    )
+
+    keys = []
+    for dimension in spec.group_by:
+        if dimension == "day":
+            keys.append(source.date_column)
+        elif dimension in ("week", "month"):
+            keys.append(_period_start(source.date_column, dimension))
+        elif dimension == "exercise":
+            keys.append(source.exercise_column)
+        elif dimension == "muscle":
+            keys.append(Exercise.primary_muscle)
+        else:
+            keys.append(Exercise.equipment)
+    keys = [key.label(f"k{index}") for index, key in enumerate(keys)]
+
+    stmt = (
+        select(*keys, *(source.metrics[m].label(m) for m in metrics))
+        .select_from(source.from_clause)
+        .where(
+            source.user_column == user_id,
+            source.date_column >= start,
+            source.date_column <= end,
+            *source.conditions,
+        )
+    )
+    if needs_exercise:
+        stmt = stmt.join(Exercise, source.exercise_column == Exercise.id)
+    if spec.filters.exercise_ids:
+        stmt = stmt.where(source.exercise_column.in_(spec.filters.exercise_ids))
+    if spec.filters.muscle_groups:
+        stmt = stmt.where(Exercise.primary_muscle.in_(spec.filters.muscle_groups))
+    if spec.filters.equipment:
+        stmt = stmt.where(Exercise.equipment.in_(spec.filters.equipment))
+    if keys:
+        stmt = stmt.group_by(*keys).order_by(*keys)
+    return stmt.limit(limit + 1)
+
+
+async def run_query(
+    db: AsyncSession,
+    user_id: int,
+    data_version: int,
+    spec: AnalyticsQueryRequest,
+    start: date,
+    end: date,
+) -> AnalyticsQueryResponse:
+    """执行查询（日期范围已由调用方校验）"""
+    catalog = await get_catalog(db)
+    key = (user_id, start, end, spec.model_dump_json(exclude={"start_date", "end_date"}))
+    version = (data_version, catalog.version)
+    cached = _results.get(key)
+    if cached and cached[0] == version:
+        _results.move_to_end(key)
+        return cached[1]
+
+    max_rows = settings.analytics_query_max_rows
+    dimension_count = len(spec.group_by)
+    merged: Dict[Tuple, Dict[str, Any]] = {}
+    sources = []
+    truncated = False
+    for source, metrics in plan_sources(spec):
+        result = await db.execute(_compile(source, metrics, spec, user_id, start, end, max_rows))
+        rows = result.all()
+        if len(rows) > max_rows:
+            truncated = True
+            rows = rows[:max_rows]
+        sources.append(source.name)
+        for row in rows:
+            group = tuple(row[:dimension_count])
+            values = merged.setdefault(group, {})
+            for index, metric in enumerate(metrics):
+                values[metric] = row[dimension_count + index]
+
+    groups = sorted(merged)
+    if len(groups) > max_rows:
+        truncated = True
+        groups = groups[:max_rows]
+
+    user_exercises = None
+    if "exercise" in spec.group_by:
+        user_exercises = await get_user_exercises(db, user_id)
+
+    rows = []
+    for group in groups:
+        values = merged[group]
+        row: Dict[str, Any] = dict(zip(spec.group_by, group))
+        if user_exercises is not None:
+            exercise_id = row["exercise"]
+            exercise = catalog.exercises.get(exercise_id) or user_exercises.exercises.get(exercise_id)
+            row["exercise_name"] = exercise.name if exercise else None
+        for metric in spec.metrics:
+            row[metric] = _format_metric(metric, values.get(metric))
+        rows.append(row)
+
+    response = AnalyticsQueryResponse(
+        metrics=list(spec.metrics),
+        group_by=list(spec.group_by),
+        start_date=start,
+        end_date=end,
+        sources=sources,
+        truncated=truncated,
+        rows=rows,
+    )
+    _results[key] = (version, response)
+    _results.move_to_end(key)
+    while len(_results) > QUERY_CACHE_SIZE:
+        _results.popitem(last=False)
+    return response
+
+
+def _format_metric(metric: str, value: Optional[float]) -> Optional[float]:
+    if metric == "max_e1rm":
+        return round(value, 2) if value is not None else None
+    if metric == "volume":
+        return round(float(value or 0), 2)
+    return int(value or 0)
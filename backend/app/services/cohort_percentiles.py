@@ -0,0 +1,170 @@
+"""
+同类用户力量百分位
+按 预置动作 × 体重级别 × 训练年限 维护最佳 e1RM 的 t-digest（存于 fleet_sketches），
+另有每个动作不分组的全站 t-digest，同类样本不足时回退使用。
+用户首次有某动作的 e1RM 纪录时追加该值，保证两次重建之间每个用户只贡献一个样本；
+t-digest 不支持删除，纪录提升、体重 / 训练年限变化后的分组由个人纪录表定期全量重建
+（见 app/main.py 与 seeds.rebuild_stats）。草图的样本数（t-digest 计数）即分组人数。
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.stats import FleetSketch, PersonalRecord
+from app.models.user import User
+from app.schemas.analysis import NewPersonalRecord
+from app.services.exercise_catalog import get_catalog
+from app.services.personal_records import KIND_E1RM
+from app.utils.sketches import TDigest
+
+
+KIND_COHORT_E1RM = "e1rm_tdigest"
+TDIGEST_COMPRESSION = 100
+
+# 体重级别 (kg)：每 10kg 一档
+BODY_WEIGHT_EDGES = (50, 60, 70, 80, 90, 100, 110, 120)
+# 训练年限分组（年）
+TRAINING_AGE_EDGES = (1, 3, 5)
+
+ALL = "all"
+
+# 同类样本少于该数量时改用全站分布
+MIN_COHORT_SIZE = 20
+
+
+def _bucket(value: Optional[float], edges: Tuple[int, ...]) -> str:
+    """数值所在区间的标签，如 "70-80"、"lt50"、"120+"；为空时返回 all"""
+    if value is None:
+        return ALL
+    if value < edges[0]:
+        return f"lt{edges[0]}"
+    for lower, upper in zip(edges, edges[1:]):
+        if value < upper:
+            return f"{lower}-{upper}"
+    return f"{edges[-1]}+"
+
+
+def cohort_of(body_weight: Optional[float], training_age: Optional[int]) -> Tuple[str, str]:
+    """用户所在分组：(体重级别, 训练年限)，未填写的一项为 all"""
+    return (
+        _bucket(body_weight, BODY_WEIGHT_EDGES),
+        _bucket(training_age, TRAINING_AGE_EDGES),
+    )
+
+
+def _key(exercise_id: int, body_weight_class: str = ALL, training_age: str = ALL) -> str:
+    return f"{exercise_id}:{body_weight_class}:{training_age}"
+
+
+def _keys_for(exercise_id: int, cohort: Tuple[str, str]) -> List[str]:
+    """一个数值要写入的草图：所在分组（体重或训练年限未知时不分组）+ 全站"""
+    keys = [_key(exercise_id)]
+    if ALL not in cohort:
+        keys.append(_key(exercise_id, *cohort))
+    return keys
+
+
+async def add_best_e1rms(db: AsyncSession, user_id: int, records: Iterable[NewPersonalRecord]) -> None:
+    """
+    把首次记录的最佳 e1RM 追加到所在分组的草图（只统计预置动作）
+
+    已有纪录的提升不追加（否则同一用户会按 PR 次数重复计入），由定期重建更新。
+    """
+    catalog = await get_catalog(db)
+    records = [
+        r for r in records
+        if r.kind == KIND_E1RM and r.previous_value is None and r.exercise_id in catalog.exercises
+    ]
+    if not records:
+        return
+
+    user = await db.get(User, user_id)  # 写接口已加载当前用户，通常命中会话缓存
+    cohort = cohort_of(user.body_weight, user.training_age)
+    values: Dict[str, List[float]] = defaultdict(list)
+    for record in records:
+        for key in _keys_for(record.exercise_id, cohort):
+            values[key].append(record.value)
+
+    result = await db.execute(
+        select(FleetSketch.key, FleetSketch.data)
+        .where(
+            FleetSketch.kind == KIND_COHORT_E1RM,
+            FleetSketch.key.in_(list(values)),
+            FleetSketch.shard == 0,
+        )
+        .with_for_update()
+    )
+    stored = dict(result.all())
+
+    rows = []
+    for key, new_values in values.items():
+        digest = TDigest(TDIGEST_COMPRESSION, stored.get(key))
+        for value in new_values:
+            digest.add(value)
+        rows.append({"kind": KIND_COHORT_E1RM, "key": key, "shard": 0, "data": digest.to_bytes()})
+    await _save(db, rows)
+
+
+async def _save(db: AsyncSession, rows: List[dict]) -> None:
+    stmt = upsert_insert(FleetSketch)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FleetSketch.kind, FleetSketch.key, FleetSketch.shard],
+        set_={"data": stmt.excluded.data, "updated_at": func.now()},
+    )
+    await db.execute(stmt, rows)
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """由个人纪录表（每个用户 × 动作一行最佳 e1RM）全量重建草图，返回样本数"""
+    catalog = await get_catalog(db)
+    result = await db.execute(
+        select(PersonalRecord.exercise_id, PersonalRecord.value, User.body_weight, User.training_age)
+        .join(User, PersonalRecord.user_id == User.id)
+        .where(
+            PersonalRecord.kind == KIND_E1RM,
+            PersonalRecord.exercise_id.in_(list(catalog.exercises)),
+        )
+    )
+    digests: Dict[str, TDigest] = defaultdict(lambda: TDigest(TDIGEST_COMPRESSION))
+    samples = 0
+    for exercise_id, value, body_weight, training_age in result.all():
+        for key in _keys_for(exercise_id, cohort_of(body_weight, training_age)):
+            digests[key].add(value)
+        samples += 1
+
+    await clear(db)
+    if digests:
+        await _save(db, [
+            {"kind": KIND_COHORT_E1RM, "key": key, "shard": 0, "data": digest.to_bytes()}
+            for key, digest in digests.items()
+        ])
+    return samples
+
+
+async def clear(db: AsyncSession) -> None:
+    await db.execute(delete(FleetSketch).where(FleetSketch.kind == KIND_COHORT_E1RM))
+
+
+async def get_cohort_digests(
+    db: AsyncSession,
+    exercise_id: int,
+    cohort: Tuple[str, str],
+) -> Tuple[Optional[TDigest], Optional[TDigest]]:
+    """读取 (所在分组, 全站) 的草图（不存在时为 None）"""
+    cohort_key = _key(exercise_id, *cohort)
+    overall_key = _key(exercise_id)
+    result = await db.execute(
+        select(FleetSketch.key, FleetSketch.data).where(
+            FleetSketch.kind == KIND_COHORT_E1RM,
+            FleetSketch.key.in_([cohort_key, overall_key]),
+            FleetSketch.shard == 0,
+        )
+    )
+    stored = dict(result.all())
+    return (
+        TDigest(TDIGEST_COMPRESSION, stored[cohort_key]) if cohort_key in stored else None,
+        TDigest(TDIGEST_COMPRESSION, stored[overall_key]) if overall_key in stored else None,
+    )
@@ -0,0 +1,228 @@
+"""
+e1RM 趋势回归
+数据点为 用户 × 动作 每天的最佳 e1RM；按动作维护全部历史的回归累加量，
+另按周分桶维护一份，最近 N 周的滑动窗口取 N 个周桶相加。
+训练写操作只改动受影响日期的数据点，累加量按「删旧点 + 加新点」增减，读取时 O(1) 得到斜率与 r²。
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, delete, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.stats import DailyBestE1RM, E1RMRegression, E1RMRegressionWeek
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.services.rm_calculator import calculate_1rm
+from app.utils.running_stats import RunningRegression
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+# 回归的 x 轴原点（用较近的原点减小 Σx² 的量级，避免浮点相消）
+X_ORIGIN = date(2000, 1, 1)
+
+# (exercise_id, date) -> (当日最佳 e1RM, 对应训练组)
+DayKey = Tuple[int, date]
+DayBest = Tuple[float, Optional[int]]
+
+SUM_COLUMNS = ("n", "sum_x", "sum_y", "sum_xx", "sum_xy", "sum_yy")
+
+
+def day_x(day: date) -> int:
+    return (day - X_ORIGIN).days
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+) -> None:
+    """更新受影响日期的最佳 e1RM，并把数据点的变化计入回归累加量"""
+    days: Set[DayKey] = {(s.exercise_id, s.date) for s in added} | {(s.exercise_id, s.date) for s in removed}
+    if not days:
+        return
+
+    result = await db.execute(
+        select(DailyBestE1RM.exercise_id, DailyBestE1RM.date, DailyBestE1RM.e1rm, DailyBestE1RM.set_id).where(
+            DailyBestE1RM.user_id == user_id,
+            tuple_(DailyBestE1RM.exercise_id, DailyBestE1RM.date).in_(list(days)),
+        )
+    )
+    stored: Dict[DayKey, DayBest] = {
+        (exercise_id, day): (e1rm, set_id) for exercise_id, day, e1rm, set_id in result.all()
+    }
+
+    # 有删除（或当日最佳那组已不存在）的日期按当天实际数据重算，只有新增的日期与原值比较即可
+    recompute = {(s.exercise_id, s.date) for s in removed}
+    recompute |= {key for key, (_, set_id) in stored.items() if set_id is None}
+
+    best: Dict[DayKey, DayBest] = {key: stored[key] for key in days - recompute if key in stored}
+    for s in added:
+        key = (s.exercise_id, s.date)
+        if key in recompute:
+            continue
+        e1rm = calculate_1rm(s.weight, s.reps, s.rpe).estimated_1rm
+        if key not in best or e1rm > best[key][0]:
+            best[key] = (e1rm, s.id)
+    if recompute:
+        best.update(await _daily_best(db, user_id, recompute))
+
+    changed = {key: best[key] for key in days if key in best and best[key] != stored.get(key)}
+    dropped = [key for key in days if key in stored and key not in best]
+    if not changed and not dropped:
+        return
+
+    # 数据点变化计入回归累加量：旧值删除，新值加入
+    totals: Dict[int, RunningRegression] = defaultdict(RunningRegression)
+    weeks: Dict[Tuple[int, date], RunningRegression] = defaultdict(RunningRegression)
+    for key in list(changed) + dropped:
+        exercise_id, day = key
+        x = day_x(day)
+        for weight, point in ((-1, stored.get(key)), (1, best.get(key))):
+            if point is None:
+                continue
+            totals[exercise_id].add(x, point[0], weight)
+            weeks[(exercise_id, week_start(day))].add(x, point[0], weight)
+
+    await _save_points(db, user_id, changed, dropped)
+    await _add_sums(db, E1RMRegression, [
+        {"user_id": user_id, "exercise_id": exercise_id, **_sums(sums)}
+        for exercise_id, sums in totals.items()
+    ])
+    await _add_sums(db, E1RMRegressionWeek, [
+        {"user_id": user_id, "exercise_id": exercise_id, "week_start": start, **_sums(sums)}
+        for (exercise_id, start), sums in weeks.items()
+    ])
+
+
+async def _daily_best(db: AsyncSession, user_id: int, days: Set[DayKey]) -> Dict[DayKey, DayBest]:
+    """按原始训练组计算指定日期的最佳 e1RM（当天已无训练组的不返回）"""
+    result = await db.execute(
+        select(
+            WorkoutSet.exercise_id,
+            WorkoutSession.date,
+            WorkoutSet.weight,
+            WorkoutSet.reps,
+            WorkoutSet.rpe,
+            WorkoutSet.id,
+        )
+        .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+        .where(
+            WorkoutSession.user_id == user_id,
+            WorkoutSet.is_flagged == False,
+            tuple_(WorkoutSet.exercise_id, WorkoutSession.date).in_(list(days)),
+        )
+    )
+    best: Dict[DayKey, DayBest] = {}
+    for exercise_id, day, weight, reps, rpe, set_id in result.all():
+        e1rm = calculate_1rm(weight, reps, rpe).estimated_1rm
+        key = (exercise_id, day)
+        if key not in best or e1rm > best[key][0]:
+            best[key] = (e1rm, set_id)
+    return best
+
+
+async def _save_points(
+    db: AsyncSession,
+    user_id: int,
+    changed: Dict[DayKey, DayBest],
+    dropped: List[DayKey],
+) -> None:
+    if dropped:
+        await db.execute(
+            delete(DailyBestE1RM).where(
+                DailyBestE1RM.user_id == user_id,
+                tuple_(DailyBestE1RM.exercise_id, DailyBestE1RM.date).in_(dropped),
+            )
+        )
+    if changed:
+        stmt = upsert_insert(DailyBestE1RM)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyBestE1RM.user_id, DailyBestE1RM.exercise_id, DailyBestE1RM.date],
+            set_={"e1rm": stmt.excluded.e1rm, "set_id": stmt.excluded.set_id},
+        )
+        await db.execute(stmt, [
+            {"user_id": user_id, "exercise_id": exercise_id, "date": day, "e1rm": e1rm, "set_id": set_id}
+            for (exercise_id, day), (e1rm, set_id) in changed.items()
+        ])
+
+
+def _sums(sums: RunningRegression) -> dict:
+    return {column: getattr(sums, column) for column in SUM_COLUMNS}
+
+
+async def _add_sums(db: AsyncSession, model, rows: List[dict]) -> None:
+    """累加量增量 upsert，数据点删光的行一并删除（顺带清掉浮点残差）"""
+    rows = [row for row in rows if any(row[column] for column in SUM_COLUMNS)]
+    if not rows:
+        return
+
+    stmt = upsert_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(model.__table__.primary_key.columns),
+        set_={column: getattr(model, column) + getattr(stmt.excluded, column) for column in SUM_COLUMNS},
+    )
+    await db.execute(stmt, rows)
+    await db.execute(
+        delete(model).where(
+            model.user_id == rows[0]["user_id"],
+            model.exercise_id.in_({row["exercise_id"] for row in rows}),
+            model.n <= 0,
+        )
+    )
+
+
+async def clear(db: AsyncSession, user_id: int) -> None:
+    """清空用户的 e1RM 数据点与回归累加量（重建前调用）"""
+    for model in (DailyBestE1RM, E1RMRegression, E1RMRegressionWeek):
+        await db.execute(delete(model).where(model.user_id == user_id))
+
+
+def _regression(row) -> RunningRegression:
+    return RunningRegression(row.n, row.sum_x, row.sum_y, row.sum_xx, row.sum_xy, row.sum_yy)
+
+
+async def get_regressions(
+    db: AsyncSession,
+    user_id: int,
+    window_start: date,
+) -> List[Tuple[int, RunningRegression, RunningRegression]]:
+    """
+    读取各动作的回归累加量
+
+    Returns:
+        [(动作 ID, 全部历史, window_start 所在周起的滑动窗口)]
+    """
+    result = await db.execute(select(E1RMRegression).where(E1RMRegression.user_id == user_id))
+    totals = {row.exercise_id: _regression(row) for row in result.scalars().all()}
+
+    result = await db.execute(
+        select(
+            E1RMRegressionWeek.exercise_id,
+            func.sum(E1RMRegressionWeek.n).label("n"),
+            func.sum(E1RMRegressionWeek.sum_x).label("sum_x"),
+            func.sum(E1RMRegressionWeek.sum_y).label("sum_y"),
+            func.sum(E1RMRegressionWeek.sum_xx).label("sum_xx"),
+            func.sum(E1RMRegressionWeek.sum_xy).label("sum_xy"),
+            func.sum(E1RMRegressionWeek.sum_yy).label("sum_yy"),
+        )
+        .where(
+            E1RMRegressionWeek.user_id == user_id,
+            E1RMRegressionWeek.week_start >= week_start(window_start),
+        )
+        .group_by(E1RMRegressionWeek.exercise_id)
+    )
+    windows = {row.exercise_id: _regression(row) for row in result.all()}
+
+    return [
+        (exercise_id, total, windows.get(exercise_id, RunningRegression()))
+        for exercise_id, total in totals.items()
+    ]
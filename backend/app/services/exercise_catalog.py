@@ -0,0 +1,294 @@
+"""
+预置动作库内存索引
+预置动作（is_custom=False）几乎不变，启动时整体加载为不可变索引，
+按肌群 / 分类 / 器械预先计算有序 ID 列表，筛选与分页直接在内存完成。
+动作库版本号变化时整体重建并原子替换。
+用户自定义动作按用户缓存（LRU），以用户数据版本号校验（增删改都会使版本号变化，跨进程同样有效）。
+相似动作邻居列表、动作 → 肌群权重矩阵随索引一起预先计算
+（预置动作在加载时，自定义动作在缓存重建时）。
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.catalog import CatalogState
+from app.models.exercise import Exercise
+from app.models.user import User
+from app.schemas.exercise import ExerciseResponse
+from app.services.exercise_search import SearchIndex, build_search_index
+from app.services.exercise_similarity import Neighbors, build_neighbors, merge_neighbors, rank_candidates
+from app.services.muscle_matrix import MuscleMatrix, build_muscle_matrix
+
+
+CATALOG_STATE_ID = 1
+
+# 自定义动作缓存的最大用户数
+USER_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CatalogIndex:
+    """不可变的预置动作索引"""
+    version: int
+    exercises: Mapping[int, ExerciseResponse]
+    ordered_ids: Tuple[int, ...]  # 按 id 升序
+    by_muscle: Mapping[str, Tuple[int, ...]]
+    by_category: Mapping[str, Tuple[int, ...]]
+    by_equipment: Mapping[str, Tuple[int, ...]]
+    search_index: SearchIndex
+    neighbors: Mapping[int, Neighbors]  # 预置动作之间的相似动作
+    muscle_matrix: MuscleMatrix
+
+    def filter_ids(
+        self,
+        muscle_group: Optional[str] = None,
+        category: Optional[str] = None,
+        equipment: Optional[str] = None,
+    ) -> List[int]:
+        """按条件求交集，结果保持 id 升序"""
+        postings = []
+        if muscle_group:
+            postings.append(self.by_muscle.get(muscle_group, ()))
+        if category:
+            postings.append(self.by_category.get(category, ()))
+        if equipment:
+            postings.append(self.by_equipment.get(equipment, ()))
+
+        if not postings:
+            return list(self.ordered_ids)
+
+        # 从最短的列表出发，其余列表转为集合做成员判断
+        postings.sort(key=len)
+        others = [set(p) for p in postings[1:]]
+        return [i for i in postings[0] if all(i in o for o in others)]
+
+
+def build_catalog(version: int, exercises: List[Exercise]) -> CatalogIndex:
+    """由预置动作构建索引"""
+    items = sorted(
+        (ExerciseResponse.model_validate(e) for e in exercises),
+        key=lambda e: e.id,
+    )
+
+    by_muscle: Dict[str, List[int]] = {}
+    by_category: Dict[str, List[int]] = {}
+    by_equipment: Dict[str, List[int]] = {}
+    for item in items:
+        by_muscle.setdefault(item.primary_muscle, []).append(item.id)
+        by_category.setdefault(item.category, []).append(item.id)
+        by_equipment.setdefault(item.equipment, []).append(item.id)
+
+    def freeze(postings: Dict[str, List[int]]) -> Mapping[str, Tuple[int, ...]]:
+        return MappingProxyType({k: tuple(v) for k, v in postings.items()})
+
+    return CatalogIndex(
+        version=version,
+        exercises=MappingProxyType({item.id: item for item in items}),
+        ordered_ids=tuple(item.id for item in items),
+        by_muscle=freeze(by_muscle),
+        by_category=freeze(by_category),
+        by_equipment=freeze(by_equipment),
+        search_index=build_search_index(items),
+        neighbors=MappingProxyType(build_neighbors(items, items)),
+        muscle_matrix=build_muscle_matrix(items, settings.secondary_muscle_weight),
+    )
+
+
+@dataclass(frozen=True)
+class UserExercises:
+    """单个用户的自定义动作（不可变快照）"""
+    exercises: Mapping[int, ExerciseResponse]
+    ordered_ids: Tuple[int, ...]  # 按 id 升序
+    search_index: SearchIndex
+    neighbors: Mapping[int, Neighbors]  # 自定义动作 → 预置 + 自定义中的相似动作
+    preset_neighbors: Mapping[int, Neighbors]  # 预置动作 → 自定义中的相似动作
+    muscle_matrix: MuscleMatrix
+    catalog_version: int  # 邻居列表基于的动作库版本
+    data_version: int  # 加载时的用户数据版本号
+
+    def filter_ids(
+        self,
+        muscle_group: Optional[str] = None,
+        category: Optional[str] = None,
+        equipment: Optional[str] = None,
+    ) -> List[int]:
+        """按条件筛选（自定义动作数量少，直接遍历）"""
+        return [
+            i for i in self.ordered_ids
+            if (not muscle_group or self.exercises[i].primary_muscle == muscle_group)
+            and (not category or self.exercises[i].category == category)
+            and (not equipment or self.exercises[i].equipment == equipment)
+        ]
+
+
+# 当前进程的索引（整体替换，读取方无需加锁）
+_catalog: Optional[CatalogIndex] = None
+_checked_at: float = 0.0
+_user_exercises: "OrderedDict[int, UserExercises]" = OrderedDict()
+
+
+async def get_catalog_version(db: AsyncSession) -> int:
+    """读取动作库版本号"""
+    result = await db.execute(
+        select(CatalogState.version).where(CatalogState.id == CATALOG_STATE_ID)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def load_catalog(db: AsyncSession) -> CatalogIndex:
+    """从数据库加载预置动作并替换当前索引"""
+    global _catalog, _checked_at
+
+    version = await get_catalog_version(db)
+    result = await db.execute(select(Exercise).where(Exercise.is_custom == False))
+    _catalog = build_catalog(version, list(result.scalars().all()))
+    _checked_at = time.monotonic()
+    return _catalog
+
+
+async def get_catalog(db: AsyncSession, check_version: bool = False) -> CatalogIndex:
+    """获取预置动作索引（按间隔检查版本号，变化时重新加载；check_version 为真时立即检查）"""
+    global _checked_at
+
+    if _catalog is None:
+        return await load_catalog(db)
+
+    if check_version or time.monotonic() - _checked_at >= settings.catalog_refresh_seconds:
+        if await get_catalog_version(db) != _catalog.version:
+            return await load_catalog(db)
+        _checked_at = time.monotonic()
+
+    return _catalog
+
+
+async def bump_catalog_version(db: AsyncSession) -> int:
+    """预置动作变更后版本号 +1（其他进程在下次检查时重新加载）"""
+    result = await db.execute(
+        update(CatalogState)
+        .where(CatalogState.id == CATALOG_STATE_ID)
+        .values(version=CatalogState.version + 1)
+        .returning(CatalogState.version)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        version = 1
+        db.add(CatalogState(id=CATALOG_STATE_ID, version=version))
+    await db.flush()
+    return version
+
+
+async def get_user_exercises(db: AsyncSession, user_id: int) -> UserExercises:
+    """
+    获取用户自定义动作（数据版本号或动作库版本变化时重新加载）
+
+    版本号与自定义动作在同一事务快照内读取：并发请求即使按提交前的快照加载，
+    缓存项也带着旧版本号，不会被之后的请求误用。
+    """
+    catalog = await get_catalog(db)
+    user = await db.get(User, user_id)  # 接口已加载当前用户，通常命中会话缓存
+    data_version = user.data_version if user else 0
+    cached = _user_exercises.get(user_id)
+    if cached and cached.catalog_version == catalog.version and cached.data_version == data_version:
+        _user_exercises.move_to_end(user_id)
+        return cached
+
+    result = await db.execute(
+        select(Exercise).where(
+            Exercise.is_custom == True,
+            Exercise.user_id == user_id,
+        )
+    )
+    items = sorted(
+        (ExerciseResponse.model_validate(e) for e in result.scalars().all()),
+        key=lambda e: e.id,
+    )
+    presets = list(catalog.exercises.values())
+    user_exercises = UserExercises(
+        exercises=MappingProxyType({item.id: item for item in items}),
+        ordered_ids=tuple(item.id for item in items),
+        search_index=build_search_index(items),
+        neighbors=MappingProxyType(build_neighbors(items, presets + items)),
+        preset_neighbors=MappingProxyType(build_neighbors(presets, items) if items else {}),
+        muscle_matrix=build_muscle_matrix(items, settings.secondary_muscle_weight),
+        catalog_version=catalog.version,
+        data_version=data_version,
+    )
+
+    _user_exercises[user_id] = user_exercises
+    _user_exercises.move_to_end(user_id)
+    while len(_user_exercises) > USER_CACHE_SIZE:
+        _user_exercises.popitem(last=False)
+    return user_exercises
+
+
+async def find_unavailable_exercise_ids(
+    db: AsyncSession,
+    user_id: int,
+    exercise_ids: Iterable[int],
+) -> Set[int]:
+    """
+    校验动作 ID：只允许预置动作和用户自己的自定义动作
+
+    预置动作与自定义动作均走内存缓存；仍有未命中时检查一次动作库版本号，
+    以免遗漏其他进程刚写入的预置动作。
+
+    Returns:
+        不可用的动作 ID（为空表示全部有效）
+    """
+    catalog = await get_catalog(db)
+    missing = {i for i in exercise_ids if i not in catalog.exercises}
+    if not missing:
+        return missing
+
+    user_exercises = await get_user_exercises(db, user_id)
+    missing -= user_exercises.exercises.keys()
+    if missing:
+        catalog = await get_catalog(db, check_version=True)
+        missing -= catalog.exercises.keys()
+    return missing
+
+
+def find_alternatives(
+    catalog: CatalogIndex,
+    user_exercises: UserExercises,
+    exercise_id: int,
+) -> List[Tuple[int, float]]:
+    """读取预先计算的相似动作（预置动作合并用户自定义动作），按相似度降序"""
+    if exercise_id in catalog.exercises:
+        return merge_neighbors(
+            catalog.neighbors.get(exercise_id, ()),
+            user_exercises.preset_neighbors.get(exercise_id, ()),
+        )
+    return merge_neighbors(user_exercises.neighbors.get(exercise_id, ()))
+
+
+def scan_alternatives(
+    catalog: CatalogIndex,
+    user_exercises: UserExercises,
+    exercise_id: int,
+    equipment: Iterable[str],
+) -> List[Tuple[int, float]]:
+    """对指定器械的全部动作（预置 + 自定义）逐个打分，按相似度降序（邻居列表截断后筛选不足时使用）"""
+    target = catalog.exercises.get(exercise_id) or user_exercises.exercises.get(exercise_id)
+    candidates = [
+        catalog.exercises.get(i) or user_exercises.exercises[i]
+        for e in set(equipment)
+        for i in catalog.filter_ids(equipment=e) + user_exercises.filter_ids(equipment=e)
+    ]
+    return rank_candidates(target, candidates)
+
+
+def muscle_weights(
+    catalog: CatalogIndex,
+    user_exercises: UserExercises,
+    exercise_ids: Sequence[int],
+) -> np.ndarray:
+    """按给定动作顺序取出肌群权重行（预置 + 自定义），shape = (动作数, 肌群数)"""
+    return catalog.muscle_matrix.rows(exercise_ids) + user_exercises.muscle_matrix.rows(exercise_ids)
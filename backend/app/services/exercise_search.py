@@ -0,0 +1,202 @@
+"""
+动作名称检索索引
+- 中文名：字符二元组（bigram）倒排，单字查询走单字倒排
+- 拼音：全拼与首字母（如 "wt" → 卧推），基于后缀数组做子串匹配
+- 英文名：单词前缀匹配（有序词表 + 二分查找）
+索引构建后不可变，查询结果按相关度排序。
+"""
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时不支持拼音检索
+    lazy_pinyin = None
+
+
+_CJK_RE = re.compile(r"[一-鿿]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# 相关度得分
+SCORE_EXACT = 100
+SCORE_NAME_PREFIX = 60
+SCORE_NAME_CONTAINS = 45
+SCORE_EN_WORDS = 40
+SCORE_INITIALS_PREFIX = 35
+SCORE_PINYIN_PREFIX = 30
+SCORE_INITIALS_CONTAINS = 25
+SCORE_PINYIN_CONTAINS = 20
+
+# 拼音类型
+_KIND_INITIALS = 0
+_KIND_FULL = 1
+
+
+@dataclass(frozen=True)
+class _Doc:
+    """单个动作的检索字段"""
+    name: str
+    name_en: str
+    initials: str
+    full_pinyin: str
+
+
+def to_pinyin(text: str) -> Tuple[str, str]:
+    """
+    生成 (首字母, 全拼)，非中文部分保留字母数字
+
+    示例: "T杠划船" → ("tghc", "tganghuachuan")
+    """
+    if lazy_pinyin is None:
+        return "", ""
+
+    initials, full = [], []
+    # 中文逐字转为拼音，非中文片段原样返回，统一按单词取首字母
+    for chunk in lazy_pinyin(text):
+        words = _WORD_RE.findall(chunk.lower())
+        initials.extend(w[0] for w in words)
+        full.extend(words)
+    return "".join(initials), "".join(full)
+
+
+def _bigrams(text: str) -> Set[str]:
+    """中文字符二元组（只取连续中文字符）"""
+    grams = set()
+    for run in re.findall(r"[一-鿿]+", text):
+        grams.update(run[i:i + 2] for i in range(len(run) - 1))
+    return grams
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """不可变的动作名称检索索引"""
+    docs: Mapping[int, _Doc]
+    bigrams: Mapping[str, FrozenSet[int]]
+    unigrams: Mapping[str, FrozenSet[int]]
+    en_tokens: Tuple[Tuple[str, int], ...]  # (单词, 动作 ID)，按单词排序
+    pinyin_suffixes: Tuple[Tuple[str, int, int, bool], ...]  # (后缀, 动作 ID, 类型, 是否从开头匹配)
+
+    def search(self, query: str, candidates: Optional[Iterable[int]] = None) -> List[Tuple[int, int]]:
+        """
+        检索动作
+
+        Args:
+            query: 查询词（中文 / 拼音 / 拼音首字母 / 英文）
+            candidates: 只在这些动作 ID 中检索（用于叠加筛选条件）
+
+        Returns:
+            [(动作 ID, 得分)]，按得分降序
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        scores: Dict[int, int] = {}
+
+        def hit(exercise_id: int, score: int):
+            if score > scores.get(exercise_id, 0):
+                scores[exercise_id] = score
+
+        if _CJK_RE.search(query):
+            self._search_chinese(query, hit)
+        else:
+            self._search_english(query, hit)
+            self._search_pinyin(query.replace(" ", ""), hit)
+
+        if candidates is not None:
+            allowed = set(candidates)
+            scores = {k: v for k, v in scores.items() if k in allowed}
+
+        return sorted(scores.items(), key=lambda kv: (-kv[1], len(self.docs[kv[0]].name), kv[0]))
+
+    def _search_chinese(self, query: str, hit):
+        """中文：bigram 求交集得到候选，再校验子串"""
+        grams = _bigrams(query)
+        if grams:
+            postings = sorted((self.bigrams.get(g, frozenset()) for g in grams), key=len)
+            matched = set(postings[0]).intersection(*postings[1:])
+        else:
+            matched = set(self.unigrams.get(_CJK_RE.search(query).group(), frozenset()))
+
+        for exercise_id in matched:
+            name = self.docs[exercise_id].name
+            if name == query:
+                hit(exercise_id, SCORE_EXACT)
+            elif name.startswith(query):
+                hit(exercise_id, SCORE_NAME_PREFIX)
+            elif query in name:
+                hit(exercise_id, SCORE_NAME_CONTAINS)
+
+    def _search_english(self, query: str, hit):
+        """英文：每个查询词都要匹配某个单词的前缀"""
+        words = _WORD_RE.findall(query)
+        if not words:
+            return
+
+        matched: Optional[Set[int]] = None
+        for word in words:
+            ids = set()
+            start = bisect_left(self.en_tokens, (word,))
+            for token, exercise_id in self.en_tokens[start:]:
+                if not token.startswith(word):
+                    break
+                ids.add(exercise_id)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return
+
+        for exercise_id in matched:
+            name_en = self.docs[exercise_id].name_en
+            if name_en == query:
+                hit(exercise_id, SCORE_EXACT)
+            elif name_en.startswith(query):
+                hit(exercise_id, SCORE_NAME_PREFIX)
+            else:
+                hit(exercise_id, SCORE_EN_WORDS)
+
+    def _search_pinyin(self, query: str, hit):
+        """拼音 / 首字母：后缀数组前缀匹配 = 子串匹配"""
+        start = bisect_left(self.pinyin_suffixes, (query,))
+        for suffix, exercise_id, kind, at_start in self.pinyin_suffixes[start:]:
+            if not suffix.startswith(query):
+                break
+            if kind == _KIND_INITIALS:
+                hit(exercise_id, SCORE_INITIALS_PREFIX if at_start else SCORE_INITIALS_CONTAINS)
+            else:
+                hit(exercise_id, SCORE_PINYIN_PREFIX if at_start else SCORE_PINYIN_CONTAINS)
+
+
+def build_search_index(exercises: Iterable) -> SearchIndex:
+    """由动作（需有 id / name / name_en 属性）构建检索索引"""
+    docs: Dict[int, _Doc] = {}
+    bigrams: Dict[str, Set[int]] = {}
+    unigrams: Dict[str, Set[int]] = {}
+    en_tokens: List[Tuple[str, int]] = []
+    pinyin_suffixes: List[Tuple[str, int, int, bool]] = []
+
+    for exercise in exercises:
+        name = exercise.name.lower()
+        name_en = (exercise.name_en or "").lower()
+        initials, full_pinyin = to_pinyin(exercise.name)
+        docs[exercise.id] = _Doc(name=name, name_en=name_en, initials=initials, full_pinyin=full_pinyin)
+
+        for gram in _bigrams(name):
+            bigrams.setdefault(gram, set()).add(exercise.id)
+        for char in set(_CJK_RE.findall(name)):
+            unigrams.setdefault(char, set()).add(exercise.id)
+        for token in set(_WORD_RE.findall(name_en)):
+            en_tokens.append((token, exercise.id))
+        for kind, text in ((_KIND_INITIALS, initials), (_KIND_FULL, full_pinyin)):
+            for i in range(len(text)):
+                pinyin_suffixes.append((text[i:], exercise.id, kind, i == 0))
+
+    return SearchIndex(
+        docs=MappingProxyType(docs),
+        bigrams=MappingProxyType({k: frozenset(v) for k, v in bigrams.items()}),
+        unigrams=MappingProxyType({k: frozenset(v) for k, v in unigrams.items()}),
+        en_tokens=tuple(sorted(en_tokens)),
+        pinyin_suffixes=tuple(sorted(pinyin_suffixes)),
+    )
@@ -0,0 +1,89 @@
+"""
+动作相似度（替代动作推荐）
+按主肌群、全部参与肌群（主 + 辅助）、分类、器械、难度加权打分。
+邻居列表在动作库加载 / 自定义动作变更时预先计算，查询只读取 top-k；
+按器械筛选后不足时（少见器械可能不在 top-k 内）改为对该器械的动作逐个打分。
+"""
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.schemas.exercise import ExerciseResponse
+
+
+# 相似度权重（合计 1.0）
+WEIGHT_PRIMARY = 0.4  # 主肌群相同
+WEIGHT_MUSCLES = 0.25  # 参与肌群的 Jaccard 系数
+WEIGHT_CATEGORY = 0.15  # 复合 / 孤立相同
+WEIGHT_EQUIPMENT = 0.1  # 器械相同
+WEIGHT_DIFFICULTY = 0.1  # 难度越接近越高（1-5）
+
+# 每个动作保留的邻居数与最低相似度
+MAX_NEIGHBORS = 30
+MIN_SIMILARITY = 0.4
+
+Neighbors = Tuple[Tuple[int, float], ...]  # ((动作 ID, 相似度), ...)，按相似度降序
+
+
+def _muscles(exercise: ExerciseResponse) -> Set[str]:
+    return {exercise.primary_muscle, *(exercise.secondary_muscles or [])}
+
+
+def similarity(a: ExerciseResponse, b: ExerciseResponse) -> float:
+    """两个动作的相似度（0-1）"""
+    muscles_a, muscles_b = _muscles(a), _muscles(b)
+    score = WEIGHT_MUSCLES * len(muscles_a & muscles_b) / len(muscles_a | muscles_b)
+    if a.primary_muscle == b.primary_muscle:
+        score += WEIGHT_PRIMARY
+    if a.category == b.category:
+        score += WEIGHT_CATEGORY
+    if a.equipment == b.equipment:
+        score += WEIGHT_EQUIPMENT
+    score += WEIGHT_DIFFICULTY * (1 - abs(a.difficulty - b.difficulty) / 4)
+    return round(score, 4)
+
+
+def rank_candidates(
+    target: ExerciseResponse,
+    candidates: Iterable[ExerciseResponse],
+) -> List[Tuple[int, float]]:
+    """对候选动作打分，保留达到最低相似度的，按相似度降序（同分按 id 升序）"""
+    scored = [(c.id, similarity(target, c)) for c in candidates if c.id != target.id]
+    return sorted(
+        (hit for hit in scored if hit[1] >= MIN_SIMILARITY),
+        key=lambda hit: (-hit[1], hit[0]),
+    )
+
+
+def build_neighbors(
+    targets: Iterable[ExerciseResponse],
+    pool: Iterable[ExerciseResponse],
+) -> Dict[int, Neighbors]:
+    """
+    为 targets 中每个动作在 pool 中找出最相似的动作
+
+    只对共享至少一个参与肌群的动作打分（不共享肌群的动作达不到最低相似度）。
+    """
+    pool = list(pool)
+    by_muscle: Dict[str, List[ExerciseResponse]] = {}
+    for candidate in pool:
+        for muscle in _muscles(candidate):
+            by_muscle.setdefault(muscle, []).append(candidate)
+
+    neighbors: Dict[int, Neighbors] = {}
+    for target in targets:
+        candidates = {
+            c.id: c
+            for muscle in _muscles(target)
+            for c in by_muscle.get(muscle, ())
+        }
+        top = rank_candidates(target, candidates.values())[:MAX_NEIGHBORS]
+        if top:
+            neighbors[target.id] = tuple(top)
+    return neighbors
+
+
+def merge_neighbors(*lists: Neighbors) -> List[Tuple[int, float]]:
+    """合并多个邻居列表（预置 + 自定义），按相似度降序"""
+    return sorted(
+        (hit for hits in lists for hit in hits),
+        key=lambda hit: (-hit[1], hit[0]),
+    )
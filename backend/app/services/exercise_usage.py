@@ -0,0 +1,234 @@
+"""
+用户动作使用统计
+按 用户 × 动作 维护累计组数、最近使用日期和最近一次训练课指针，由训练写操作增量更新，
+动作选择器的「最近使用」「常用排序」与「上次表现」直接读取，无需对训练组做 GROUP BY。
+"""
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+from sqlalchemy import select, update, delete, case, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.stats import ExerciseUsage
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.schemas.exercise import LastPerformanceResponse
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+# 上次表现缓存的最大条目数（用户 × 动作）
+LAST_PERFORMANCE_CACHE_SIZE = 4096
+
+# (user_id, exercise_id) -> (data_version, 上次表现)
+_last_performance: "OrderedDict[Tuple[int, int], Tuple[int, LastPerformanceResponse]]" = OrderedDict()
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+) -> None:
+    """增量更新使用统计（只改重量 / 次数的修改会相互抵消，不产生写入）"""
+    net: Counter = Counter()
+    for s in added:
+        net[(s.exercise_id, s.date, s.session_id)] += 1
+    for s in removed:
+        net[(s.exercise_id, s.date, s.session_id)] -= 1
+
+    # 每个动作的最近一次训练按 (日期, 训练课 ID) 比较
+    deltas: Dict[int, int] = {}
+    added_latest: Dict[int, Tuple[date, int]] = {}
+    removed_latest: Dict[int, Tuple[date, int]] = {}
+    for (exercise_id, day, session_id), n in net.items():
+        if n == 0:
+            continue
+        deltas[exercise_id] = deltas.get(exercise_id, 0) + n
+        target = added_latest if n > 0 else removed_latest
+        if (day, session_id) > target.get(exercise_id, (date.min, 0)):
+            target[exercise_id] = (day, session_id)
+
+    if not deltas:
+        return
+
+    stmt = upsert_insert(ExerciseUsage)
+    newer = or_(
+        stmt.excluded.last_used > ExerciseUsage.last_used,
+        and_(
+            stmt.excluded.last_used == ExerciseUsage.last_used,
+            stmt.excluded.last_session_id > func.coalesce(ExerciseUsage.last_session_id, 0),
+        ),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ExerciseUsage.user_id, ExerciseUsage.exercise_id],
+        set_={
+            "use_count": ExerciseUsage.use_count + stmt.excluded.use_count,
+            "last_used": case((newer, stmt.excluded.last_used), else_=ExerciseUsage.last_used),
+            "last_session_id": case((newer, stmt.excluded.last_session_id), else_=ExerciseUsage.last_session_id),
+            "updated_at": func.now(),
+        },
+    )
+    rows = []
+    for exercise_id, delta in deltas.items():
+        if exercise_id in added_latest:
+            last_used, last_session_id = added_latest[exercise_id]
+        else:
+            # 只有删除：不改动指针（被删的训练课可能已不存在），稍后按需重算
+            last_used, last_session_id = removed_latest[exercise_id][0], None
+        rows.append({
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "use_count": delta,
+            "last_used": last_used,
+            "last_session_id": last_session_id,
+        })
+    await db.execute(stmt, rows)
+
+    if removed_latest:
+        await _fix_after_removal(db, user_id, removed_latest)
+
+
+async def _fix_after_removal(
+    db: AsyncSession,
+    user_id: int,
+    removed_latest: Dict[int, Tuple[date, int]],
+) -> None:
+    """删除训练组后：清理计数归零的行；删掉的可能是最近一次训练时重算指针"""
+    exercise_ids = list(removed_latest)
+    await db.execute(
+        delete(ExerciseUsage).where(
+            ExerciseUsage.user_id == user_id,
+            ExerciseUsage.exercise_id.in_(exercise_ids),
+            ExerciseUsage.use_count <= 0,
+        )
+    )
+
+    result = await db.execute(
+        select(
+            ExerciseUsage.exercise_id,
+            ExerciseUsage.last_used,
+            ExerciseUsage.last_session_id,
+        ).where(
+            ExerciseUsage.user_id == user_id,
+            ExerciseUsage.exercise_id.in_(exercise_ids),
+        )
+    )
+    stale_ids = [
+        row.exercise_id for row in result.all()
+        if removed_latest[row.exercise_id] >= (row.last_used, row.last_session_id or 0)
+    ]
+    if not stale_ids:
+        return
+
+    # 每个动作取 (日期, 训练课 ID) 最大的一行（窗口函数，一次查询）
+    ranked = (
+        select(
+            WorkoutSet.exercise_id,
+            WorkoutSession.date,
+            WorkoutSession.id.label("session_id"),
+            func.row_number().over(
+                partition_by=WorkoutSet.exercise_id,
+                order_by=(WorkoutSession.date.desc(), WorkoutSession.id.desc()),
+            ).label("rn"),
+        )
+        .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+        .where(
+            WorkoutSession.user_id == user_id,
+            WorkoutSet.is_flagged == False,
+            WorkoutSet.exercise_id.in_(stale_ids),
+        )
+        .subquery()
+    )
+    result = await db.execute(
+        select(ranked.c.exercise_id, ranked.c.date, ranked.c.session_id).where(ranked.c.rn == 1)
+    )
+    rows = [
+        {
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "last_used": last_used,
+            "last_session_id": session_id,
+        }
+        for exercise_id, last_used, session_id in result.all()
+    ]
+    if rows:
+        await db.execute(update(ExerciseUsage), rows)
+
+
+async def clear(db: AsyncSession, user_id: int) -> None:
+    """清空用户的使用统计（重建前调用）"""
+    await db.execute(delete(ExerciseUsage).where(ExerciseUsage.user_id == user_id))
+
+
+async def get_recent_usage(db: AsyncSession, user_id: int, limit: int) -> List[ExerciseUsage]:
+    """最近使用的动作（按最近训练日期倒序）"""
+    result = await db.execute(
+        select(ExerciseUsage)
+        .where(ExerciseUsage.user_id == user_id)
+        .order_by(ExerciseUsage.last_used.desc(), ExerciseUsage.use_count.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def get_usage_ranking(db: AsyncSession, user_id: int) -> List[int]:
+    """用户用过的动作 ID，按累计组数降序"""
+    result = await db.execute(
+        select(ExerciseUsage.exercise_id)
+        .where(ExerciseUsage.user_id == user_id)
+        .order_by(ExerciseUsage.use_count.desc(), ExerciseUsage.exercise_id)
+    )
+    return list(result.scalars().all())
+
+
+async def get_last_performance(
+    db: AsyncSession,
+    user_id: int,
+    data_version: int,
+    exercise_id: int,
+) -> LastPerformanceResponse:
+    """
+    上次表现：最近一次包含该动作的训练课中该动作的训练组
+
+    读使用统计表的指针（主键查询）再按训练课取组；结果按用户数据版本号缓存，
+    用户任何写操作都会使版本号变化，缓存无需主动失效。
+    """
+    key = (user_id, exercise_id)
+    cached = _last_performance.get(key)
+    if cached and cached[0] == data_version:
+        _last_performance.move_to_end(key)
+        return cached[1]
+
+    result = await db.execute(
+        select(ExerciseUsage.last_session_id, ExerciseUsage.last_used).where(
+            ExerciseUsage.user_id == user_id,
+            ExerciseUsage.exercise_id == exercise_id,
+        )
+    )
+    pointer = result.one_or_none()
+
+    performance = LastPerformanceResponse(exercise_id=exercise_id)
+    if pointer and pointer.last_session_id is not None:
+        result = await db.execute(
+            select(WorkoutSet)
+            .where(
+                WorkoutSet.session_id == pointer.last_session_id,
+                WorkoutSet.exercise_id == exercise_id,
+            )
+            .order_by(WorkoutSet.set_order)
+        )
+        performance = LastPerformanceResponse(
+            exercise_id=exercise_id,
+            session_id=pointer.last_session_id,
+            date=pointer.last_used,
+            sets=result.scalars().all(),
+        )
+
+    _last_performance[key] = (data_version, performance)
+    _last_performance.move_to_end(key)
+    while len(_last_performance) > LAST_PERFORMANCE_CACHE_SIZE:
+        _last_performance.popitem(last=False)
+    return performance
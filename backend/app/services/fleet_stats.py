@@ -0,0 +1,166 @@
+"""
+全站动作统计（管理后台，用于动作库维护）
+- 使用人数：每个 动作 × 月 一个 HyperLogLog，查询时跨月合并
+- 训练容量：每月一个 Count-Min Sketch（按用户分片），查询时跨月 / 跨分片合并
+训练写操作时增量更新，查询不扫描训练组。只统计预置动作。
+"""
+from collections import defaultdict
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.stats import FleetSketch
+from app.services.exercise_catalog import get_catalog
+from app.utils.sketches import HyperLogLog, CountMinSketch
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+KIND_USERS = "users_hll"
+KIND_VOLUME = "volume_cms"
+
+HLL_PRECISION = 10  # 1024 个寄存器，每个 1KB，相对误差约 3.3%
+CMS_WIDTH = 1024
+CMS_DEPTH = 4
+VOLUME_SHARDS = 8  # 容量草图按 user_id 分片，避免所有写操作争用同一行
+
+
+def _month(day: date) -> str:
+    return day.strftime("%Y-%m")
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+) -> None:
+    """增量更新全站草图（容量支持增减；使用人数的 HyperLogLog 不支持删除，只记录新增）"""
+    catalog = await get_catalog(db)
+
+    volume: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+    for sign, sets in ((1, added), (-1, removed)):
+        for s in sets:
+            if s.exercise_id in catalog.exercises:
+                volume[_month(s.date)][s.exercise_id] += sign * s.weight * s.reps
+
+    user_keys = {
+        f"{s.exercise_id}:{_month(s.date)}"
+        for s in added
+        if s.exercise_id in catalog.exercises
+    }
+
+    await _update_volume(db, user_id % VOLUME_SHARDS, volume)
+    await _update_users(db, user_id, user_keys)
+
+
+async def _load_sketches(
+    db: AsyncSession,
+    kind: str,
+    keys: Iterable[str],
+    shard: int = 0,
+) -> Dict[str, bytes]:
+    """读取草图并加行锁（PostgreSQL 下防止并发写覆盖）"""
+    result = await db.execute(
+        select(FleetSketch.key, FleetSketch.data)
+        .where(
+            FleetSketch.kind == kind,
+            FleetSketch.key.in_(list(keys)),
+            FleetSketch.shard == shard,
+        )
+        .with_for_update()
+    )
+    return dict(result.all())
+
+
+async def _save_sketches(db: AsyncSession, rows: List[dict]) -> None:
+    if not rows:
+        return
+    stmt = upsert_insert(FleetSketch)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FleetSketch.kind, FleetSketch.key, FleetSketch.shard],
+        set_={"data": stmt.excluded.data, "updated_at": func.now()},
+    )
+    await db.execute(stmt, rows)
+
+
+async def _update_volume(db: AsyncSession, shard: int, volume: Dict[str, Dict[int, float]]) -> None:
+    volume = {
+        month: {exercise_id: delta for exercise_id, delta in deltas.items() if delta}
+        for month, deltas in volume.items()
+    }
+    volume = {month: deltas for month, deltas in volume.items() if deltas}
+    if not volume:
+        return
+
+    stored = await _load_sketches(db, KIND_VOLUME, volume, shard)
+    rows = []
+    for month, deltas in volume.items():
+        sketch = CountMinSketch(CMS_WIDTH, CMS_DEPTH, stored.get(month))
+        for exercise_id, delta in deltas.items():
+            sketch.add(exercise_id, delta)
+        rows.append({"kind": KIND_VOLUME, "key": month, "shard": shard, "data": sketch.to_bytes()})
+    await _save_sketches(db, rows)
+
+
+async def _update_users(db: AsyncSession, user_id: int, keys: Iterable[str]) -> None:
+    if not keys:
+        return
+
+    stored = await _load_sketches(db, KIND_USERS, keys)
+    rows = []
+    for key in keys:
+        sketch = HyperLogLog(HLL_PRECISION, stored.get(key))
+        # 同一用户重复训练同一动作时寄存器不变，不回写
+        if sketch.add(user_id) or key not in stored:
+            rows.append({"kind": KIND_USERS, "key": key, "shard": 0, "data": sketch.to_bytes()})
+    await _save_sketches(db, rows)
+
+
+async def get_exercise_stats(
+    db: AsyncSession,
+    month: Optional[str] = None,
+) -> Tuple[Dict[int, float], CountMinSketch, float]:
+    """
+    合并草图得到各动作的使用人数与容量估计
+
+    Args:
+        month: "YYYY-MM"，为空时统计全部月份
+
+    Returns:
+        (动作 ID → 使用人数估计, 合并后的容量草图, 使用人数相对误差)
+    """
+    query = select(FleetSketch.key, FleetSketch.data).where(FleetSketch.kind == KIND_USERS)
+    if month:
+        query = query.where(FleetSketch.key.like(f"%:{month}"))
+    result = await db.execute(query)
+
+    merged: Dict[int, HyperLogLog] = {}
+    for key, data in result.all():
+        exercise_id = int(key.split(":", 1)[0])
+        sketch = HyperLogLog(HLL_PRECISION, data)
+        if exercise_id in merged:
+            merged[exercise_id].merge(sketch)
+        else:
+            merged[exercise_id] = sketch
+
+    query = select(FleetSketch.data).where(FleetSketch.kind == KIND_VOLUME)
+    if month:
+        query = query.where(FleetSketch.key == month)
+    result = await db.execute(query)
+
+    volume = CountMinSketch(CMS_WIDTH, CMS_DEPTH)
+    for data in result.scalars().all():
+        volume.merge(CountMinSketch(CMS_WIDTH, CMS_DEPTH, data))
+
+    users = {exercise_id: sketch.count() for exercise_id, sketch in merged.items()}
+    return users, volume, HyperLogLog(HLL_PRECISION).relative_error
+
+
+async def clear(db: AsyncSession) -> None:
+    """清空全站草图（全量重建前调用）"""
+    await db.execute(delete(FleetSketch).where(FleetSketch.kind.in_([KIND_USERS, KIND_VOLUME])))
@@ -0,0 +1,119 @@
+"""
+相对强度分布
+每组的相对强度 = 重量 / 截至当天的历史最佳 e1RM（取每日最佳 e1RM 的累计最大值）。
+读取区间内的训练组和每日最佳 e1RM 各一次查询，其余计算均为 NumPy 数组运算。
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stats import DailyBestE1RM
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.services.rm_calculator import calculate_relative_intensities
+
+
+# 强度区间 (%1RM)：(下限, 键, 名称)，区间左闭右开；设计文档中相邻目标的区间有重叠，按下限划分
+INTENSITY_ZONES = (
+    (0, "light", "热身 / 恢复"),
+    (50, "endurance", "肌耐力"),
+    (65, "hypertrophy", "肌肥大 (容量)"),
+    (75, "strength_hypertrophy", "力量+肌肥大"),
+    (85, "strength", "绝对力量"),
+)
+ZONE_EDGES = np.array([lower for lower, _, _ in INTENSITY_ZONES[1:]], dtype=float)
+
+
+@dataclass
+class SetIntensities:
+    """区间内各训练组（按数组存储，下标一一对应）"""
+    exercise_ids: np.ndarray  # int
+    dates: np.ndarray  # datetime64[D]
+    intensities: np.ndarray  # %1RM
+    zones: np.ndarray  # INTENSITY_ZONES 下标
+
+
+def _empty() -> SetIntensities:
+    return SetIntensities(
+        exercise_ids=np.array([], dtype=np.int64),
+        dates=np.array([], dtype="datetime64[D]"),
+        intensities=np.array([], dtype=float),
+        zones=np.array([], dtype=np.int64),
+    )
+
+
+async def get_set_intensities(
+    db: AsyncSession,
+    user_id: int,
+    start: date,
+    end: date,
+    exercise_id: Optional[int] = None,
+) -> SetIntensities:
+    """计算区间内每组相对于当日滚动最佳 e1RM 的相对强度"""
+    conditions = [
+        WorkoutSession.user_id == user_id,
+        WorkoutSet.is_flagged == False,
+        WorkoutSession.date >= start,
+        WorkoutSession.date <= end,
+    ]
+    if exercise_id is not None:
+        conditions.append(WorkoutSet.exercise_id == exercise_id)
+    result = await db.execute(
+        select(WorkoutSet.exercise_id, WorkoutSession.date, WorkoutSet.weight)
+        .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+        .where(*conditions)
+    )
+    sets = result.all()
+    if not sets:
+        return _empty()
+
+    # 滚动最佳需要区间之前的历史，每日最佳表每个训练日每个动作只有一行
+    conditions = [DailyBestE1RM.user_id == user_id, DailyBestE1RM.date <= end]
+    if exercise_id is not None:
+        conditions.append(DailyBestE1RM.exercise_id == exercise_id)
+    result = await db.execute(
+        select(DailyBestE1RM.exercise_id, DailyBestE1RM.date, DailyBestE1RM.e1rm)
+        .where(*conditions)
+        .order_by(DailyBestE1RM.exercise_id, DailyBestE1RM.date)
+    )
+    best_rows = result.all()
+    if not best_rows:
+        return _empty()
+
+    set_exercises = np.array([row[0] for row in sets], dtype=np.int64)
+    set_dates = np.array([row[1] for row in sets], dtype="datetime64[D]")
+    weights = np.array([row[2] for row in sets], dtype=float)
+
+    best_exercises = np.array([row[0] for row in best_rows], dtype=np.int64)
+    best_days = np.array([row[1] for row in best_rows], dtype="datetime64[D]").astype(np.int64)
+    best_values = np.array([row[2] for row in best_rows], dtype=float)
+
+    # 分组累计最大值：按动作排序后给每组加上递增的偏移量，整体 maximum.accumulate 后再减去
+    groups, group_index = np.unique(best_exercises, return_inverse=True)
+    offset = (best_values.max() + 1) * group_index
+    rolling_best = np.maximum.accumulate(best_values + offset) - offset
+
+    # 每组在 (动作, 日期) 有序键上二分查找当天或之前最近的一行
+    span = int(max(best_days.max(), set_dates.astype(np.int64).max())) + 1
+    best_keys = group_index * span + best_days
+    set_groups = np.searchsorted(groups, set_exercises)
+    known = (set_groups < len(groups)) & (groups[np.minimum(set_groups, len(groups) - 1)] == set_exercises)
+    set_keys = set_groups * span + set_dates.astype(np.int64)
+    positions = np.searchsorted(best_keys, set_keys, side="right") - 1
+    matched = known & (positions >= 0)
+    matched[matched] &= group_index[positions[matched]] == set_groups[matched]
+
+    estimated_1rms = np.zeros_like(weights)
+    estimated_1rms[matched] = rolling_best[positions[matched]]
+    intensities = calculate_relative_intensities(weights, estimated_1rms)
+
+    # 没有 e1RM 记录的组（统计尚未重建）不参与分布
+    return SetIntensities(
+        exercise_ids=set_exercises[matched],
+        dates=set_dates[matched],
+        intensities=intensities[matched],
+        zones=np.searchsorted(ZONE_EDGES, intensities[matched], side="right"),
+    )
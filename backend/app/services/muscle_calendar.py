@@ -0,0 +1,167 @@
+"""
+肌群训练日历
+每个 用户 × 肌群 × 年 一个 366 位的位图，某天练到该肌群（主肌群或辅助肌群）则置位。
+训练写操作时只重算受影响的日期；热力图读取当年最多十几个位图，按周统计用 popcount。
+"""
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, List, Sequence, Set, Tuple
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.exercise import MUSCLE_GROUPS
+from app.models.stats import MuscleDayBitmap
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.services.exercise_catalog import get_catalog, get_user_exercises
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+BITMAP_BYTES = 46  # 366 位
+
+
+def day_bit(day: date) -> int:
+    """日期在当年位图中的位号"""
+    return day.timetuple().tm_yday - 1
+
+
+def popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+) -> None:
+    """重算受影响日期的位（删除后当天可能仍有其他动作练到同一肌群，因此按当天实际数据重算）"""
+    net: Counter = Counter()
+    for s in added:
+        net[(s.exercise_id, s.date)] += 1
+    for s in removed:
+        net[(s.exercise_id, s.date)] -= 1
+    days = {day for (_, day), n in net.items() if n}
+    if not days:
+        return
+
+    muscles_by_day = await _trained_muscles(db, user_id, days)
+
+    years = {day.year for day in days}
+    bitmaps = await _load_bitmaps(db, user_id, years)
+    changed: Set[Tuple[str, int]] = set()
+    for day in days:
+        bit = 1 << day_bit(day)
+        for muscle in MUSCLE_GROUPS:
+            key = (muscle, day.year)
+            value = bitmaps.get(key, 0)
+            updated = value | bit if muscle in muscles_by_day.get(day, ()) else value & ~bit
+            if updated != value:
+                bitmaps[key] = updated
+                changed.add(key)
+
+    if not changed:
+        return
+
+    stmt = upsert_insert(MuscleDayBitmap)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MuscleDayBitmap.user_id, MuscleDayBitmap.muscle, MuscleDayBitmap.year],
+        set_={"data": stmt.excluded.data},
+    )
+    await db.execute(stmt, [
+        {
+            "user_id": user_id,
+            "muscle": muscle,
+            "year": year,
+            "data": bitmaps[(muscle, year)].to_bytes(BITMAP_BYTES, "little"),
+        }
+        for muscle, year in changed
+    ])
+
+
+async def _trained_muscles(db: AsyncSession, user_id: int, days: Set[date]) -> Dict[date, Set[str]]:
+    """查询指定日期练到的肌群（主肌群 + 辅助肌群）"""
+    result = await db.execute(
+        select(WorkoutSession.date, WorkoutSet.exercise_id)
+        .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+        .where(
+            WorkoutSession.user_id == user_id,
+            WorkoutSet.is_flagged == False,
+            WorkoutSession.date.in_(days),
+        )
+        .distinct()
+    )
+    rows = result.all()
+    if not rows:
+        return {}
+
+    catalog = await get_catalog(db)
+    user_exercises = await get_user_exercises(db, user_id)
+    muscles_by_day: Dict[date, Set[str]] = defaultdict(set)
+    for day, exercise_id in rows:
+        exercise = catalog.exercises.get(exercise_id) or user_exercises.exercises.get(exercise_id)
+        if exercise:
+            muscles_by_day[day].add(exercise.primary_muscle)
+            muscles_by_day[day].update(exercise.secondary_muscles or ())
+    return muscles_by_day
+
+
+async def _load_bitmaps(db: AsyncSession, user_id: int, years: Set[int]) -> Dict[Tuple[str, int], int]:
+    result = await db.execute(
+        select(MuscleDayBitmap.muscle, MuscleDayBitmap.year, MuscleDayBitmap.data).where(
+            MuscleDayBitmap.user_id == user_id,
+            MuscleDayBitmap.year.in_(years),
+        )
+    )
+    return {(muscle, year): int.from_bytes(data, "little") for muscle, year, data in result.all()}
+
+
+async def clear(db: AsyncSession, user_id: int) -> None:
+    """清空用户的训练日历（重建前调用）"""
+    await db.execute(delete(MuscleDayBitmap).where(MuscleDayBitmap.user_id == user_id))
+
+
+async def get_year_bitmaps(db: AsyncSession, user_id: int, year: int) -> Dict[str, int]:
+    """读取用户某年各肌群的位图（肌群 → 位图整数）"""
+    bitmaps = await _load_bitmaps(db, user_id, {year})
+    return {muscle: value for (muscle, _), value in bitmaps.items() if value}
+
+
+def week_starts(year: int) -> List[date]:
+    """当年各周的周一（第一周从 1 月 1 日所在周的周一开始）"""
+    first = date(year, 1, 1)
+    monday = first - timedelta(days=first.weekday())
+    weeks = []
+    while monday.year <= year:
+        weeks.append(monday)
+        monday += timedelta(days=7)
+    return weeks
+
+
+def weekly_counts(bitmap: int, year: int) -> List[int]:
+    """按周统计训练天数（每周 7 位做 popcount，跨年的周只统计当年部分）"""
+    counts = []
+    for monday in week_starts(year):
+        start = (monday - date(year, 1, 1)).days
+        if start < 0:
+            mask = (1 << (7 + start)) - 1
+            counts.append(popcount(bitmap & mask))
+        else:
+            counts.append(popcount((bitmap >> start) & 0x7F))
+    return counts
+
+
+def bitmap_days(bitmap: int, year: int) -> List[date]:
+    """位图中置位的日期"""
+    first = date(year, 1, 1)
+    days = []
+    offset = 0
+    while bitmap:
+        if bitmap & 1:
+            days.append(first + timedelta(days=offset))
+        bitmap >>= 1
+        offset += 1
+    return days
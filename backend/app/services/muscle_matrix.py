@@ -0,0 +1,51 @@
+"""
+动作 → 肌群权重矩阵
+主肌群权重 1.0，辅助肌群权重为 settings.secondary_muscle_weight。
+矩阵随动作索引预先构建（每行只有 1-4 个非零值；肌群只有十几个，按稠密数组存储更省也更快），
+肌群统计 = 各动作的统计向量 × 权重矩阵，一次矩阵乘法完成。
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+from app.models.exercise import MUSCLE_GROUPS
+from app.schemas.exercise import ExerciseResponse
+
+
+MUSCLE_INDEX = MappingProxyType({muscle: i for i, muscle in enumerate(MUSCLE_GROUPS)})
+
+
+@dataclass(frozen=True)
+class MuscleMatrix:
+    """动作 × 肌群权重矩阵（只读）"""
+    row_of: Mapping[int, int]  # 动作 ID → 行号
+    weights: np.ndarray  # shape = (动作数, 肌群数)
+
+    def rows(self, exercise_ids: Sequence[int]) -> np.ndarray:
+        """按给定动作顺序取出权重行（不在矩阵中的动作为全零行）"""
+        out = np.zeros((len(exercise_ids), len(MUSCLE_GROUPS)))
+        positions = [(i, self.row_of[e]) for i, e in enumerate(exercise_ids) if e in self.row_of]
+        if positions:
+            out_idx, row_idx = zip(*positions)
+            out[list(out_idx)] = self.weights[list(row_idx)]
+        return out
+
+
+def build_muscle_matrix(exercises: Iterable[ExerciseResponse], secondary_weight: float) -> MuscleMatrix:
+    """由动作的主 / 辅助肌群构建权重矩阵"""
+    exercises = list(exercises)
+    weights = np.zeros((len(exercises), len(MUSCLE_GROUPS)))
+    for row, exercise in enumerate(exercises):
+        for muscle in exercise.secondary_muscles or ():
+            if muscle in MUSCLE_INDEX:
+                weights[row, MUSCLE_INDEX[muscle]] = secondary_weight
+        if exercise.primary_muscle in MUSCLE_INDEX:
+            weights[row, MUSCLE_INDEX[exercise.primary_muscle]] = 1.0
+    weights.setflags(write=False)
+
+    return MuscleMatrix(
+        row_of=MappingProxyType({exercise.id: row for row, exercise in enumerate(exercises)}),
+        weights=weights,
+    )
@@ -0,0 +1,320 @@
+"""
+个人纪录
+按 用户 × 动作 维护 1-20 次的次数最大重量、最佳 e1RM 与单次训练最大容量。
+新增训练组只与现有纪录比较；只有纪录保持者被修改或删除时才从原始记录重算该项。
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, delete, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.stats import PersonalRecord
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.schemas.analysis import NewPersonalRecord
+from app.services.rm_calculator import calculate_1rm
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+KIND_REP_MAX = "rep_max"
+KIND_E1RM = "e1rm"
+KIND_SESSION_VOLUME = "session_volume"
+
+MAX_REP_MAX_REPS = 20
+
+# (exercise_id, kind, reps)
+RecordKey = Tuple[int, str, int]
+
+
+@dataclass(frozen=True)
+class _Record:
+    value: float
+    set_id: Optional[int]
+    session_id: Optional[int]
+    date: date
+
+
+def _set_candidates(sets: Iterable["SetSnapshot"]) -> Dict[RecordKey, _Record]:
+    """训练组能刷新的单组纪录（次数最大重量、e1RM），同一项取最好的一组"""
+    best: Dict[RecordKey, _Record] = {}
+
+    def offer(key: RecordKey, record: _Record) -> None:
+        if key not in best or record.value > best[key].value:
+            best[key] = record
+
+    for s in sets:
+        if 1 <= s.reps <= MAX_REP_MAX_REPS:
+            offer((s.exercise_id, KIND_REP_MAX, s.reps), _Record(s.weight, s.id, s.session_id, s.date))
+        e1rm = calculate_1rm(s.weight, s.reps, s.rpe).estimated_1rm
+        offer((s.exercise_id, KIND_E1RM, 0), _Record(e1rm, s.id, s.session_id, s.date))
+    return best
+
+
+async def _session_volumes(
+    db: AsyncSession,
+    user_id: int,
+    exercise_ids: Set[int],
+    session_ids: Optional[Set[int]] = None,
+) -> Dict[int, _Record]:
+    """各动作单次训练容量的最大值（可限定训练课范围）"""
+    query = (
+        select(
+            WorkoutSet.exercise_id,
+            WorkoutSet.session_id,
+            WorkoutSession.date,
+            func.sum(WorkoutSet.weight * WorkoutSet.reps).label("volume"),
+        )
+        .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+        .where(
+            WorkoutSession.user_id == user_id,
+            WorkoutSet.is_flagged == False,
+            WorkoutSet.exercise_id.in_(exercise_ids),
+        )
+        .group_by(WorkoutSet.exercise_id, WorkoutSet.session_id, WorkoutSession.date)
+    )
+    if session_ids is not None:
+        query = query.where(WorkoutSet.session_id.in_(session_ids))
+    result = await db.execute(query)
+
+    best: Dict[int, _Record] = {}
+    for exercise_id, session_id, day, volume in result.all():
+        record = _Record(float(volume), None, session_id, day)
+        if exercise_id not in best or record.value > best[exercise_id].value:
+            best[exercise_id] = record
+    return best
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+) -> List[NewPersonalRecord]:
+    """
+    增量更新个人纪录
+
+    Returns:
+        被新增（或修改后）的训练组刷新的纪录
+    """
+    exercise_ids = {s.exercise_id for s in added} | {s.exercise_id for s in removed}
+    if not exercise_ids:
+        return []
+
+    result = await db.execute(
+        select(PersonalRecord).where(
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.exercise_id.in_(exercise_ids),
+        )
+    )
+    current: Dict[RecordKey, _Record] = {
+        (r.exercise_id, r.kind, r.reps): _Record(r.value, r.set_id, r.session_id, r.date)
+        for r in result.scalars().all()
+    }
+
+    # 纪录保持者被修改 / 删除（删除后外键已被置空）的项需要重算
+    removed_set_ids = {s.id for s in removed}
+    removed_sessions = {(s.exercise_id, s.session_id) for s in removed}
+    stale: Set[RecordKey] = set()
+    for key, record in current.items():
+        exercise_id, kind, _ = key
+        if kind == KIND_SESSION_VOLUME:
+            if record.session_id is None or (exercise_id, record.session_id) in removed_sessions:
+                stale.add(key)
+        elif record.set_id is None or record.set_id in removed_set_ids:
+            stale.add(key)
+
+    candidates = _set_candidates(added)
+    if added:
+        # 新增组会改变所在训练课的容量，按训练课重新汇总
+        volumes = await _session_volumes(
+            db,
+            user_id,
+            {s.exercise_id for s in added},
+            {s.session_id for s in added},
+        )
+        for exercise_id, record in volumes.items():
+            candidates[(exercise_id, KIND_SESSION_VOLUME, 0)] = record
+
+    updated = dict(current)
+    for key, record in candidates.items():
+        if key not in stale and (key not in current or record.value > current[key].value):
+            updated[key] = record
+    if stale:
+        for key in stale:
+            del updated[key]
+        updated.update(await _recompute(db, user_id, stale))
+
+    changed = [key for key, record in updated.items() if current.get(key) != record]
+    dropped = [key for key in current if key not in updated]
+    await _save(db, user_id, {key: updated[key] for key in changed}, dropped)
+
+    added_set_ids = {s.id for s in added}
+    added_sessions = {s.session_id for s in added}
+    new_records = []
+    for key in changed:
+        exercise_id, kind, reps = key
+        record = updated[key]
+        previous = current.get(key)
+        from_added = (
+            record.session_id in added_sessions if kind == KIND_SESSION_VOLUME
+            else record.set_id in added_set_ids
+        )
+        if from_added and (previous is None or record.value > previous.value):
+            new_records.append(NewPersonalRecord(
+                exercise_id=exercise_id,
+                kind=kind,
+                reps=reps if kind == KIND_REP_MAX else None,
+                value=round(record.value, 2),
+                previous_value=round(previous.value, 2) if previous else None,
+                set_id=record.set_id,
+                session_id=record.session_id,
+            ))
+    return new_records
+
+
+async def _recompute(db: AsyncSession, user_id: int, keys: Set[RecordKey]) -> Dict[RecordKey, _Record]:
+    """从原始训练记录重算指定纪录项（已无训练数据的项不返回）"""
+    by_kind: Dict[str, Set[RecordKey]] = defaultdict(set)
+    for key in keys:
+        by_kind[key[1]].add(key)
+
+    records: Dict[RecordKey, _Record] = {}
+
+    if by_kind[KIND_REP_MAX]:
+        # 每个 动作 × 次数 取重量最大（同重量取最早）的一组
+        pairs = [(exercise_id, reps) for exercise_id, _, reps in by_kind[KIND_REP_MAX]]
+        ranked = (
+            select(
+                WorkoutSet.exercise_id,
+                WorkoutSet.reps,
+                WorkoutSet.weight,
+                WorkoutSet.id,
+                WorkoutSet.session_id,
+                WorkoutSession.date,
+                func.row_number().over(
+                    partition_by=(WorkoutSet.exercise_id, WorkoutSet.reps),
+                    order_by=(WorkoutSet.weight.desc(), WorkoutSession.date, WorkoutSet.id),
+                ).label("rn"),
+            )
+            .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+            .where(
+                WorkoutSession.user_id == user_id,
+                WorkoutSet.is_flagged == False,
+                tuple_(WorkoutSet.exercise_id, WorkoutSet.reps).in_(pairs),
+            )
+            .subquery()
+        )
+        result = await db.execute(select(ranked).where(ranked.c.rn == 1))
+        for row in result.all():
+            records[(row.exercise_id, KIND_REP_MAX, row.reps)] = _Record(
+                row.weight, row.id, row.session_id, row.date
+            )
+
+    if by_kind[KIND_E1RM]:
+        # e1RM 由 Python 公式计算，读取这些动作的全部训练组
+        exercise_ids = {exercise_id for exercise_id, _, _ in by_kind[KIND_E1RM]}
+        result = await db.execute(
+            select(
+                WorkoutSet.exercise_id,
+                WorkoutSet.weight,
+                WorkoutSet.reps,
+                WorkoutSet.rpe,
+                WorkoutSet.id,
+                WorkoutSet.session_id,
+                WorkoutSession.date,
+            )
+            .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+            .where(
+                WorkoutSession.user_id == user_id,
+                WorkoutSet.is_flagged == False,
+                WorkoutSet.exercise_id.in_(exercise_ids),
+            )
+        )
+        for exercise_id, weight, reps, rpe, set_id, session_id, day in result.all():
+            key = (exercise_id, KIND_E1RM, 0)
+            e1rm = calculate_1rm(weight, reps, rpe).estimated_1rm
+            if key not in records or e1rm > records[key].value:
+                records[key] = _Record(e1rm, set_id, session_id, day)
+
+    if by_kind[KIND_SESSION_VOLUME]:
+        exercise_ids = {exercise_id for exercise_id, _, _ in by_kind[KIND_SESSION_VOLUME]}
+        volumes = await _session_volumes(db, user_id, exercise_ids)
+        for exercise_id, record in volumes.items():
+            records[(exercise_id, KIND_SESSION_VOLUME, 0)] = record
+
+    return records
+
+
+async def _save(
+    db: AsyncSession,
+    user_id: int,
+    records: Dict[RecordKey, _Record],
+    dropped: List[RecordKey],
+) -> None:
+    if dropped:
+        await db.execute(
+            delete(PersonalRecord).where(
+                PersonalRecord.user_id == user_id,
+                tuple_(PersonalRecord.exercise_id, PersonalRecord.kind, PersonalRecord.reps).in_(dropped),
+            )
+        )
+    if not records:
+        return
+
+    stmt = upsert_insert(PersonalRecord)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            PersonalRecord.user_id,
+            PersonalRecord.exercise_id,
+            PersonalRecord.kind,
+            PersonalRecord.reps,
+        ],
+        set_={
+            "value": stmt.excluded.value,
+            "set_id": stmt.excluded.set_id,
+            "session_id": stmt.excluded.session_id,
+            "date": stmt.excluded.date,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt, [
+        {
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "kind": kind,
+            "reps": reps,
+            "value": record.value,
+            "set_id": record.set_id,
+            "session_id": record.session_id,
+            "date": record.date,
+        }
+        for (exercise_id, kind, reps), record in records.items()
+    ])
+
+
+async def clear(db: AsyncSession, user_id: int) -> None:
+    """清空用户的个人纪录（重建前调用）"""
+    await db.execute(delete(PersonalRecord).where(PersonalRecord.user_id == user_id))
+
+
+async def get_personal_records(
+    db: AsyncSession,
+    user_id: int,
+    exercise_id: Optional[int] = None,
+) -> List[Tuple[PersonalRecord, Optional[float], Optional[int]]]:
+    """读取个人纪录及纪录组的重量 / 次数"""
+    query = (
+        select(PersonalRecord, WorkoutSet.weight, WorkoutSet.reps)
+        .outerjoin(WorkoutSet, PersonalRecord.set_id == WorkoutSet.id)
+        .where(PersonalRecord.user_id == user_id)
+        .order_by(PersonalRecord.exercise_id, PersonalRecord.kind, PersonalRecord.reps)
+    )
+    if exercise_id is not None:
+        query = query.where(PersonalRecord.exercise_id == exercise_id)
+    result = await db.execute(query)
+    return [tuple(row) for row in result.all()]
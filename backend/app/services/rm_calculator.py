@@ -5,6 +5,8 @@
 from typing import Optional, Dict, List, Union
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class OneRMResult:
@@ -230,3 +232,20 @@ def calculate_relative_intensity(weight: float, estimated_1rm: float) -> float:
     if estimated_1rm <= 0:
         return 0
     return round((weight / estimated_1rm) * 100, 1)
+
+
+def calculate_relative_intensities(weights: np.ndarray, estimated_1rms: np.ndarray) -> np.ndarray:
+    """
+    批量计算相对强度 (%1RM)，calculate_relative_intensity 的向量化版本
+
+    Args:
+        weights: 实际重量数组
+        estimated_1rms: 对应的估算 1RM 数组
+
+    Returns:
+        相对强度百分比数组（估算 1RM 非正时为 0）
+    """
+    weights = np.asarray(weights, dtype=float)
+    estimated_1rms = np.asarray(estimated_1rms, dtype=float)
+    ratio = np.divide(weights, estimated_1rms, out=np.zeros_like(weights), where=estimated_1rms > 0)
+    return np.round(ratio * 100, 1)
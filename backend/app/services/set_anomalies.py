@@ -0,0 +1,148 @@
+"""
+录入错误识别
+按 用户 × 动作 维护训练组重量与 e1RM 的在线均值 / 方差（Welford），每次写入只读写受影响动作的一行。
+新写入（或重量 / 次数 / RPE 被修改）的组若明显高于历史分布（如 100kg 误录为 1000kg）则标记为待确认：
+标记的组不计入均值 / 方差，也不传给其他统计模块，确认后才按新增处理。
+只检查偏高的一侧：偏低的组（热身、减载）是正常训练，也不会污染个人纪录与趋势。
+"""
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.stats import ExerciseSetStats
+from app.models.workout import WorkoutSet
+from app.schemas.workout import FlaggedSet
+from app.services.rm_calculator import calculate_1rm
+from app.utils.running_stats import WelfordStats
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+# 标准差下限：相对均值的比例与绝对值（kg），避免历史重量完全相同时任何变化都被标记
+MIN_STD_RATIO = 0.1
+MIN_STD_KG = 2.5
+
+
+def _e1rm(s: "SetSnapshot") -> float:
+    return calculate_1rm(s.weight, s.reps, s.rpe).estimated_1rm
+
+
+def _same_values(a: "SetSnapshot", b: "SetSnapshot") -> bool:
+    return (a.exercise_id, a.weight, a.reps, a.rpe) == (b.exercise_id, b.weight, b.reps, b.rpe)
+
+
+def _z_score(stats: WelfordStats, x: float) -> Optional[float]:
+    return stats.z_score(x, max(MIN_STD_KG, abs(stats.mean) * MIN_STD_RATIO))
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+    screen: bool = True,
+) -> List[FlaggedSet]:
+    """
+    更新均值 / 方差并判定新增的组是否待确认，返回新增组中处于待确认状态的组
+
+    removed 中已标记的组本就不在统计内，直接跳过。新增的组：
+    screen 为假（用户确认）时一律计入并取消标记；数值未变的修改（如训练课改日期）保持原状态；
+    其余按当前分布逐个判定（同一批次内先判定的组会计入后续组的分布）。
+    """
+    exercise_ids = {s.exercise_id for s in added} | {s.exercise_id for s in removed}
+    if not exercise_ids:
+        return []
+
+    result = await db.execute(
+        select(ExerciseSetStats)
+        .where(
+            ExerciseSetStats.user_id == user_id,
+            ExerciseSetStats.exercise_id.in_(exercise_ids),
+        )
+        .with_for_update()
+    )
+    rows = {row.exercise_id: row for row in result.scalars().all()}
+    stats: Dict[int, Tuple[WelfordStats, WelfordStats]] = {
+        exercise_id: (
+            WelfordStats(row.n, row.weight_mean, row.weight_m2),
+            WelfordStats(row.n, row.e1rm_mean, row.e1rm_m2),
+        )
+        for exercise_id, row in rows.items()
+    }
+
+    def stats_for(exercise_id: int) -> Tuple[WelfordStats, WelfordStats]:
+        if exercise_id not in stats:
+            stats[exercise_id] = (WelfordStats(), WelfordStats())
+        return stats[exercise_id]
+
+    for s in removed:
+        if not s.flagged:
+            weight_stats, e1rm_stats = stats_for(s.exercise_id)
+            weight_stats.remove(s.weight)
+            e1rm_stats.remove(_e1rm(s))
+
+    before = {s.id: s for s in removed}
+    flagged: List[FlaggedSet] = []
+    to_flag: Set[int] = set()
+    to_unflag: Set[int] = set()
+    for s in added:
+        weight_stats, e1rm_stats = stats_for(s.exercise_id)
+        e1rm = _e1rm(s)
+        z_scores = [z for z in (_z_score(weight_stats, s.weight), _z_score(e1rm_stats, e1rm)) if z is not None]
+        z_score = max(z_scores) if z_scores else None
+
+        if not screen:
+            is_outlier = False
+        elif s.id in before and _same_values(s, before[s.id]):
+            is_outlier = before[s.id].flagged
+        else:
+            is_outlier = (
+                weight_stats.n >= settings.outlier_min_samples
+                and z_score is not None
+                and z_score > settings.outlier_z_threshold
+            )
+
+        if is_outlier:
+            flagged.append(FlaggedSet(
+                set_id=s.id,
+                exercise_id=s.exercise_id,
+                weight=s.weight,
+                reps=s.reps,
+                mean_weight=round(weight_stats.mean, 2),
+                mean_e1rm=round(e1rm_stats.mean, 2),
+                z_score=round(z_score, 1) if z_score is not None else None,
+            ))
+            if not s.flagged:
+                to_flag.add(s.id)
+        else:
+            weight_stats.add(s.weight)
+            e1rm_stats.add(e1rm)
+            if s.flagged:
+                to_unflag.add(s.id)
+
+    for exercise_id, (weight_stats, e1rm_stats) in stats.items():
+        row = rows.get(exercise_id)
+        if weight_stats.n <= 0:
+            if row is not None:
+                await db.delete(row)
+            continue
+        if row is None:
+            row = ExerciseSetStats(user_id=user_id, exercise_id=exercise_id)
+            db.add(row)
+        row.n = weight_stats.n
+        row.weight_mean, row.weight_m2 = weight_stats.mean, weight_stats.m2
+        row.e1rm_mean, row.e1rm_m2 = e1rm_stats.mean, e1rm_stats.m2
+
+    if to_flag:
+        await db.execute(update(WorkoutSet).where(WorkoutSet.id.in_(to_flag)).values(is_flagged=True))
+    if to_unflag:
+        await db.execute(update(WorkoutSet).where(WorkoutSet.id.in_(to_unflag)).values(is_flagged=False))
+    return flagged
+
+
+async def clear(db: AsyncSession, user_id: int) -> None:
+    """清空用户的均值 / 方差（重建前调用，训练组的标记保留）"""
+    await db.execute(delete(ExerciseSetStats).where(ExerciseSetStats.user_id == user_id))
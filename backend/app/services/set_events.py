@@ -0,0 +1,150 @@
+"""
+训练组变更事件
+所有训练写操作（创建 / 修改 / 删除训练课与训练组）在写入后调用 apply_set_changes，
+传入变更前后的训练组快照，由各统计模块增量维护派生数据。
+修改按「删除旧快照 + 新增新快照」处理。
+新增的组先经录入错误识别，被标记待确认的组不传给统计模块，确认后再按新增处理。
+"""
+from dataclasses import dataclass, field
+from datetime import date as DateType
+from typing import List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from app.models.workout import WorkoutSession, WorkoutSet
+from app.schemas.analysis import NewPersonalRecord
+from app.schemas.workout import FlaggedSet
+from app.services import (
+    cohort_percentiles,
+    e1rm_trends,
+    exercise_usage,
+    fleet_stats,
+    muscle_calendar,
+    personal_records,
+    set_anomalies,
+    weekly_volume,
+    workload,
+)
+
+
+# 按用户维护的统计（可按用户清空重建）
+USER_STATS = (
+    exercise_usage,
+    muscle_calendar,
+    personal_records,
+    e1rm_trends,
+    workload,
+    weekly_volume,
+)
+
+
+@dataclass(frozen=True)
+class SetSnapshot:
+    """训练组快照（含所属训练课日期）"""
+    id: int
+    session_id: int
+    exercise_id: int
+    date: DateType
+    weight: float
+    reps: int
+    rpe: Optional[int] = None
+    flagged: bool = False  # 待确认的疑似录入错误（不在统计内）
+
+    @classmethod
+    def from_set(cls, workout_set: WorkoutSet, session_date: DateType) -> "SetSnapshot":
+        return cls(
+            id=workout_set.id,
+            session_id=workout_set.session_id,
+            exercise_id=workout_set.exercise_id,
+            date=session_date,
+            weight=workout_set.weight,
+            reps=workout_set.reps,
+            rpe=workout_set.rpe,
+            flagged=bool(workout_set.is_flagged),
+        )
+
+
+@dataclass
+class SetChangeResult:
+    """训练组变更的处理结果（写接口直接放入响应）"""
+    new_records: List[NewPersonalRecord] = field(default_factory=list)
+    flagged_sets: List[FlaggedSet] = field(default_factory=list)
+
+
+async def load_set_snapshots(db: AsyncSession, *conditions: ColumnElement) -> List[SetSnapshot]:
+    """按条件批量读取训练组快照（一次 JOIN 查询）"""
+    result = await db.execute(
+        select(
+            WorkoutSet.id,
+            WorkoutSet.session_id,
+            WorkoutSet.exercise_id,
+            WorkoutSession.date,
+            WorkoutSet.weight,
+            WorkoutSet.reps,
+            WorkoutSet.rpe,
+            WorkoutSet.is_flagged,
+        )
+        .join(WorkoutSession, WorkoutSet.session_id == WorkoutSession.id)
+        .where(*conditions)
+    )
+    return [SetSnapshot(*row) for row in result.all()]
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence[SetSnapshot] = (),
+    removed: Sequence[SetSnapshot] = (),
+    screen: bool = True,
+) -> SetChangeResult:
+    """
+    训练组变更后更新派生统计（需在变更 flush 之后调用）
+
+    Args:
+        added: 新增（或修改后）的训练组
+        removed: 删除（或修改前）的训练组
+        screen: 是否识别录入错误（用户确认待确认的组时为假）
+
+    Returns:
+        本次变更刷新的个人纪录与处于待确认状态的新增组
+    """
+    if not added and not removed:
+        return SetChangeResult()
+
+    flagged_sets = await set_anomalies.apply_set_changes(db, user_id, added, removed, screen)
+    flagged_ids = {f.set_id for f in flagged_sets}
+    added = [s for s in added if s.id not in flagged_ids]
+    removed = [s for s in removed if not s.flagged]
+
+    new_records = []
+    if added or removed:
+        for stats in USER_STATS:
+            new_records.extend(await stats.apply_set_changes(db, user_id, added, removed) or ())
+        await fleet_stats.apply_set_changes(db, user_id, added, removed)
+        await cohort_percentiles.add_best_e1rms(db, user_id, new_records)
+    return SetChangeResult(new_records=new_records, flagged_sets=flagged_sets)
+
+
+async def rebuild_user_stats(db: AsyncSession, user_id: int) -> None:
+    """清空并由原始训练记录重建用户的派生统计（不含全站统计；待确认的组保持标记，不参与重建）"""
+    await set_anomalies.clear(db, user_id)
+    for stats in USER_STATS:
+        await stats.clear(db, user_id)
+
+    added = await load_set_snapshots(db, WorkoutSession.user_id == user_id, WorkoutSet.is_flagged == False)
+    if added:
+        await set_anomalies.apply_set_changes(db, user_id, added, (), screen=False)
+        for stats in USER_STATS:
+            await stats.apply_set_changes(db, user_id, added, ())
+
+
+async def rebuild_fleet_stats(db: AsyncSession, user_ids: Sequence[int]) -> None:
+    """清空并重建全站统计（逐个用户回放训练组；同类百分位由个人纪录表重建，需先重建用户统计）"""
+    await fleet_stats.clear(db)
+    for user_id in user_ids:
+        added = await load_set_snapshots(db, WorkoutSession.user_id == user_id, WorkoutSet.is_flagged == False)
+        if added:
+            await fleet_stats.apply_set_changes(db, user_id, added, ())
+    await cohort_percentiles.rebuild(db)
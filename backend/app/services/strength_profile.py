@@ -0,0 +1,95 @@
+"""
+力量雷达图
+各肌群的力量 = 以该肌群为主肌群的动作中，近期最佳 e1RM 的最大值；
+除以体重得到相对力量，再对照 settings.strength_standards 折算为 0-100 分（超过标准时可大于 100）。
+数据来自增量维护的每日最佳 e1RM 表（一次分组查询），结果按用户数据版本号缓存。
+"""
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.exercise import MUSCLE_GROUPS
+from app.models.stats import DailyBestE1RM
+from app.models.user import User
+from app.schemas.analysis import MuscleStrength, StrengthProfileResponse
+from app.services.exercise_catalog import get_catalog, get_user_exercises
+
+
+# 雷达图缓存的最大条目数（用户 × 查询天数）
+PROFILE_CACHE_SIZE = 1024
+
+# (user_id, days) -> (缓存键, 雷达图)
+_profiles: "OrderedDict[Tuple[int, int], Tuple[Hashable, StrengthProfileResponse]]" = OrderedDict()
+
+
+async def get_strength_profile(db: AsyncSession, user: User, days: int) -> StrengthProfileResponse:
+    """
+    最近 days 天各肌群的力量评分
+
+    训练写操作与自定义动作变更都会使数据版本号变化；体重修改不经过版本号，
+    与动作库版本、当天日期一起放入缓存键。
+    """
+    today = date.today()
+    catalog = await get_catalog(db)
+    key = (user.id, days)
+    version = (user.data_version, catalog.version, user.body_weight, today)
+    cached = _profiles.get(key)
+    if cached and cached[0] == version:
+        _profiles.move_to_end(key)
+        return cached[1]
+
+    start = today - timedelta(days=days)
+    result = await db.execute(
+        select(DailyBestE1RM.exercise_id, func.max(DailyBestE1RM.e1rm))
+        .where(
+            DailyBestE1RM.user_id == user.id,
+            DailyBestE1RM.date >= start,
+        )
+        .group_by(DailyBestE1RM.exercise_id)
+    )
+    best_e1rms = result.all()
+
+    user_exercises = await get_user_exercises(db, user.id)
+    best: Dict[str, Tuple[float, int, str]] = {}
+    for exercise_id, e1rm in best_e1rms:
+        exercise = catalog.exercises.get(exercise_id) or user_exercises.exercises.get(exercise_id)
+        if not exercise:
+            continue
+        muscle = exercise.primary_muscle
+        if muscle not in best or e1rm > best[muscle][0]:
+            best[muscle] = (e1rm, exercise_id, exercise.name)
+
+    muscles = []
+    for muscle in MUSCLE_GROUPS:
+        if muscle not in best:
+            continue
+        e1rm, exercise_id, exercise_name = best[muscle]
+        relative_strength: Optional[float] = e1rm / user.body_weight if user.body_weight else None
+        standard = settings.strength_standards.get(muscle)
+        muscles.append(MuscleStrength(
+            muscle_group=muscle,
+            exercise_id=exercise_id,
+            exercise_name=exercise_name,
+            best_e1rm=round(e1rm, 2),
+            relative_strength=round(relative_strength, 2) if relative_strength is not None else None,
+            score=(
+                round(relative_strength / standard * 100, 1)
+                if relative_strength is not None and standard else None
+            ),
+        ))
+
+    profile = StrengthProfileResponse(
+        period_start=start,
+        period_end=today,
+        body_weight=user.body_weight,
+        muscles=muscles,
+    )
+    _profiles[key] = (version, profile)
+    _profiles.move_to_end(key)
+    while len(_profiles) > PROFILE_CACHE_SIZE:
+        _profiles.popitem(last=False)
+    return profile
@@ -0,0 +1,127 @@
+"""
+离线同步：变更日志与幂等键
+每次写操作为用户分配一个单调递增的版本号（User.data_version），
+并记录受影响的实体，客户端按版本号增量拉取。
+"""
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import select, update, insert, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.user import User
+from app.models.sync import ChangeLog, IdempotencyKey
+
+
+# 实体类型
+ENTITY_SESSION = "session"
+ENTITY_SET = "set"
+ENTITY_EXERCISE = "exercise"
+
+# 变更类型
+OP_UPSERT = "upsert"
+OP_DELETE = "delete"
+
+
+async def bump_data_version(db: AsyncSession, user_id: int) -> int:
+    """用户数据版本号 +1 并返回新版本号（单条 UPDATE ... RETURNING，并发安全）"""
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1)
+        .returning(User.data_version)
+    )
+    return result.scalar_one()
+
+
+async def record_changes(
+    db: AsyncSession,
+    user_id: int,
+    changes: Iterable[Tuple[str, int, str]],
+) -> int:
+    """
+    为一次写操作分配新版本号并写入变更日志
+
+    Args:
+        user_id: 用户 ID
+        changes: (entity_type, entity_id, op) 列表
+
+    Returns:
+        新版本号
+    """
+    version = await bump_data_version(db, user_id)
+    rows = [
+        {
+            "user_id": user_id,
+            "version": version,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "op": op,
+        }
+        for entity_type, entity_id, op in changes
+    ]
+    if rows:
+        await db.execute(insert(ChangeLog), rows)
+    return version
+
+
+async def record_deletes_from_select(
+    db: AsyncSession,
+    user_id: int,
+    entity_type: str,
+    id_select: Select,
+) -> int:
+    """
+    批量删除前写入墓碑记录（INSERT ... SELECT，语句数与删除行数无关）
+
+    Args:
+        entity_type: 实体类型
+        id_select: 只选出待删除实体 ID 的查询
+
+    Returns:
+        新版本号
+    """
+    version = await bump_data_version(db, user_id)
+    id_subquery = id_select.subquery()
+    entity_id = list(id_subquery.c)[0]
+    await db.execute(
+        insert(ChangeLog).from_select(
+            ["user_id", "version", "entity_type", "entity_id", "op"],
+            select(
+                literal(user_id),
+                literal(version),
+                literal(entity_type),
+                entity_id,
+                literal(OP_DELETE),
+            ),
+        )
+    )
+    return version
+
+
+async def get_idempotent_entity(db: AsyncSession, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    """查询幂等键对应的已处理记录"""
+    result = await db.execute(
+        select(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def save_idempotency_key(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    entity_type: str,
+    entity_id: int,
+) -> None:
+    """保存幂等键（同一用户内唯一）"""
+    db.add(IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        entity_type=entity_type,
+        entity_id=entity_id,
+    ))
+    await db.flush()
@@ -0,0 +1,82 @@
+"""
+肌群周训练组数
+按 用户 × 动作 × 周 累计训练组数，训练写操作时按组数增减；
+读取时把当周各动作的组数乘以动作 → 肌群权重矩阵（主肌群计 1 组，辅助肌群按 settings.secondary_muscle_weight 计入）。
+计数本身与动作的肌群无关，修改自定义动作、更新预置动作或调整辅助肌群比例后无需重建。
+"""
+from collections import defaultdict
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Sequence
+
+import numpy as np
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.exercise import MUSCLE_GROUPS
+from app.models.stats import WeeklyExerciseSets
+from app.services.e1rm_trends import week_start
+from app.services.exercise_catalog import get_catalog, get_user_exercises, muscle_weights
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+) -> None:
+    """按周汇总各动作的组数变化并累加到计数"""
+    net: Dict[date, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for sign, sets in ((1, added), (-1, removed)):
+        for s in sets:
+            net[week_start(s.date)][s.exercise_id] += sign
+    rows = [
+        {"user_id": user_id, "exercise_id": exercise_id, "week_start": week, "sets": n}
+        for week, counts in net.items()
+        for exercise_id, n in counts.items()
+        if n
+    ]
+    if not rows:
+        return
+
+    stmt = upsert_insert(WeeklyExerciseSets)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WeeklyExerciseSets.user_id, WeeklyExerciseSets.exercise_id, WeeklyExerciseSets.week_start],
+        set_={"sets": WeeklyExerciseSets.sets + stmt.excluded.sets},
+    )
+    await db.execute(stmt, rows)
+    await db.execute(
+        delete(WeeklyExerciseSets).where(
+            WeeklyExerciseSets.user_id == user_id,
+            WeeklyExerciseSets.week_start.in_({row["week_start"] for row in rows}),
+            WeeklyExerciseSets.sets <= 0,
+        )
+    )
+
+
+async def clear(db: AsyncSession, user_id: int) -> None:
+    """清空用户的周组数（重建前调用）"""
+    await db.execute(delete(WeeklyExerciseSets).where(WeeklyExerciseSets.user_id == user_id))
+
+
+async def get_week_sets(db: AsyncSession, user_id: int, day: date) -> Dict[str, float]:
+    """day 所在周各肌群的训练组数（按当前的动作 → 肌群权重矩阵折算）"""
+    result = await db.execute(
+        select(WeeklyExerciseSets.exercise_id, WeeklyExerciseSets.sets).where(
+            WeeklyExerciseSets.user_id == user_id,
+            WeeklyExerciseSets.week_start == week_start(day),
+        )
+    )
+    counts = result.all()
+    if not counts:
+        return {}
+
+    catalog = await get_catalog(db)
+    user_exercises = await get_user_exercises(db, user_id)
+    sets = np.array([n for _, n in counts], dtype=float) @ muscle_weights(
+        catalog, user_exercises, [exercise_id for exercise_id, _ in counts]
+    )
+    return {muscle: float(sets[index]) for index, muscle in enumerate(MUSCLE_GROUPS) if sets[index] > 0}
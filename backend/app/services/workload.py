@@ -0,0 +1,147 @@
+"""
+训练负荷（急性:慢性负荷比 ACWR）
+每日负荷为当天的容量负荷；急性 / 慢性负荷为 7 天 / 28 天跨度的指数加权移动平均（EWMA）。
+EWMA 对每日负荷是线性的：某天负荷变化 ΔL 对 as_of 当天的贡献为 λ·ΔL·(1-λ)^(as_of-当天)，
+因此补录 / 修改 / 删除任意日期的训练都能 O(1) 更新状态；读取时再按天衰减到今天。
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import upsert_insert
+from app.models.stats import DailyLoad, WorkloadState
+from app.services.rm_calculator import calculate_volume_load
+
+if TYPE_CHECKING:
+    from app.services.set_events import SetSnapshot
+
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+ACUTE_ALPHA = 2 / (ACUTE_DAYS + 1)
+CHRONIC_ALPHA = 2 / (CHRONIC_DAYS + 1)
+
+
+@dataclass
+class DailyWorkload:
+    date: date
+    load: float
+    acute: float
+    chronic: float
+
+
+async def apply_set_changes(
+    db: AsyncSession,
+    user_id: int,
+    added: Sequence["SetSnapshot"],
+    removed: Sequence["SetSnapshot"],
+) -> None:
+    """按日期累加负荷变化，并把变化折算进 EWMA 状态"""
+    deltas: Dict[date, float] = defaultdict(float)
+    for sign, sets in ((1, added), (-1, removed)):
+        for s in sets:
+            deltas[s.date] += sign * calculate_volume_load([{"weight": s.weight, "reps": s.reps}])
+    deltas = {day: delta for day, delta in deltas.items() if abs(delta) > 1e-9}
+    if not deltas:
+        return
+
+    stmt = upsert_insert(DailyLoad)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyLoad.user_id, DailyLoad.date],
+        set_={"volume_load": DailyLoad.volume_load + stmt.excluded.volume_load},
+    )
+    await db.execute(stmt, [
+        {"user_id": user_id, "date": day, "volume_load": delta} for day, delta in deltas.items()
+    ])
+    await db.execute(
+        delete(DailyLoad).where(
+            DailyLoad.user_id == user_id,
+            DailyLoad.date.in_(list(deltas)),
+            DailyLoad.volume_load <= 1e-6,
+        )
+    )
+
+    result = await db.execute(
+        select(WorkloadState).where(WorkloadState.user_id == user_id).with_for_update()
+    )
+    state = result.scalar_one_or_none()
+    if state is None:
+        state = WorkloadState(user_id=user_id, acute=0.0, chronic=0.0, as_of=max(deltas))
+        db.add(state)
+
+    as_of = max(state.as_of, max(deltas))
+    acute = _decay(state.acute, ACUTE_ALPHA, (as_of - state.as_of).days)
+    chronic = _decay(state.chronic, CHRONIC_ALPHA, (as_of - state.as_of).days)
+    for day, delta in deltas.items():
+        age = (as_of - day).days
+        acute += ACUTE_ALPHA * delta * (1 - ACUTE_ALPHA) ** age
+        chronic += CHRONIC_ALPHA * delta * (1 - CHRONIC_ALPHA) ** age
+
+    state.acute = acute
+    state.chronic = chronic
+    state.as_of = as_of
+
+
+def _decay(value: float, alpha: float, days: int) -> float:
+    return value * (1 - alpha) ** days
+
+
+async def clear(db: AsyncSession, user_id: int) -> None:
+    """清空用户的负荷状态（重建前调用）"""
+    await db.execute(delete(DailyLoad).where(DailyLoad.user_id == user_id))
+    await db.execute(delete(WorkloadState).where(WorkloadState.user_id == user_id))
+
+
+async def get_workload_series(
+    db: AsyncSession,
+    user_id: int,
+    end: date,
+    days: int,
+) -> List[DailyWorkload]:
+    """
+    最近 days 天（截至 end）的每日负荷与急性 / 慢性负荷
+
+    状态先衰减到 max(end, as_of)，再借助窗口内的每日负荷逐日反推之前的 EWMA，
+    只读取一行状态和窗口内的每日负荷，不扫描训练组。
+    """
+    result = await db.execute(select(WorkloadState).where(WorkloadState.user_id == user_id))
+    state = result.scalar_one_or_none()
+    if state is None:
+        return []
+
+    anchor = max(end, state.as_of)
+    start = end - timedelta(days=days - 1)
+    result = await db.execute(
+        select(DailyLoad.date, DailyLoad.volume_load).where(
+            DailyLoad.user_id == user_id,
+            DailyLoad.date >= start,
+            DailyLoad.date <= anchor,
+        )
+    )
+    loads = dict(result.all())
+
+    acute = _decay(state.acute, ACUTE_ALPHA, (anchor - state.as_of).days)
+    chronic = _decay(state.chronic, CHRONIC_ALPHA, (anchor - state.as_of).days)
+    points: List[DailyWorkload] = []
+    day = anchor
+    while day >= start:
+        load = loads.get(day, 0.0)
+        if day <= end:
+            points.append(DailyWorkload(day, load, max(acute, 0.0), max(chronic, 0.0)))
+        # E(t-1) = (E(t) - λ·L(t)) / (1 - λ)
+        acute = (acute - ACUTE_ALPHA * load) / (1 - ACUTE_ALPHA)
+        chronic = (chronic - CHRONIC_ALPHA * load) / (1 - CHRONIC_ALPHA)
+        day -= timedelta(days=1)
+
+    points.reverse()
+    return points
+
+
+def acute_chronic_ratio(point: DailyWorkload) -> Optional[float]:
+    if point.chronic <= 1e-6:
+        return None
+    return point.acute / point.chronic
@@ -54,3 +54,15 @@ async def get_current_active_user(
 ) -> User:
     """获取当前活跃用户"""
     return current_user
+
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    """获取当前管理员用户"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限",
+        )
+    return current_user
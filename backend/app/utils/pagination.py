@@ -0,0 +1,39 @@
+"""
+游标（Keyset）分页工具
+游标对客户端不透明，内部为排序键的 JSON 数组经 base64url 编码
+"""
+import base64
+import json
+from typing import Any, Callable, List, Sequence
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """将排序键编码为游标"""
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """
+    解码游标
+
+    Args:
+        cursor: 客户端回传的游标
+        parsers: 每个排序键的解析函数，如 (date.fromisoformat, int)
+
+    Returns:
+        解析后的排序键列表
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(cursor)
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标",
+        )
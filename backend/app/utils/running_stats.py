@@ -0,0 +1,117 @@
+"""
+可增量维护的统计量
+- RunningRegression：一元线性回归的累加量 (n, Σx, Σy, Σx², Σxy, Σy²)，
+  加点 / 删点都是 O(1)，多个区间的累加量直接相加即可合并
+- WelfordStats：均值与方差的 Welford 在线算法 (n, 均值, 离差平方和 M2)，
+  数值稳定，加点 / 删点都是 O(1)
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class RunningRegression:
+    """最小二乘回归累加量"""
+    n: int = 0
+    sum_x: float = 0.0
+    sum_y: float = 0.0
+    sum_xx: float = 0.0
+    sum_xy: float = 0.0
+    sum_yy: float = 0.0
+
+    def add(self, x: float, y: float, weight: int = 1) -> None:
+        """加入数据点（weight = -1 表示删除）"""
+        self.n += weight
+        self.sum_x += weight * x
+        self.sum_y += weight * y
+        self.sum_xx += weight * x * x
+        self.sum_xy += weight * x * y
+        self.sum_yy += weight * y * y
+
+    def merge(self, other: "RunningRegression") -> None:
+        self.n += other.n
+        self.sum_x += other.sum_x
+        self.sum_y += other.sum_y
+        self.sum_xx += other.sum_xx
+        self.sum_xy += other.sum_xy
+        self.sum_yy += other.sum_yy
+
+    @property
+    def mean_y(self) -> Optional[float]:
+        return self.sum_y / self.n if self.n > 0 else None
+
+    def _sxx(self) -> float:
+        return self.n * self.sum_xx - self.sum_x * self.sum_x
+
+    def _syy(self) -> float:
+        return self.n * self.sum_yy - self.sum_y * self.sum_y
+
+    def _sxy(self) -> float:
+        return self.n * self.sum_xy - self.sum_x * self.sum_y
+
+    def slope(self) -> Optional[float]:
+        """斜率（至少两个不同的 x）"""
+        if self.n < 2:
+            return None
+        sxx = self._sxx()
+        if sxx <= 1e-9:
+            return None
+        return self._sxy() / sxx
+
+    def r_squared(self) -> Optional[float]:
+        """决定系数（y 全部相同时为 0）"""
+        if self.n < 2:
+            return None
+        sxx, syy = self._sxx(), self._syy()
+        if sxx <= 1e-9:
+            return None
+        if syy <= 1e-9:
+            return 0.0
+        return min(1.0, self._sxy() ** 2 / (sxx * syy))
+
+
+@dataclass
+class WelfordStats:
+    """Welford 在线均值 / 方差"""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x: float) -> None:
+        """移除一个此前加入的值（add 的逆运算）"""
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean = (self.n * self.mean - x) / (self.n - 1)
+        self.m2 = max(0.0, self.m2 - (x - self.mean) * (x - mean))
+        self.mean = mean
+        self.n -= 1
+
+    @property
+    def variance(self) -> Optional[float]:
+        """样本方差（至少两个值）"""
+        if self.n < 2:
+            return None
+        return self.m2 / (self.n - 1)
+
+    @property
+    def std(self) -> Optional[float]:
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+    def z_score(self, x: float, min_std: float = 0.0) -> Optional[float]:
+        """x 偏离均值多少个标准差（标准差不低于 min_std，避免历史值完全相同时除零）"""
+        std = self.std
+        if std is None:
+            return None
+        std = max(std, min_std)
+        if std <= 0:
+            return None
+        return (x - self.mean) / std
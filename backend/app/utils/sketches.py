@@ -0,0 +1,247 @@
+"""
+概率数据结构（可合并、可序列化为紧凑的二进制）
+- HyperLogLog：基数估计（去重计数），相对误差约 1.04 / sqrt(m)
+- Count-Min Sketch：按 key 累加数值，估计值偏大不偏小，误差上界 e / width × 总量
+- t-digest：数值分布的分位数 / 百分位估计，两端（极小 / 极大分位）精度最高
+哈希使用 blake2b，保证不同进程 / 重启后结果一致（内置 hash() 带随机盐）。
+"""
+import math
+import sys
+from array import array
+from bisect import bisect_right
+from hashlib import blake2b
+from typing import List, Optional, Union
+
+Key = Union[str, int]
+
+
+def _digest(key: Key, size: int) -> bytes:
+    return blake2b(str(key).encode("utf-8"), digest_size=size).digest()
+
+
+class HyperLogLog:
+    """HyperLogLog 基数估计（每个寄存器 1 字节）"""
+
+    def __init__(self, p: int = 10, registers: Optional[bytes] = None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+        if len(self.registers) != self.m:
+            raise ValueError("寄存器数量与精度不匹配")
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, item: Key) -> bool:
+        """加入元素，返回寄存器是否变化（未变化时无需回写）"""
+        x = int.from_bytes(_digest(item, 8), "big")
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """合并（逐寄存器取最大值）"""
+        if other.m != self.m:
+            raise ValueError("精度不同的 HyperLogLog 不能合并")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # 小基数修正（线性计数）
+            estimate = self.m * math.log(self.m / zeros)
+        return estimate
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+class CountMinSketch:
+    """Count-Min Sketch（depth 行 × width 列的 float64 计数器，支持负数更新）"""
+
+    def __init__(self, width: int = 1024, depth: int = 4, data: Optional[bytes] = None):
+        self.width = width
+        self.depth = depth
+        self.counters = array("d")
+        if data:
+            self.counters.frombytes(data)
+            if sys.byteorder != "little":
+                self.counters.byteswap()
+        else:
+            self.counters.extend([0.0] * (width * depth))
+        if len(self.counters) != width * depth:
+            raise ValueError("计数器数量与尺寸不匹配")
+
+    def _cells(self, key: Key) -> List[int]:
+        digest = _digest(key, 8 * self.depth)
+        return [
+            row * self.width + int.from_bytes(digest[row * 8:(row + 1) * 8], "big") % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, key: Key, value: float = 1.0) -> None:
+        for cell in self._cells(key):
+            self.counters[cell] += value
+
+    def estimate(self, key: Key) -> float:
+        """估计值（真实值非负时，估计值 ≥ 真实值）"""
+        return min(self.counters[cell] for cell in self._cells(key))
+
+    @property
+    def total(self) -> float:
+        """所有 key 的累计总量（任一行之和）"""
+        return math.fsum(self.counters[:self.width])
+
+    @property
+    def error_bound(self) -> float:
+        """单个估计值的加性误差上界（以 1 - e^-depth 的概率成立）"""
+        return math.e / self.width * self.total
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """合并（逐计数器相加）"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("尺寸不同的 Count-Min Sketch 不能合并")
+        for i, value in enumerate(other.counters):
+            self.counters[i] += value
+
+    def to_bytes(self) -> bytes:
+        counters = self.counters
+        if sys.byteorder != "little":
+            counters = array("d", counters)
+            counters.byteswap()
+        return counters.tobytes()
+
+
+class TDigest:
+    """
+    合并式 t-digest（k1 尺度函数，质心数量约为 compression 的 1-2 倍）
+
+    新数据先进入缓冲区，缓冲区满或查询时与已有质心一起排序、按尺度函数合并。
+    """
+
+    def __init__(self, compression: float = 100, data: Optional[bytes] = None):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[float] = []
+        if data:
+            values = array("d")
+            values.frombytes(data)
+            if sys.byteorder != "little":
+                values.byteswap()
+            self.compression, self.min, self.max = values[0], values[1], values[2]
+            self.means = list(values[3::2])
+            self.weights = list(values[4::2])
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return math.fsum(self.weights)
+
+    def add(self, value: float) -> None:
+        self._buffer.append(value)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._flush()
+
+    def merge(self, other: "TDigest") -> None:
+        other._flush()
+        self._flush()
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(list(zip(self.means, self.weights)) + list(zip(other.means, other.weights)))
+
+    def _flush(self) -> None:
+        if self._buffer:
+            centroids = list(zip(self.means, self.weights)) + [(value, 1.0) for value in self._buffer]
+            self._buffer = []
+            self._compress(centroids)
+
+    def _k_limit(self, q: float) -> float:
+        """k1 尺度下从分位 q 起一个单位内允许合并到的最大分位"""
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compress(self, centroids: List[tuple]) -> None:
+        centroids.sort()
+        total = math.fsum(weight for _, weight in centroids)
+        means: List[float] = []
+        weights: List[float] = []
+        if centroids:
+            mean, weight = centroids[0]
+            done = 0.0
+            limit = self._k_limit(0.0)
+            for next_mean, next_weight in centroids[1:]:
+                if (done + weight + next_weight) / total <= limit:
+                    mean += (next_mean - mean) * next_weight / (weight + next_weight)
+                    weight += next_weight
+                else:
+                    means.append(mean)
+                    weights.append(weight)
+                    done += weight
+                    limit = self._k_limit(done / total)
+                    mean, weight = next_mean, next_weight
+            means.append(mean)
+            weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def _points(self) -> tuple:
+        """分段线性 CDF 的节点：(数值列表, 累计权重列表)，两端为最小 / 最大值"""
+        xs = [self.min]
+        cumulative = [0.0]
+        done = 0.0
+        for mean, weight in zip(self.means, self.weights):
+            xs.append(mean)
+            cumulative.append(done + weight / 2)
+            done += weight
+        xs.append(self.max)
+        cumulative.append(done)
+        return xs, cumulative
+
+    def cdf(self, value: float) -> Optional[float]:
+        """小于等于 value 的比例（0-1），为空时返回 None"""
+        self._flush()
+        if not self.weights:
+            return None
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        xs, cumulative = self._points()
+        i = bisect_right(xs, value) - 1
+        span = xs[i + 1] - xs[i]
+        fraction = (value - xs[i]) / span if span > 0 else 1.0
+        return (cumulative[i] + fraction * (cumulative[i + 1] - cumulative[i])) / cumulative[-1]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位数（q 取 0-1），为空时返回 None"""
+        self._flush()
+        if not self.weights:
+            return None
+        xs, cumulative = self._points()
+        target = min(max(q, 0.0), 1.0) * cumulative[-1]
+        i = min(bisect_right(cumulative, target) - 1, len(xs) - 2)
+        span = cumulative[i + 1] - cumulative[i]
+        fraction = (target - cumulative[i]) / span if span > 0 else 0.0
+        return xs[i] + fraction * (xs[i + 1] - xs[i])
+
+    def to_bytes(self) -> bytes:
+        self._flush()
+        values = array("d", [self.compression, self.min, self.max])
+        for mean, weight in zip(self.means, self.weights):
+            values.extend((mean, weight))
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tobytes()
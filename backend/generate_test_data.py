@@ -22,6 +22,7 @@ from app.models.workout import WorkoutSession, WorkoutSet
 from app.models.exercise import Exercise
 from app.models.user import User
 from app.models.analysis import Estimated1RM
+from app.services.set_events import rebuild_user_stats, rebuild_fleet_stats
 
 
 async def generate_test_data():
@@ -131,6 +132,13 @@ async def generate_test_data():
 
             print(f"  📊 用户 {user.nickname} 完成: {workout_count}条训练, {set_count}组, {onerm_count}条1RM\n")
 
+        await db.flush()
+
+        # 直接写库不经过训练接口，派生统计需要重建
+        for user in users:
+            await rebuild_user_stats(db, user.id)
+        await rebuild_fleet_stats(db, [user.id for user in users])
+
         await db.commit()
 
         print(f"\n🎉 所有用户测试数据生成完成！")
@@ -0,0 +1,71 @@
+"""cascade foreign keys
+
+训练课 / 训练组 / 自定义动作 / 1RM 推算记录的外键改为数据库级联（ON DELETE CASCADE / SET NULL），
+删除训练课与范围删除直接执行 DELETE，由数据库清理子表。
+create_all 不会修改已存在的表，旧库需执行本迁移；已是级联外键的库会跳过。
+
+Revision ID: 3f2a9c4d1b7e
+Revises:
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from itertools import groupby
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2a9c4d1b7e"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQLite 的外键没有名称，batch 模式反射时按此命名后才能删除
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# (表, 列, 引用表, ON DELETE)
+FOREIGN_KEYS = [
+    ("exercises", "user_id", "users", "CASCADE"),
+    ("workout_sessions", "user_id", "users", "CASCADE"),
+    ("workout_sets", "session_id", "workout_sessions", "CASCADE"),
+    ("estimated_1rms", "user_id", "users", "CASCADE"),
+    ("estimated_1rms", "exercise_id", "exercises", "CASCADE"),
+    ("estimated_1rms", "source_set_id", "workout_sets", "SET NULL"),
+]
+
+
+def _replace_foreign_keys(cascade: bool) -> None:
+    """按 FOREIGN_KEYS 重建外键（cascade 为假时去掉 ON DELETE）"""
+    inspector = sa.inspect(op.get_bind())
+    for table, keys in groupby(FOREIGN_KEYS, key=lambda k: k[0]):
+        existing = {
+            tuple(fk["constrained_columns"]): fk for fk in inspector.get_foreign_keys(table)
+        }
+        changes = []
+        for _, column, referred_table, ondelete in keys:
+            target: Optional[str] = ondelete if cascade else None
+            fk = existing.get((column,))
+            if fk is None or (fk["options"].get("ondelete") or "").upper() == (target or ""):
+                continue
+            name = fk["name"] or NAMING_CONVENTION["fk"] % {
+                "table_name": table, "column_0_name": column, "referred_table_name": referred_table,
+            }
+            changes.append((name, column, referred_table, target))
+        if not changes:
+            continue
+
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for name, column, referred_table, target in changes:
+                batch_op.drop_constraint(name, type_="foreignkey")
+                batch_op.create_foreign_key(name, referred_table, [column], ["id"], ondelete=target)
+
+
+def upgrade() -> None:
+    _replace_foreign_keys(cascade=True)
+
+
+def downgrade() -> None:
+    _replace_foreign_keys(cascade=False)
@@ -0,0 +1,33 @@
+"""workout sessions cursor index
+
+训练课列表的游标分页按 (user_id, date, id) 定位，已有数据库补建复合索引。
+
+Revision ID: 8b1e5d2f6a90
+Revises: 3f2a9c4d1b7e
+Create Date: 2026-10-19 15:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1e5d2f6a90"
+down_revision: Union[str, None] = "3f2a9c4d1b7e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_workout_sessions_user_date_id"
+
+
+def upgrade() -> None:
+    indexes = sa.inspect(op.get_bind()).get_indexes("workout_sessions")
+    if INDEX_NAME not in {index["name"] for index in indexes}:
+        op.create_index(INDEX_NAME, "workout_sessions", ["user_id", "date", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="workout_sessions")
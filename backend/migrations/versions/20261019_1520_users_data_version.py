@@ -0,0 +1,31 @@
+"""users data version
+
+用户数据版本号（离线同步与缓存失效用），已有用户从 0 开始。
+
+Revision ID: c47d0e9a2b13
+Revises: 8b1e5d2f6a90
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c47d0e9a2b13"
+down_revision: Union[str, None] = "8b1e5d2f6a90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = sa.inspect(op.get_bind()).get_columns("users")
+    if "data_version" not in {column["name"] for column in columns}:
+        op.add_column("users", sa.Column("data_version", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("data_version")
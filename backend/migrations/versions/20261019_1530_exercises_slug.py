@@ -0,0 +1,75 @@
+"""exercises slug
+
+预置动作的稳定标识（seed 按 slug upsert）：先加可空列，按名称为已有预置动作回填 slug，
+再建唯一索引。同名的预置动作只回填 id 最小的一条，其余保持为空，由 seed 按新动作处理。
+
+Revision ID: 5e8c3a7f0d24
+Revises: c47d0e9a2b13
+Create Date: 2026-10-19 15:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from seeds.exercises import catalog_rows
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8c3a7f0d24"
+down_revision: Union[str, None] = "c47d0e9a2b13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "uq_exercises_slug"
+
+exercises = sa.table(
+    "exercises",
+    sa.column("id", sa.Integer),
+    sa.column("name", sa.String),
+    sa.column("slug", sa.String),
+    sa.column("is_custom", sa.Boolean),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "slug" not in {column["name"] for column in inspector.get_columns("exercises")}:
+        op.add_column("exercises", sa.Column("slug", sa.String(100), nullable=True))
+
+    # 回填：按名称匹配当前预置数据
+    slugs = {row["name"]: row["slug"] for row in catalog_rows()}
+    result = bind.execute(
+        sa.select(exercises.c.id, exercises.c.name, exercises.c.slug)
+        .where(exercises.c.is_custom == sa.false())
+        .order_by(exercises.c.id)
+    )
+    rows = result.all()
+    taken = {slug for _, _, slug in rows if slug}
+    updates = []
+    for exercise_id, name, slug in rows:
+        if slug is None and slugs.get(name) and slugs[name] not in taken:
+            taken.add(slugs[name])
+            updates.append({"exercise_id": exercise_id, "new_slug": slugs[name]})
+    if updates:
+        bind.execute(
+            exercises.update()
+            .where(exercises.c.id == sa.bindparam("exercise_id"))
+            .values(slug=sa.bindparam("new_slug")),
+            updates,
+        )
+
+    # create_all 建表时为列级 UNIQUE 约束，已有时不再重复建索引
+    unique_columns = [c["column_names"] for c in inspector.get_unique_constraints("exercises")]
+    unique_columns += [i["column_names"] for i in inspector.get_indexes("exercises") if i["unique"]]
+    if ["slug"] not in unique_columns:
+        op.create_index(INDEX_NAME, "exercises", ["slug"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="exercises")
+    with op.batch_alter_table("exercises") as batch_op:
+        batch_op.drop_column("slug")
@@ -0,0 +1,31 @@
+"""users is admin
+
+管理员标记（全站统计接口），已有用户默认为非管理员。
+
+Revision ID: 9a6f1c3e8d57
+Revises: 5e8c3a7f0d24
+Create Date: 2026-10-19 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a6f1c3e8d57"
+down_revision: Union[str, None] = "5e8c3a7f0d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = sa.inspect(op.get_bind()).get_columns("users")
+    if "is_admin" not in {column["name"] for column in columns}:
+        op.add_column("users", sa.Column("is_admin", sa.Boolean(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("is_admin")
@@ -0,0 +1,31 @@
+"""workout sets is flagged
+
+疑似录入错误的训练组标记，已有训练组默认不标记。
+
+Revision ID: e2b7d4a9c160
+Revises: 9a6f1c3e8d57
+Create Date: 2026-10-19 15:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7d4a9c160"
+down_revision: Union[str, None] = "9a6f1c3e8d57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = sa.inspect(op.get_bind()).get_columns("workout_sets")
+    if "is_flagged" not in {column["name"] for column in columns}:
+        op.add_column("workout_sets", sa.Column("is_flagged", sa.Boolean(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("workout_sets") as batch_op:
+        batch_op.drop_column("is_flagged")
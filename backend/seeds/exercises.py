@@ -3,10 +3,17 @@
 运行: python -m seeds.exercises
 """
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
+import json
+import re
+from typing import List
+
+from sqlalchemy import select, insert, update
 
 from app.database import async_session_maker, init_db
+from app.models.catalog import CatalogState
 from app.models.exercise import Exercise
+from app.services.exercise_catalog import CATALOG_STATE_ID, bump_catalog_version
 
 
 # 预置动作数据
@@ -114,25 +121,86 @@ EXERCISES_DATA = [
 ]
 
 
+def exercise_slug(data: dict) -> str:
+    """
+    预置动作的稳定标识：默认由英文名生成（如 "barbell-bench-press"）
+
+    修改已有动作的英文名时，需在数据中写明原来的 "slug"，否则会被当作新动作插入。
+    """
+    return data.get("slug") or re.sub(r"[^a-z0-9]+", "-", data["name_en"].lower()).strip("-")
+
+
+def catalog_rows() -> List[dict]:
+    """预置数据转为数据库行（补全可选字段，便于与现有行逐字段比较）"""
+    return [
+        {
+            "slug": exercise_slug(data),
+            "name": data["name"],
+            "name_en": data["name_en"],
+            "primary_muscle": data["primary_muscle"],
+            "secondary_muscles": data.get("secondary_muscles"),
+            "category": data["category"],
+            "equipment": data["equipment"],
+            "difficulty": data.get("difficulty", 1),
+            "description": data.get("description"),
+            "is_custom": False,
+        }
+        for data in EXERCISES_DATA
+    ]
+
+
+def catalog_hash(rows: List[dict]) -> str:
+    """预置数据内容哈希（数据不变时 seed 直接跳过）"""
+    payload = json.dumps(rows, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 async def seed_exercises():
-    """填充预置动作数据"""
-    async with async_session_maker() as session:
-        # 检查是否已有数据
-        from sqlalchemy import select, func
-        result = await session.execute(select(func.count()).select_from(Exercise))
-        count = result.scalar()
+    """
+    按 slug 批量 upsert 预置动作（可重复执行）
 
-        if count > 0:
-            print(f"动作库已有 {count} 条数据，跳过填充")
-            return
+    - 预置数据哈希与上次一致时不做任何事
+    - 新动作批量插入，内容变化的动作批量更新，已从数据中移除的动作保留（可能已被训练记录引用）
+    - 早期按名称填充、没有 slug 的预置动作按名称匹配并补上 slug
+    - 有变化时动作库版本号 +1，各进程重新加载内存索引
+    """
+    rows = catalog_rows()
+    content_hash = catalog_hash(rows)
 
-        # 插入数据
-        for data in EXERCISES_DATA:
-            exercise = Exercise(**data, is_custom=False)
-            session.add(exercise)
+    async with async_session_maker() as session:
+        result = await session.execute(select(CatalogState).where(CatalogState.id == CATALOG_STATE_ID))
+        state = result.scalar_one_or_none()
+        if state and state.content_hash == content_hash:
+            print("预置动作数据无变化，跳过填充")
+            return
 
+        result = await session.execute(select(Exercise).where(Exercise.is_custom == False))
+        existing = result.scalars().all()
+        by_slug = {e.slug: e for e in existing if e.slug}
+        by_name = {e.name: e for e in existing if not e.slug}
+
+        inserts, updates = [], []
+        for row in rows:
+            current = by_slug.get(row["slug"]) or by_name.get(row["name"])
+            if current is None:
+                inserts.append(row)
+            elif any(getattr(current, field) != value for field, value in row.items()):
+                updates.append({**row, "id": current.id})
+
+        if inserts:
+            await session.execute(insert(Exercise), inserts)
+        if updates:
+            await session.execute(update(Exercise), updates)
+        if inserts or updates or state is None:
+            await bump_catalog_version(session)
+
+        await session.execute(
+            update(CatalogState)
+            .where(CatalogState.id == CATALOG_STATE_ID)
+            .values(content_hash=content_hash)
+        )
         await session.commit()
-        print(f"成功填充 {len(EXERCISES_DATA)} 个预置动作")
+        print(f"预置动作填充完成：新增 {len(inserts)} 个，更新 {len(updates)} 个")
 
 
 async def main():
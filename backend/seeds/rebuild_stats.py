@@ -0,0 +1,38 @@
+"""
+重建训练派生统计
+统计表由训练写操作增量维护；功能上线前的历史数据、或直接写库的数据
+（如 generate_test_data.py）需要执行一次重建。
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from app.database import async_session_maker, init_db
+from app.models.user import User
+from app.services.set_events import rebuild_user_stats, rebuild_fleet_stats
+
+
+async def rebuild_stats():
+    """逐个用户重建派生统计（每个用户单独提交），最后重建全站统计"""
+    async with async_session_maker() as session:
+        result = await session.execute(select(User.id).order_by(User.id))
+        user_ids = list(result.scalars().all())
+
+        for user_id in user_ids:
+            await rebuild_user_stats(session, user_id)
+            await session.commit()
+
+        await rebuild_fleet_stats(session, user_ids)
+        await session.commit()
+
+        print(f"已重建 {len(user_ids)} 个用户的训练统计")
+
+
+async def main():
+    """主函数"""
+    await init_db()
+    await rebuild_stats()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())